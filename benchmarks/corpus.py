@@ -0,0 +1,293 @@
+"""
+Synthetic invoice corpus for benchmarks.
+
+Scales data/invoices/test_invoices.json to any size. Every generated
+invoice is a copy of one template invoice (round-robin over the
+_test_category labels) with variations that keep its expected result:
+
+- vendor: swapped for a registry vendor with the same status, state,
+  filing status and TDS section (same GST / TDS outcome)
+- HSN / SAC: swapped within the same chapter / group
+- line items: one line split into several with the same total
+- ids / invoice numbers: made unique
+
+DUPLICATE_INVOICE copies are made from an invoice already emitted
+(preferably one of the template's original, e.g. INV-2024-0001 for
+INV-2024-0010) as a resubmission: everything kept, invoice number + 1.
+
+    python -m benchmarks.corpus --size 10000 --out benchmarks/corpus/10k
+"""
+
+import argparse
+import copy
+import json
+import random
+import re
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / "data"
+
+TEMPLATES_PATH = DATA_DIR / "invoices" / "test_invoices.json"
+VENDOR_REGISTRY_PATH = DATA_DIR / "vendor_registry.json"
+HSN_SAC_PATH = DATA_DIR / "hsn_sac_codes.json"
+
+SHARD_SIZE = 5_000
+MAX_LINE_SPLIT = 4
+
+# Vendor attributes that decide the GST / TDS outcome of an invoice
+VENDOR_KEY_FIELDS = ("status", "state_code", "gst_filing_status", "tds_section")
+
+DUPLICATE_CATEGORY = "DUPLICATE_INVOICE"
+TRAILING_NUMBER_RE = re.compile(r"(\d+)$")
+
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ---------------------------------------------------------
+# Substitution tables
+# ---------------------------------------------------------
+
+def _vendor_alternatives(vendors):
+    """gstin -> registry vendors interchangeable with it (itself included)."""
+    groups = {}
+    for vendor in vendors:
+        key = tuple(vendor.get(f) for f in VENDOR_KEY_FIELDS)
+        groups.setdefault(key, []).append(vendor)
+
+    return {
+        vendor["gstin"]: groups[tuple(vendor.get(f) for f in VENDOR_KEY_FIELDS)]
+        for vendor in vendors
+        if vendor.get("gstin")
+    }
+
+
+def _code_alternatives(hsn_sac):
+    """code -> codes of the same HSN chapter / SAC group (itself included)."""
+    groups = {}
+    codes = {}
+
+    for code, info in hsn_sac.get("hsn_codes", {}).items():
+        key = ("HSN", info.get("chapter") or code[:2])
+        groups.setdefault(key, []).append((code, info))
+        codes[code] = key
+
+    for code, info in hsn_sac.get("sac_codes", {}).items():
+        key = ("SAC", code[:4])
+        groups.setdefault(key, []).append((code, info))
+        codes[code] = key
+
+    return {code: groups[key] for code, key in codes.items()}
+
+
+# ---------------------------------------------------------
+# Variations
+# ---------------------------------------------------------
+
+def _vary_vendor(invoice, vendor_alternatives, rng):
+    vendor = invoice.get("vendor")
+    if not isinstance(vendor, dict):
+        return
+
+    choices = vendor_alternatives.get(vendor.get("gstin"))
+    if not choices:
+        return
+
+    chosen = rng.choice(choices)
+    vendor.update({
+        "name": chosen["legal_name"],
+        "gstin": chosen["gstin"],
+        "pan": chosen.get("pan"),
+        "address": chosen.get("address", vendor.get("address")),
+    })
+
+
+def _vary_codes(invoice, code_alternatives, rng):
+    items = invoice.get("line_items") or []
+    # Mixed-rate invoices depend on their exact codes
+    if len({item.get("hsn_sac") for item in items}) > 1:
+        return
+
+    for item in items:
+        choices = code_alternatives.get(item.get("hsn_sac"))
+        if choices:
+            code, info = rng.choice(choices)
+            item["hsn_sac"] = code
+            item["description"] = info.get("description", item.get("description"))
+
+
+def _split_line(invoice, rng):
+    items = invoice.get("line_items") or []
+    if not items:
+        return
+
+    parts = rng.randint(1, MAX_LINE_SPLIT)
+    if parts == 1:
+        return
+
+    index = max(range(len(items)), key=lambda i: abs(items[i].get("amount") or 0))
+    item = items[index]
+    amount = item.get("amount")
+    if not isinstance(amount, (int, float)):
+        return
+
+    share = round(amount / parts, 2)
+    pieces = []
+    for part in range(parts):
+        piece = dict(item)
+        piece["quantity"] = 1
+        piece["rate"] = piece["amount"] = (
+            share if part < parts - 1 else round(amount - share * (parts - 1), 2)
+        )
+        piece["description"] = f"{item.get('description', '')} (part {part + 1}/{parts})"
+        pieces.append(piece)
+
+    items[index:index + 1] = pieces
+
+
+def _original_of(template, templates):
+    """Template invoice a DUPLICATE_INVOICE template resubmits (or None)."""
+    key = lambda inv: (
+        (inv.get("vendor") or {}).get("gstin"),
+        inv.get("invoice_date"),
+        inv.get("total_amount"),
+    )
+    for other in templates:
+        if other is not template and other.get("_test_category") != DUPLICATE_CATEGORY:
+            if key(other) == key(template):
+                return other["invoice_id"]
+    return None
+
+
+def _next_number(number, taken):
+    """Invoice number + 1 (trailing digits, width kept), not in `taken`."""
+    number = str(number or "")
+    while True:
+        match = TRAILING_NUMBER_RE.search(number)
+        if match:
+            digits = match.group(1)
+            number = number[:match.start()] + str(int(digits) + 1).zfill(len(digits))
+        else:
+            number = f"{number}-1"
+        if number not in taken:
+            return number
+
+
+def _resubmission(template, sibling, invoice_id, taken):
+    """A DUPLICATE_INVOICE copy of an emitted sibling invoice."""
+    invoice = copy.deepcopy(sibling)
+    for field in ("_test_category", "_expected_result", "_complexity", "_trap"):
+        if field in template:
+            invoice[field] = template[field]
+        else:
+            invoice.pop(field, None)
+
+    invoice["invoice_id"] = invoice_id
+    invoice["invoice_number"] = _next_number(sibling.get("invoice_number"), taken)
+    invoice["_template_id"] = template["invoice_id"]
+    invoice["_duplicate_of"] = sibling["invoice_id"]
+    return invoice
+
+
+# ---------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------
+
+def generate_corpus(
+    size,
+    seed=7,
+    templates_path=TEMPLATES_PATH,
+    vendor_registry_path=VENDOR_REGISTRY_PATH,
+    hsn_sac_path=HSN_SAC_PATH,
+):
+    """Returns `size` invoices; the same seed gives the same corpus."""
+    rng = random.Random(seed)
+    templates = _load_json(templates_path)
+    vendor_alternatives = _vendor_alternatives(
+        _load_json(vendor_registry_path)["vendors"]
+    )
+    code_alternatives = _code_alternatives(_load_json(hsn_sac_path))
+
+    originals = {
+        template["invoice_id"]: _original_of(template, templates)
+        for template in templates
+        if template.get("_test_category") == DUPLICATE_CATEGORY
+    }
+
+    order = list(range(len(templates)))
+    invoices = []
+    # template id -> emitted (non-duplicate) invoices, for resubmissions
+    emitted = {}
+    numbers = set()
+
+    for n in range(size):
+        if n % len(order) == 0:
+            rng.shuffle(order)
+
+        template = templates[order[n % len(order)]]
+        invoice_id = f"{template['invoice_id']}-S{n:06d}"
+
+        if template["invoice_id"] in originals:
+            siblings = emitted.get(originals[template["invoice_id"]]) or [
+                inv for group in emitted.values() for inv in group
+            ]
+            if siblings:
+                invoice = _resubmission(
+                    template, rng.choice(siblings), invoice_id, numbers
+                )
+                numbers.add(invoice["invoice_number"])
+                invoices.append(invoice)
+                continue
+
+        invoice = copy.deepcopy(template)
+        invoice["invoice_id"] = invoice_id
+        invoice["invoice_number"] = f"{template.get('invoice_number')}-{n:06d}"
+        invoice["_template_id"] = template["invoice_id"]
+
+        _vary_vendor(invoice, vendor_alternatives, rng)
+        _vary_codes(invoice, code_alternatives, rng)
+        _split_line(invoice, rng)
+
+        numbers.add(invoice["invoice_number"])
+        invoices.append(invoice)
+        if template["invoice_id"] not in originals:
+            emitted.setdefault(template["invoice_id"], []).append(invoice)
+
+    return invoices
+
+
+def write_corpus(invoices, out_dir, shard_size=SHARD_SIZE):
+    """Writes the corpus as JSON shards of `shard_size` invoices each."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for stale in out_dir.glob("invoices_*.json"):
+        stale.unlink()
+
+    paths = []
+    for start in range(0, len(invoices), shard_size):
+        path = out_dir / f"invoices_{start // shard_size:04d}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(invoices[start:start + shard_size], f)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic invoice corpus")
+    parser.add_argument("--size", type=int, required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+
+    invoices = generate_corpus(args.size, seed=args.seed)
+    paths = write_corpus(invoices, args.out, args.shard_size)
+    print(f"{len(invoices)} invoices in {len(paths)} files under {args.out}")
+
+
+if __name__ == "__main__":
+    main()
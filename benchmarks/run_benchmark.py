@@ -0,0 +1,382 @@
+"""
+End-to-end throughput benchmark.
+
+For each corpus size: generates the corpus, starts the mock GST server
+(or, with --transport inprocess, calls its Flask app in-process), runs
+run_compliance_pipeline on it in a fresh process and writes one JSON
+result (throughput, per-stage latency, peak RSS, accuracy against
+_expected_result) under benchmarks/results/.
+
+    python -m benchmarks.run_benchmark --sizes 1000 10000 100000
+    python -m benchmarks.run_benchmark --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.corpus import ROOT_DIR, generate_corpus, write_corpus
+
+
+RESULTS_DIR = ROOT_DIR / "benchmarks" / "results"
+
+# Pipeline decisions that count as correct for each _expected_result
+EXPECTED_DECISIONS = {
+    "PASS": {"APPROVE"},
+    "FAIL": {"ESCALATE"},
+    "FLAG_FOR_REVIEW": {"APPROVE_WITH_REVIEW", "ESCALATE"},
+    "COMPLEX_ANALYSIS_REQUIRED": {"APPROVE_WITH_REVIEW", "ESCALATE"},
+    "NOT_APPLICABLE": {"APPROVE", "APPROVE_WITH_REVIEW"},
+}
+# PASS_WITH_* (TDS, flags, approvals, ...)
+PASS_WITH_DECISIONS = {"APPROVE", "APPROVE_WITH_REVIEW"}
+
+# Stages shown on the console (all stages are in the JSON)
+SUMMARY_STAGES = (
+    "extract", "validate", "validate.gst_tds", "resolve", "report", "db.commit",
+)
+
+
+def expected_decisions(expected):
+    if expected in EXPECTED_DECISIONS:
+        return EXPECTED_DECISIONS[expected]
+    if str(expected).startswith("PASS_"):
+        return PASS_WITH_DECISIONS
+    return None
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------------------------------------------
+# Mock GST server
+# ---------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock_server(port=None, profile="none", mode="threaded", timeout=15):
+    """Runs mock_gst_server in a child process; returns (process, base_url)."""
+    port = port or _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "mock_gst_server.py",
+            "--port", str(port),
+            "--profile", profile,
+            "--mode", mode,
+        ],
+        cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}/api/gst"
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/hsn-rate?code=998315", timeout=1)
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError("Mock GST server did not start")
+
+
+# ---------------------------------------------------------
+# Accuracy
+# ---------------------------------------------------------
+
+def score(invoices, reports):
+    from src.agents.reporter_agent import DECISION_LABELS
+
+    label_to_decision = {label: d for d, label in DECISION_LABELS.items()}
+    by_id = {inv["invoice_id"]: inv for inv in invoices}
+
+    total = correct = 0
+    by_category = {}
+    confusion = {}
+
+    for report in reports:
+        invoice = by_id.get(report.get("invoice_id"))
+        if invoice is None:
+            continue
+
+        expected = invoice.get("_expected_result")
+        allowed = expected_decisions(expected)
+        if allowed is None:
+            continue
+
+        decision = label_to_decision.get(report.get("decision"), report.get("decision"))
+        ok = decision in allowed
+
+        total += 1
+        correct += ok
+        category = by_category.setdefault(
+            invoice.get("_test_category"), {"total": 0, "correct": 0}
+        )
+        category["total"] += 1
+        category["correct"] += ok
+        row = confusion.setdefault(expected, {})
+        row[decision] = row.get(decision, 0) + 1
+
+    for category in by_category.values():
+        category["accuracy"] = round(category["correct"] / category["total"], 4)
+
+    return {
+        "scored": total,
+        "correct": correct,
+        "accuracy": round(correct / total, 4) if total else None,
+        "by_category": dict(sorted(by_category.items())),
+        "confusion": confusion,
+    }
+
+
+# ---------------------------------------------------------
+# One size (runs in its own process, so peak RSS is per size)
+# ---------------------------------------------------------
+
+def run_single(
+    size, seed, workdir, base_url, use_llm=False,
+    transport="http", server_profile="none", sink="memory",
+):
+    from src.config import load_config
+    from src.orchestration.compliance_pipeline import run_compliance_pipeline
+
+    workdir = Path(workdir)
+    corpus_dir = workdir / "invoices"
+
+    started = time.perf_counter()
+    invoices = generate_corpus(size, seed=seed)
+    write_corpus(invoices, corpus_dir)
+    generate_sec = time.perf_counter() - started
+
+    config = load_config()
+    config["invoices_dir"] = corpus_dir
+    config["gst_api_base_url"] = base_url
+    config["sqlite"]["db_path"] = workdir / "state.db"
+    config["tracing"] = {"enabled": True, "profile_dir": None}
+    config["logging"] = {**config.get("logging", {}), "level": "WARNING"}
+    config["agentic"]["use_llm_resolver"] = use_llm
+    config["gst_api_transport"] = transport
+    config["reports"] = {
+        **config.get("reports", {}),
+        "sink": sink,
+        "dir": workdir / "reports",
+        "db_path": workdir / "reports.db",
+    }
+    if transport == "inprocess":
+        import mock_gst_server
+
+        mock_gst_server.shaper.set_profile(server_profile)
+
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+    summary, reports = run_compliance_pipeline(config, force_run=True)
+    elapsed = time.perf_counter() - started
+
+    profile = summary.pop("profile", None) or {}
+    return {
+        "size": size,
+        "seed": seed,
+        "reports": len(reports),
+        "generate_sec": round(generate_sec, 3),
+        "pipeline_sec": round(elapsed, 3),
+        "invoices_per_sec": round(len(reports) / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_before_run_mb": rss_before,
+        "stages": profile.get("stages", {}),
+        "counters": profile.get("counters", {}),
+        "caches": profile.get("caches", {}),
+        "accuracy": score(invoices, reports),
+        "summary": summary,
+    }
+
+
+def _run_size_in_child(size, args, base_url):
+    workdir = tempfile.mkdtemp(prefix=f"bench_{size}_", dir=args.workdir)
+    out_path = Path(workdir) / "result.json"
+    command = [
+        sys.executable, "-m", "benchmarks.run_benchmark",
+        "--single", str(size),
+        "--seed", str(args.seed),
+        "--server-url", base_url,
+        "--server-profile", args.server_profile,
+        "--transport", args.transport,
+        "--sink", args.sink,
+        "--workdir", workdir,
+        "--out", str(out_path),
+    ]
+    if args.llm:
+        command.append("--llm")
+
+    try:
+        subprocess.run(command, cwd=ROOT_DIR, check=True)
+        with open(out_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ---------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------
+
+def _print_result(result):
+    accuracy = result["accuracy"]
+    print(
+        f"\n{result['size']:>7} invoices | {result['invoices_per_sec']} inv/s | "
+        f"{result['pipeline_sec']}s | peak RSS {result['peak_rss_mb']} MB | "
+        f"accuracy {accuracy['accuracy']} ({accuracy['correct']}/{accuracy['scored']})"
+    )
+    for name in SUMMARY_STAGES:
+        stage = result["stages"].get(name)
+        if stage:
+            print(
+                f"    {name:<18} n={stage['count']:<7} p50={stage['p50_sec']}s "
+                f"p95={stage['p95_sec']}s p99={stage['p99_sec']}s"
+            )
+
+
+def compare(old_path, new_path):
+    """Prints throughput / RSS / stage p95 changes between two result files."""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = {r["size"]: r for r in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = {r["size"]: r for r in json.load(f)["results"]}
+
+    def delta(a, b):
+        if not a or b is None:
+            return "n/a"
+        return f"{(b - a) / a * 100:+.1f}%"
+
+    for size in sorted(set(old) & set(new)):
+        a, b = old[size], new[size]
+        print(
+            f"{size:>7}: inv/s {a['invoices_per_sec']} -> {b['invoices_per_sec']} "
+            f"({delta(a['invoices_per_sec'], b['invoices_per_sec'])}), "
+            f"RSS {a['peak_rss_mb']} -> {b['peak_rss_mb']} MB, "
+            f"accuracy {a['accuracy']['accuracy']} -> {b['accuracy']['accuracy']}"
+        )
+        for name in sorted(set(a["stages"]) & set(b["stages"])):
+            p_old, p_new = a["stages"][name]["p95_sec"], b["stages"][name]["p95_sec"]
+            print(f"    {name:<28} p95 {p_old} -> {p_new} ({delta(p_old, p_new)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--llm", action="store_true", help="keep the LLM resolver on")
+    parser.add_argument("--server-url", help="use a running mock GST server")
+    parser.add_argument(
+        "--server-profile", default="none", help="mock server load profile"
+    )
+    parser.add_argument(
+        "--server-mode", default="threaded", choices=["threaded", "async"]
+    )
+    parser.add_argument(
+        "--transport", default="http", choices=["http", "inprocess"],
+        help="portal client transport (inprocess: no mock server process)",
+    )
+    parser.add_argument(
+        "--sink", default="memory", choices=["memory", "ndjson", "sqlite"],
+        help="report sink the pipeline writes to",
+    )
+    parser.add_argument("--workdir", default=None, help="scratch directory")
+    parser.add_argument("--keep", action="store_true", help="keep corpora and state DBs")
+    parser.add_argument("--out", help="result file (default: benchmarks/results/)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.single is not None:
+        result = run_single(
+            args.single, args.seed, args.workdir, args.server_url, args.llm,
+            args.transport, args.server_profile, args.sink,
+        )
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, default=str)
+        return
+
+    server = None
+    base_url = args.server_url
+    if args.transport == "inprocess":
+        # Only the path is used; the app runs in the benchmark process
+        base_url = base_url or "http://mock-gst.inprocess/api/gst"
+    elif base_url is None:
+        server, base_url = start_mock_server(
+            profile=args.server_profile, mode=args.server_mode
+        )
+
+    try:
+        results = []
+        for size in args.sizes:
+            result = _run_size_in_child(size, args, base_url)
+            _print_result(result)
+            results.append(result)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out_path = Path(args.out) if args.out else RESULTS_DIR / f"bench_{stamp}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created_at": stamp,
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "llm": args.llm,
+                "server_profile": None if args.server_url else args.server_profile,
+                "server_mode": None if args.server_url else args.server_mode,
+                "transport": args.transport,
+                "sink": args.sink,
+                "results": results,
+            },
+            f,
+            indent=2,
+            default=str,
+        )
+    print(f"\nResults written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
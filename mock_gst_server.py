@@ -1,11 +1,22 @@
 from flask import Flask, request, jsonify
+import argparse
+import asyncio
+import copy
 import json
+import math
+import random
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
 
 app = Flask(__name__)
 
-# Load vendor registry as mock DB
-with open("data/vendor_registry.json", "r", encoding="utf-8") as f:
+# Load vendor registry as mock DB (relative to this file, so the app can
+# also be imported in-process from any working directory)
+VENDOR_REGISTRY_PATH = Path(__file__).resolve().parent / "data" / "vendor_registry.json"
+
+with open(VENDOR_REGISTRY_PATH, "r", encoding="utf-8") as f:
     vendors = {v["gstin"]: v for v in json.load(f)["vendors"] if v.get("gstin")}
 
 @app.route("/api/gst/validate-gstin", methods=["POST"])
@@ -69,5 +80,364 @@ def verify_206ab():
         "section_206ab_applicable": False
     })
 
+# =========================================================
+# LOAD PROFILES
+# =========================================================
+# A profile shapes every /api/gst/* request before it reaches the
+# endpoint. Keys (all optional):
+#   latency         {endpoint | "default": distribution}
+#                   {"dist": "fixed", "ms": 50}
+#                   {"dist": "uniform", "min_ms": 20, "max_ms": 80}
+#                   {"dist": "normal", "mean_ms": 50, "stddev_ms": 10}
+#                   {"dist": "lognormal", "median_ms": 60, "sigma": 0.5}
+#   rate_limit_rps  portal-wide requests/sec; excess gets 429 + Retry-After
+#   burst           token bucket size (default: rate_limit_rps)
+#   error_rate      share of requests answered with a random 5xx
+#   timeout_rate    share of requests held for timeout_sec, then 504
+#   timeout_sec     default 6 (the client gives up after 5)
+#   seed            makes the random choices repeatable
+#   base            profile name to start from
+
+REALISTIC_LATENCY = {
+    "default": {"dist": "lognormal", "median_ms": 60, "sigma": 0.4},
+    "hsn-rate": {"dist": "lognormal", "median_ms": 30, "sigma": 0.3},
+    "validate-irn": {"dist": "lognormal", "median_ms": 120, "sigma": 0.5},
+}
+
+PROFILES = {
+    "none": {},
+    "realistic": {"latency": REALISTIC_LATENCY},
+    "throttled": {"latency": REALISTIC_LATENCY, "rate_limit_rps": 20},
+    "flaky": {
+        "latency": REALISTIC_LATENCY,
+        "error_rate": 0.05,
+        "timeout_rate": 0.01,
+    },
+    "portal_peak": {
+        "latency": {"default": {"dist": "lognormal", "median_ms": 250, "sigma": 0.6}},
+        "rate_limit_rps": 10,
+        "error_rate": 0.02,
+        "timeout_rate": 0.005,
+    },
+}
+
+SERVER_ERRORS = (500, 502, 503)
+
+
+def resolve_profile(profile):
+    """Profile name, JSON file path or dict -> full profile dict."""
+    if isinstance(profile, str):
+        if profile in PROFILES:
+            return {"name": profile, **copy.deepcopy(PROFILES[profile])}
+        if not profile.endswith(".json"):
+            raise ValueError(f"Unknown profile: {profile}")
+        with open(profile, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+
+    if not isinstance(profile, dict):
+        raise ValueError("profile must be a name, a JSON file or an object")
+
+    profile = copy.deepcopy(profile)
+    base = profile.pop("base", None)
+    if base is not None:
+        if base not in PROFILES:
+            raise ValueError(f"Unknown base profile: {base}")
+        merged = copy.deepcopy(PROFILES[base])
+        merged.update(profile)
+        merged.setdefault("name", f"{base}+custom")
+        return merged
+
+    profile.setdefault("name", "custom")
+    return profile
+
+
+def sample_latency(dist, rng):
+    """Seconds for one request."""
+    if not dist:
+        return 0.0
+
+    kind = dist.get("dist", "fixed")
+    if kind == "fixed":
+        ms = dist.get("ms", 0)
+    elif kind == "uniform":
+        ms = rng.uniform(dist.get("min_ms", 0), dist.get("max_ms", 0))
+    elif kind == "normal":
+        ms = rng.gauss(dist.get("mean_ms", 0), dist.get("stddev_ms", 0))
+    elif kind == "lognormal":
+        ms = rng.lognormvariate(math.log(max(dist.get("median_ms", 1), 1e-3)), dist.get("sigma", 0.5))
+    else:
+        raise ValueError(f"Unknown latency distribution: {kind}")
+
+    return max(0.0, ms) / 1000.0
+
+
+class RequestPlan:
+    """What the profile decided for one request."""
+
+    def __init__(self, delay=0.0, status=None, body=None, headers=None, injected=None):
+        self.delay = delay
+        self.status = status          # None = run the endpoint
+        self.body = body
+        self.headers = headers or {}
+        self.injected = injected      # "throttled" | "error" | "timeout"
+
+
+class LoadShaper:
+    def __init__(self, profile="none"):
+        self._lock = threading.Lock()
+        self.set_profile(profile)
+        self.reset_stats()
+
+    def set_profile(self, profile):
+        profile = resolve_profile(profile)
+        rps = profile.get("rate_limit_rps")
+
+        with self._lock:
+            self.profile = profile
+            self.rng = random.Random(profile.get("seed"))
+            self.rps = rps
+            self.burst = profile.get("burst", rps)
+            self.tokens = self.burst
+            self.refilled_at = time.monotonic()
+        return profile
+
+    def reset_stats(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.requests = {}        # endpoint -> {status: count}
+            self.injected = {"throttled": 0, "error": 0, "timeout": 0}
+
+    def _take_token(self):
+        """None when allowed, else seconds until the next token."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rps)
+        self.refilled_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / self.rps
+
+    def plan(self, endpoint):
+        with self._lock:
+            profile = self.profile
+
+            if self.rps:
+                wait = self._take_token()
+                if wait is not None:
+                    self.injected["throttled"] += 1
+                    return RequestPlan(
+                        status=429,
+                        body={"error": "RATE_LIMITED", "message": "Too many requests"},
+                        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                        injected="throttled",
+                    )
+
+            latency = profile.get("latency", {})
+            delay = sample_latency(latency.get(endpoint, latency.get("default")), self.rng)
+            roll = self.rng.random()
+
+            timeout_rate = profile.get("timeout_rate", 0)
+            if roll < timeout_rate:
+                self.injected["timeout"] += 1
+                return RequestPlan(
+                    delay=profile.get("timeout_sec", 6),
+                    status=504,
+                    body={"error": "GATEWAY_TIMEOUT"},
+                    injected="timeout",
+                )
+
+            if roll < timeout_rate + profile.get("error_rate", 0):
+                self.injected["error"] += 1
+                return RequestPlan(
+                    delay=delay,
+                    status=self.rng.choice(SERVER_ERRORS),
+                    body={"error": "PORTAL_UNAVAILABLE"},
+                    injected="error",
+                )
+
+            return RequestPlan(delay=delay)
+
+    def record(self, endpoint, status):
+        with self._lock:
+            by_status = self.requests.setdefault(endpoint, {})
+            by_status[status] = by_status.get(status, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            elapsed = max(time.time() - self.started_at, 1e-9)
+            total = sum(sum(s.values()) for s in self.requests.values())
+            return {
+                "profile": self.profile.get("name"),
+                "elapsed_sec": round(elapsed, 3),
+                "total_requests": total,
+                "requests_per_sec": round(total / elapsed, 2),
+                "requests": {
+                    endpoint: {str(code): n for code, n in sorted(by_status.items())}
+                    for endpoint, by_status in sorted(self.requests.items())
+                },
+                "injected": dict(self.injected),
+            }
+
+
+shaper = LoadShaper()
+
+API_PREFIX = "/api/gst/"
+
+
+def _endpoint():
+    path = request.path
+    return path[len(API_PREFIX):] if path.startswith(API_PREFIX) else None
+
+
+@app.before_request
+def apply_load_profile():
+    endpoint = _endpoint()
+    if endpoint is None:
+        return None
+
+    # The async server has already planned and waited for this request
+    plan = request.environ.get("mock.plan")
+    if plan is None:
+        plan = shaper.plan(endpoint)
+        if plan.delay:
+            time.sleep(plan.delay)
+
+    if plan.status is not None:
+        return jsonify(plan.body), plan.status, plan.headers
+    return None
+
+
+@app.after_request
+def count_request(response):
+    endpoint = _endpoint()
+    if endpoint is not None:
+        shaper.record(endpoint, response.status_code)
+    return response
+
+
+# ---------------------------------------------------------
+# Control endpoints
+# ---------------------------------------------------------
+
+@app.route("/_mock/profile", methods=["GET"])
+def get_profile():
+    return jsonify({"active": shaper.profile, "available": sorted(PROFILES)})
+
+@app.route("/_mock/profile", methods=["PUT", "POST"])
+def set_profile():
+    body = request.get_json(silent=True) or {}
+    try:
+        # {"name": "throttled"} or a full / partial profile object
+        profile = body["name"] if set(body) == {"name"} else body
+        active = shaper.set_profile(profile)
+    except (OSError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    shaper.reset_stats()
+    return jsonify({"active": active})
+
+@app.route("/_mock/stats", methods=["GET"])
+def get_stats():
+    return jsonify(shaper.stats())
+
+@app.route("/_mock/stats", methods=["DELETE"])
+def reset_stats():
+    shaper.reset_stats()
+    return jsonify({"reset": True})
+
+
+# =========================================================
+# ASYNC SERVER MODE
+# =========================================================
+# One coroutine per connection: injected latency is awaited, so
+# thousands of slow requests do not need thousands of threads. The
+# endpoints themselves are fast and run inline through the WSGI app.
+
+async def _serve_connection(reader, writer, client):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, value = line.decode("latin-1").split(":", 1)
+                headers[name.strip()] = value.strip()
+
+            lowered = {k.lower(): v for k, v in headers.items()}
+            length = int(lowered.get("content-length") or 0)
+            body = await reader.readexactly(length) if length else b""
+
+            environ = {}
+            path = target.split("?", 1)[0]
+            if path.startswith(API_PREFIX):
+                plan = shaper.plan(path[len(API_PREFIX):])
+                if plan.delay:
+                    await asyncio.sleep(plan.delay)
+                environ["mock.plan"] = plan
+
+            response = client.open(
+                target, method=method, headers=headers, data=body, environ_base=environ
+            )
+            payload = response.get_data()
+
+            head = [f"HTTP/1.1 {response.status}"]
+            for name, value in response.headers.items():
+                if name.lower() not in ("content-length", "connection"):
+                    head.append(f"{name}: {value}")
+            head.append(f"Content-Length: {len(payload)}")
+            head.append("Connection: keep-alive")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+            await writer.drain()
+
+            if lowered.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+def run_async(host, port):
+    client = app.test_client()
+
+    async def main():
+        server = await asyncio.start_server(
+            lambda r, w: _serve_connection(r, w, client), host, port
+        )
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
 if __name__ == "__main__":
-    app.run(port=8080, debug=True)
+    parser = argparse.ArgumentParser(description="Mock GST portal")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--profile",
+        default="none",
+        help=f"one of {', '.join(sorted(PROFILES))} or a JSON profile file",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["threaded", "async", "debug"],
+        default="threaded",
+        help="threaded werkzeug server, asyncio server, or Flask debug server",
+    )
+    args = parser.parse_args()
+
+    shaper.set_profile(args.profile)
+    print(f"Mock GST server on {args.host}:{args.port} ({args.mode}, profile={shaper.profile['name']})")
+
+    if args.mode == "async":
+        run_async(args.host, args.port)
+    elif args.mode == "debug":
+        app.run(host=args.host, port=args.port, debug=True)
+    else:
+        app.run(host=args.host, port=args.port, threaded=True)
@@ -9,6 +9,7 @@ from utils.parsers.csv_parser import CSVParser
 from utils.ocr_utils import clean_ocr_text
 from utils.normalization_utils import normalize_invoice
 from utils.inference_utils import infer_missing_fields
+from utils.tracing import tracer
 
 
 class ExtractorAgent:
@@ -61,6 +62,7 @@ class ExtractorAgent:
     # Extraction
     # ---------------------------------------------------------
 
+    @tracer.traced("extract")
     def extract(self, invoice_path: Path):
         """
         Extracts one invoice file.
@@ -75,7 +77,8 @@ class ExtractorAgent:
             raise ValueError(f"Unsupported invoice type: {suffix}")
 
         parser = self.parsers[suffix]
-        raw = parser.parse(invoice_path)
+        with tracer.span(f"extract.parse{suffix}"):
+            raw = parser.parse(invoice_path)
 
         if not raw:
             raise ValueError("Empty extraction result")
@@ -101,21 +104,24 @@ class ExtractorAgent:
 
             # ---- OCR cleanup ----
             if "raw_text" in raw_invoice:
-                raw_invoice["raw_text"] = clean_ocr_text(
-                    raw_invoice.get("raw_text", "")
-                )
+                with tracer.span("extract.ocr_cleanup"):
+                    raw_invoice["raw_text"] = clean_ocr_text(
+                        raw_invoice.get("raw_text", "")
+                    )
 
             # ---- Normalize ----
-            normalized = normalize_invoice(raw_invoice)
+            with tracer.span("extract.normalize"):
+                normalized = normalize_invoice(raw_invoice)
 
             if not isinstance(normalized, dict):
                 raise TypeError("normalize_invoice must return dict")
 
             # ---- Enrich ----
-            enriched = infer_missing_fields(
-                normalized,
-                vendor_registry=self.vendor_registry
-            )
+            with tracer.span("extract.infer"):
+                enriched = infer_missing_fields(
+                    normalized,
+                    vendor_registry=self.vendor_registry
+                )
 
             enriched.setdefault("metadata", {})
             enriched["metadata"].update({
@@ -1,7 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from src.models.validation_result import ValidationResult
 from src.validation_checks.category_b import CATEGORY_B_CHECKS
 from src.validation_checks.category_d import CATEGORY_D_CHECKS
+from src.validation_checks.batch import run_check
 from src.tools.gst_portal_client import GSTPortalClient
+from src.tools.portal_transport import transport_from_config
 
 
 class GSTTDSValidatorAgent:
@@ -17,41 +21,137 @@ class GSTTDSValidatorAgent:
     - Category D: TDS Compliance
 
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+
+    All portal calls of an invoice (B2, B14, B6, B12, D10) are independent
+    and are issued concurrently; results are still collected in this
+    fixed order.
     """
 
+<<<<<<< HEAD
+    # Stop at the first GST FAIL and cancel outstanding portal calls
+    fail_fast = True
+=======
+    fail_fast = False
+>>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+
     def __init__(self, config):
         self.config = config
         self.client = GSTPortalClient(
             base_url=config["gst_api_base_url"],
             api_key=config["gst_api_key"],
+            transport=transport_from_config(config),
+        )
+
+        # Shared by all pipeline workers; bounds in-flight portal calls
+        self.portal_pool = ThreadPoolExecutor(
+            max_workers=config.get("gst_api_max_concurrency", 16),
+            thread_name_prefix="gst-portal",
         )
 
-    def validate(self, invoice_ctx):
+    def close(self):
+        """Stops the portal pool's threads (end of a pipeline run)."""
+        self.portal_pool.shutdown(wait=True, cancel_futures=True)
+
+    def validate(self, invoice_ctx, local_results=None):
         if not isinstance(invoice_ctx, dict):
             raise TypeError("GSTTDSValidatorAgent expects invoice_ctx dict")
 
         results = []
-<<<<<<< HEAD
 
         # =====================================================
-        # GST VALIDATION (FAIL-FAST)
+        # PORTAL CALLS (FAN-OUT)
         # =====================================================
+        calls = self._submit_portal_calls(invoice_ctx)
+
+        try:
+            for step_results, is_gst_fail in self._collect_portal_results(
+                calls, invoice_ctx
+            ):
+                results.extend(step_results)
+
+                if is_gst_fail and self.fail_fast:
+                    return results  # 🚨 FAIL-FAST
+        finally:
+            # No-op for finished calls; drops queued ones after a FAIL-FAST
+            for future in calls.values():
+                future.cancel()
+
+        # ---------------- Rule-Based Category B & D ----------------
+        # local_results: precomputed by BatchLocalEvaluator for this invoice
+        if local_results is not None:
+            results.extend(local_results)
+        else:
+            for check in CATEGORY_B_CHECKS + CATEGORY_D_CHECKS:
+                result = run_check(check, invoice_ctx)
+                if isinstance(result, ValidationResult):
+                    results.append(result)
 
+<<<<<<< HEAD
 =======
-        # Note: Confidence is calculated by pipeline's _compute_final_confidence()
+        # Note: Final confidence is calculated by pipeline's _compute_final_confidence()
+        # based on FAIL/REVIEW status and confidence_impact values in results
+
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-        # ---------------- GSTIN Validation (B1, B2) ----------------
+        return results
+
+    # ---------------------------------------------------------
+    # Portal fan-out
+    # ---------------------------------------------------------
+
+    def _submit_portal_calls(self, invoice_ctx):
+        """
+        Issues every portal call of the invoice at once.
+        Duplicate (hsn, date) lookups are collapsed into one call.
+        """
+        submit = self.portal_pool.submit
+        seller_gstin = invoice_ctx.get("seller_gstin")
+        irn = invoice_ctx.get("irn")
+        invoice_date = invoice_ctx.get("invoice_date")
+        pan = invoice_ctx.get("vendor_pan")
+
+        calls = {}
+
+        if seller_gstin:
+            calls["gstin"] = submit(self.client.validate_gstin, seller_gstin)
+
+        if irn:
+            calls["irn"] = submit(self.client.validate_irn, irn)
+
+        for item in invoice_ctx.get("line_items", []):
+            hsn = item.get("hsn_code")
+            key = ("hsn", hsn, invoice_date)
+            if hsn and invoice_date and key not in calls:
+                calls[key] = submit(self.client.get_hsn_rate, hsn, invoice_date)
+
+        calls["einvoice"] = submit(
+            self.client.check_einvoice_required,
+            seller_gstin,
+            invoice_date,
+            invoice_ctx.get("invoice_value") or 0,
+        )
+
+        if pan:
+            calls["206ab"] = submit(self.client.verify_206ab, pan)
+
+        return calls
+
+    def _collect_portal_results(self, calls, invoice_ctx):
+        """
+        Yields (results, is_gst_fail) per step in deterministic order,
+        waiting only for the call the current step needs.
+        """
         seller_gstin = invoice_ctx.get("seller_gstin")
+        irn = invoice_ctx.get("irn")
+        invoice_date = invoice_ctx.get("invoice_date")
+        pan = invoice_ctx.get("vendor_pan")
 
+        # ---------------- GSTIN Validation (B1, B2) ----------------
         if seller_gstin:
             try:
-                status, data = self.client.validate_gstin(seller_gstin)
-<<<<<<< HEAD
+                status, data = calls["gstin"].result()
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
                 if status != 200 or not data.get("valid"):
-                    results.append(
+                    yield [
                         ValidationResult(
                             check_id="B2",
                             category="GST",
@@ -60,14 +160,10 @@ class GSTTDSValidatorAgent:
                             confidence_impact=0.25,
                             evidence=data,
                         )
-                    )
-<<<<<<< HEAD
-                    return results  # 🚨 FAIL-FAST
+                    ], True
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
                 elif data.get("status") in ("SUSPENDED", "CANCELLED"):
-                    results.append(
+                    yield [
                         ValidationResult(
                             check_id="B2",
                             category="GST",
@@ -76,14 +172,11 @@ class GSTTDSValidatorAgent:
                             confidence_impact=0.20,
                             evidence=data,
                         )
-                    )
-<<<<<<< HEAD
-                    return results  # 🚨 FAIL-FAST
+                    ], True
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
             except Exception as e:
-                results.append(
+                # REVIEW → continue GST checks
+                yield [
                     ValidationResult(
                         check_id="B2",
                         category="GST",
@@ -91,23 +184,15 @@ class GSTTDSValidatorAgent:
                         reason=f"GSTIN validation error: {str(e)}",
                         confidence_impact=0.10,
                     )
-                )
-<<<<<<< HEAD
-                # REVIEW → continue GST checks
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+                ], False
 
         # ---------------- IRN Validation (B12, B14) ----------------
-        irn = invoice_ctx.get("irn")
         if irn:
             try:
-                status, data = self.client.validate_irn(irn)
-<<<<<<< HEAD
+                status, data = calls["irn"].result()
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
                 if status != 200 or not data.get("valid"):
-                    results.append(
+                    yield [
                         ValidationResult(
                             check_id="B14",
                             category="GST",
@@ -116,14 +201,10 @@ class GSTTDSValidatorAgent:
                             confidence_impact=0.15,
                             evidence=data,
                         )
-                    )
-<<<<<<< HEAD
-                    return results  # 🚨 FAIL-FAST
+                    ], True
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
             except Exception as e:
-                results.append(
+                yield [
                     ValidationResult(
                         check_id="B14",
                         category="GST",
@@ -131,13 +212,10 @@ class GSTTDSValidatorAgent:
                         reason=f"IRN validation error: {str(e)}",
                         confidence_impact=0.10,
                     )
-                )
+                ], False
 
         # ---------------- HSN Rate Validation (B4, B6) ----------------
-        invoice_date = invoice_ctx.get("invoice_date")
-        line_items = invoice_ctx.get("line_items", [])
-
-        for item in line_items:
+        for item in invoice_ctx.get("line_items", []):
             hsn = item.get("hsn_code")
             applied_igst = item.get("igst_rate")
 
@@ -145,11 +223,11 @@ class GSTTDSValidatorAgent:
                 continue
 
             try:
-                status, rate_data = self.client.get_hsn_rate(hsn, invoice_date)
+                status, rate_data = calls[("hsn", hsn, invoice_date)].result()
                 expected_igst = rate_data.get("rate", {}).get("igst")
 
                 if status != 200 or expected_igst is None:
-                    results.append(
+                    yield [
                         ValidationResult(
                             check_id="B6",
                             category="GST",
@@ -158,13 +236,10 @@ class GSTTDSValidatorAgent:
                             confidence_impact=0.10,
                             evidence=rate_data,
                         )
-                    )
-<<<<<<< HEAD
+                    ], False
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
                 elif applied_igst != expected_igst:
-                    results.append(
+                    yield [
                         ValidationResult(
                             check_id="B6",
                             category="GST",
@@ -173,14 +248,10 @@ class GSTTDSValidatorAgent:
                             confidence_impact=0.10,
                             evidence=rate_data,
                         )
-                    )
-<<<<<<< HEAD
-                    return results  # 🚨 FAIL-FAST
+                    ], True
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
             except Exception as e:
-                results.append(
+                yield [
                     ValidationResult(
                         check_id="B6",
                         category="GST",
@@ -188,19 +259,14 @@ class GSTTDSValidatorAgent:
                         reason=f"HSN validation error: {str(e)}",
                         confidence_impact=0.10,
                     )
-                )
+                ], False
 
         # ---------------- E-Invoice Requirement (B12) ----------------
         try:
-            invoice_value = invoice_ctx.get("invoice_value") or 0
-            status, einv = self.client.check_einvoice_required(
-                seller_gstin,
-                invoice_date,
-                invoice_value,
-            )
+            status, einv = calls["einvoice"].result()
 
             if status == 200 and einv.get("required") and not irn:
-                results.append(
+                yield [
                     ValidationResult(
                         check_id="B12",
                         category="GST",
@@ -209,14 +275,10 @@ class GSTTDSValidatorAgent:
                         confidence_impact=0.15,
                         evidence=einv,
                     )
-                )
-<<<<<<< HEAD
-                return results  # 🚨 FAIL-FAST
+                ], True
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         except Exception as e:
-            results.append(
+            yield [
                 ValidationResult(
                     check_id="B12",
                     category="GST",
@@ -224,21 +286,14 @@ class GSTTDSValidatorAgent:
                     reason=f"E-invoice API error: {str(e)}",
                     confidence_impact=0.10,
                 )
-            )
+            ], False
 
-<<<<<<< HEAD
-        # =====================================================
-        # TDS VALIDATION (ONLY IF GST PASSED)
-        # =====================================================
-=======
         # ---------------- Section 206AB (D10) ----------------
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-        pan = invoice_ctx.get("vendor_pan")
         if pan:
             try:
-                status, data = self.client.verify_206ab(pan)
+                status, data = calls["206ab"].result()
                 if status == 200 and data.get("section_206ab_applicable"):
-                    results.append(
+                    yield [
                         ValidationResult(
                             check_id="D10",
                             category="TDS",
@@ -247,9 +302,9 @@ class GSTTDSValidatorAgent:
                             confidence_impact=0.10,
                             evidence=data,
                         )
-                    )
+                    ], False
             except Exception as e:
-                results.append(
+                yield [
                     ValidationResult(
                         check_id="D10",
                         category="TDS",
@@ -257,29 +312,4 @@ class GSTTDSValidatorAgent:
                         reason=f"TDS verification error: {str(e)}",
                         confidence_impact=0.10,
                     )
-                )
-
-        # ---------------- Rule-Based Category B & D ----------------
-        for check in CATEGORY_B_CHECKS + CATEGORY_D_CHECKS:
-            try:
-                result = check.validate(invoice_ctx)
-                if isinstance(result, ValidationResult):
-                    results.append(result)
-            except Exception as e:
-                results.append(
-                    ValidationResult(
-                        check_id=check.check_id,
-                        category=check.category,
-                        status="REVIEW",
-                        reason=f"Rule execution error: {str(e)}",
-                        confidence_impact=0.10,
-                    )
-                )
-
-<<<<<<< HEAD
-=======
-        # Note: Final confidence is calculated by pipeline's _compute_final_confidence()
-        # based on FAIL/REVIEW status and confidence_impact values in results
-
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-        return results
+                ], False
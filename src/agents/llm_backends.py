@@ -0,0 +1,179 @@
+import os
+
+import requests
+from dotenv import load_dotenv
+
+from src.agents.llm_scheduler import (
+    LLMScheduler, PRIORITY_DEFAULT, estimate_tokens, parse_reset
+)
+
+load_dotenv()
+
+
+class LLMBackendError(RuntimeError):
+    """A backend could not answer; the router may try another one."""
+
+
+class LLMRateLimited(LLMBackendError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# ---------------------------------------------------------
+# Groq (hosted, OpenAI-compatible chat API)
+# ---------------------------------------------------------
+
+class GroqBackend:
+    """
+    One attempt per call: retries and failover belong to the router.
+    Calls go through the Groq scheduler (request/token budgets); when
+    the budget cannot admit a call within `acquire_timeout` seconds it
+    raises LLMRateLimited so the router fails over instead of waiting.
+    """
+
+    name = "groq"
+    local = False
+    url = "https://api.groq.com/openai/v1/chat/completions"
+
+    def __init__(self, api_key, model, timeout=30, scheduler=None, acquire_timeout=1.0):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.acquire_timeout = acquire_timeout
+
+    @classmethod
+    def from_config(cls, config):
+        """None when no GROQ_API_KEY is configured."""
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            return None
+
+        router_cfg = config.get("llm_router", {})
+        groq_cfg = config.get("groq", {})
+        return cls(
+            api_key,
+            model=groq_cfg.get("model", router_cfg.get("groq_model")),
+            timeout=groq_cfg.get("timeout", router_cfg.get("groq_timeout", 30)),
+            scheduler=LLMScheduler.shared(config, cls.name),
+            acquire_timeout=groq_cfg.get(
+                "acquire_timeout_sec", router_cfg.get("groq_acquire_timeout_sec", 1.0)
+            ),
+        )
+
+    def complete(self, prompt, max_tokens=800, priority=PRIORITY_DEFAULT):
+        if self.scheduler is not None:
+            budget = estimate_tokens(prompt) + max_tokens
+            admitted = self.scheduler.acquire(
+                budget, priority, timeout=self.acquire_timeout
+            )
+            if not admitted:
+                raise LLMRateLimited(
+                    "groq: request budget exhausted",
+                    self.scheduler.wait_estimate(budget),
+                )
+
+        try:
+            response = requests.post(
+                self.url,
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": "You are a strict compliance reasoning assistant."
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": max_tokens,
+                },
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=self.timeout,
+            )
+        except requests.exceptions.RequestException as e:
+            raise LLMBackendError(f"groq: {e}") from e
+
+        if self.scheduler is not None:
+            self.scheduler.observe(response.headers)
+
+        if response.status_code == 429:
+            retry_after = (
+                self.scheduler.backoff(response.headers, 1)
+                if self.scheduler is not None
+                else parse_reset(response.headers.get("retry-after"))
+            )
+            raise LLMRateLimited("groq: rate limited", retry_after)
+
+        if response.status_code >= 400:
+            raise LLMBackendError(f"groq: HTTP {response.status_code}")
+
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            # Malformed body: let the router fail over like any other error
+            raise LLMBackendError(f"groq: unexpected response ({e!r})") from e
+
+
+# ---------------------------------------------------------
+# Ollama (local)
+# ---------------------------------------------------------
+
+class OllamaBackend:
+    """Local model; not subject to the hosted request/token budgets."""
+
+    name = "ollama"
+    local = True
+
+    def __init__(self, base_url, model, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config):
+        router_cfg = config.get("llm_router", {})
+        ollama_cfg = config.get("ollama", {})
+        base_url = ollama_cfg.get("base_url", router_cfg.get("ollama_base_url"))
+        if not base_url:
+            return None
+
+        return cls(
+            base_url,
+            model=ollama_cfg.get("model", router_cfg.get("ollama_model")),
+            timeout=ollama_cfg.get("timeout", router_cfg.get("ollama_timeout", 60)),
+        )
+
+    def complete(self, prompt, max_tokens=None, priority=PRIORITY_DEFAULT):
+        body = {"model": self.model, "prompt": prompt, "stream": False}
+        if max_tokens:
+            body["options"] = {"num_predict": max_tokens}
+
+        try:
+            r = requests.post(
+                f"{self.base_url}/api/generate", json=body, timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            raise LLMBackendError(f"ollama: {e}") from e
+
+        if r.status_code == 429:
+            raise LLMRateLimited(
+                "ollama: busy", parse_reset(r.headers.get("retry-after"))
+            )
+        if r.status_code >= 400:
+            raise LLMBackendError(f"ollama: HTTP {r.status_code}")
+
+        try:
+            return r.json().get("response", "")
+        except (ValueError, AttributeError) as e:
+            raise LLMBackendError(f"ollama: unexpected response ({e!r})") from e
+
+
+BACKENDS = {
+    "groq": GroqBackend,
+    "ollama": OllamaBackend,
+}
@@ -0,0 +1,264 @@
+import itertools
+import logging
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.agents.llm_scheduler import PRIORITY_DEFAULT, priority_for
+from utils.logging_utils import fields
+
+
+logger = logging.getLogger(__name__)
+
+
+SECTION_RE = re.compile(r"^\s*#{2,4}\s*INVOICE\s+(\S+?)\s*:?\s*$", re.MULTILINE)
+
+# Sorts after every request, so close() drains what is queued first
+_STOP_PRIORITY = float("inf")
+
+
+def build_batch_prompt(items):
+    """One prompt with a section per (invoice_id, context, conflicts)."""
+    sections = "\n\n".join(
+        f"### INVOICE {invoice_id}\nContext:\n{context}\n\nConflicts:\n{conflicts}"
+        for invoice_id, context, conflicts in items
+    )
+    return f"""
+You are a compliance reasoning assistant.
+
+Instructions:
+- For EACH invoice below, explain BOTH interpretations of its conflicts neutrally
+- Do NOT decide which is correct
+- Do NOT hallucinate
+- Use only provided data
+- Answer with one section per invoice, in the same order, each starting
+  with a header line of exactly this form:
+### INVOICE <invoice_id>
+
+{sections}
+"""
+
+
+def split_batch_answer(text, invoice_ids):
+    """
+    {invoice_id: section text} for every requested id found in the answer.
+    Sections for ids that were not requested are ignored.
+    """
+    wanted = set(invoice_ids)
+    matches = list(SECTION_RE.finditer(text or ""))
+
+    answers = {}
+    for i, match in enumerate(matches):
+        invoice_id = match.group(1)
+        if invoice_id not in wanted or invoice_id in answers:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if body:
+            answers[invoice_id] = body
+    return answers
+
+
+class LLMBatcher:
+    """
+    LLM Request Batcher
+    -------------------
+    Collects explanation requests from the pipeline workers and sends
+    them as one multi-invoice prompt:
+
+    - requests wait in a priority queue; the most urgent are batched first
+    - a batch closes after `window_sec` or at `max_batch_size` items
+    - batches are sent on a pool of `dispatch_workers` threads, so a
+      slow LLM call does not hold back the next batch
+    - the answer is split back per invoice_id
+    - invoices missing from the answer (or a failed batch call) fall
+      back to one explain() call each
+    - a batch is scheduled at the priority of its most urgent invoice
+    """
+
+    def __init__(
+        self,
+        agent,
+        max_batch_size=8,
+        window_sec=0.05,
+        max_tokens_per_invoice=400,
+        dispatch_workers=4,
+    ):
+        self.agent = agent
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window_sec = window_sec
+        self.max_tokens_per_invoice = max_tokens_per_invoice
+
+        self.stats = {"batches": 0, "batched_invoices": 0, "fallbacks": 0}
+        self._stats_lock = threading.Lock()
+
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        # Guards _closed with the put, so nothing is queued behind the stop entry
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, int(dispatch_workers)),
+            thread_name_prefix="llm-batch",
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="llm-batcher", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, agent, config):
+        llm_cfg = config.get("llm", {})
+        return cls(
+            agent,
+            max_batch_size=llm_cfg.get("batch_max_size", 8),
+            window_sec=llm_cfg.get("batch_window_sec", 0.05),
+            max_tokens_per_invoice=llm_cfg.get("batch_max_tokens_per_invoice", 400),
+            dispatch_workers=llm_cfg.get("batch_dispatch_workers", 4),
+        )
+
+    # ---------------------------------------------------------
+    # Producer API
+    # ---------------------------------------------------------
+
+    def submit(self, invoice_id, context, conflicts, priority=PRIORITY_DEFAULT):
+        """Future resolving to the explanation text for one invoice."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("LLMBatcher is closed")
+            self._queue.put(
+                (priority, next(self._seq), future, (invoice_id, context, conflicts))
+            )
+        return future
+
+    def explain(self, invoice_id, context, conflicts, priority=PRIORITY_DEFAULT):
+        return self.submit(invoice_id, context, conflicts, priority).result()
+
+    def close(self):
+        """Sends what is queued, then stops the collector and the pool."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP_PRIORITY, next(self._seq), None, None))
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+        # Nothing is left after the stop entry; never leave a caller waiting
+        while True:
+            try:
+                _, _, future, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if future is not None and not future.done():
+                future.set_exception(RuntimeError("LLMBatcher is closed"))
+
+    # ---------------------------------------------------------
+    # Collector thread
+    # ---------------------------------------------------------
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first[2] is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.window_sec
+            stopping = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry[2] is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._pool.submit(self._dispatch, batch)
+            if stopping:
+                return
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _dispatch(self, batch):
+        answers = {}
+
+        if len(batch) > 1:
+            items = [item for _, _, _, item in batch]
+            try:
+                text = self.agent.complete(
+                    build_batch_prompt(items),
+                    max_tokens=self.max_tokens_per_invoice * len(items),
+                    priority=min(priority for priority, _, _, _ in batch),
+                )
+                answers = split_batch_answer(text, [item[0] for item in items])
+            except Exception as e:
+                logger.warning(
+                    "Batched LLM call failed: %s", e, extra=fields(invoices=len(items))
+                )
+
+            self._count(batches=1, batched_invoices=len(answers))
+
+        for priority, _, future, (invoice_id, context, conflicts) in batch:
+            if invoice_id in answers:
+                future.set_result(answers[invoice_id])
+                continue
+
+            if len(batch) > 1:
+                self._count(fallbacks=1)
+            try:
+                future.set_result(self.agent.explain(context, conflicts, priority))
+            except Exception as e:
+                future.set_exception(e)
+
+
+# ---------------------------------------------------------
+# MCP tool wrapper
+# ---------------------------------------------------------
+
+def explain_tool(agent, batcher):
+    """
+    MCP tool around agent.explain(); concurrent calls (and call_many)
+    are coalesced by the batcher into multi-invoice prompts.
+    """
+
+    def _request(payload):
+        context = payload.get("invoice_context") or payload.get("context", {})
+        conflicts = payload.get("conflicts", [])
+        priority = priority_for(payload.get("decision"))
+        invoice_id = context.get("invoice_id") if isinstance(context, dict) else None
+        return invoice_id, context, conflicts, priority
+
+    def run(payload):
+        invoice_id, context, conflicts, priority = _request(payload)
+        if invoice_id is None or batcher.max_batch_size == 1:
+            return agent.explain(context, conflicts, priority)
+        return batcher.explain(str(invoice_id), context, conflicts, priority)
+
+    def call_many(payloads):
+        futures = []
+        for payload in payloads:
+            invoice_id, context, conflicts, priority = _request(payload)
+            if invoice_id is None:
+                future = Future()
+                future.set_result(agent.explain(context, conflicts, priority))
+            else:
+                future = batcher.submit(str(invoice_id), context, conflicts, priority)
+            futures.append(future)
+        return [f.result() for f in futures]
+
+    run.call_many = call_many
+    run.close = batcher.close
+    return run
@@ -1,11 +1,18 @@
 <<<<<<< HEAD
+import logging
 import os
 import time
 import requests
 from dotenv import load_dotenv
 
+from src.agents.llm_scheduler import (
+    LLMScheduler, PRIORITY_DEFAULT, estimate_tokens, trim_prompt
+)
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class LLMResolverAgent:
     def __init__(self, config):
         self.api_key = os.getenv("GROQ_API_KEY")
@@ -17,18 +24,24 @@ class LLMResolverAgent:
         self.max_retries = config["groq"].get("max_retries", 5)
 
         self.url = "https://api.groq.com/openai/v1/chat/completions"
+        self.scheduler = LLMScheduler.shared(config, "groq")
 =======
 
 import requests
 
+from src.agents.llm_scheduler import (
+    LLMScheduler, PRIORITY_DEFAULT, estimate_tokens, trim_prompt
+)
+
 class LLMResolverAgent:
     def __init__(self, config):
         self.url = config["ollama"]["base_url"]
         self.model = config["ollama"]["model"]
         self.timeout = config["ollama"]["timeout"]
+        self.scheduler = LLMScheduler.shared(config, "ollama")
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 
-    def explain(self, context, conflicts):
+    def explain(self, context, conflicts, priority=PRIORITY_DEFAULT):
         prompt = f"""
 You are a compliance reasoning assistant.
 <<<<<<< HEAD
@@ -49,8 +62,13 @@ Context:
 Conflicts:
 {conflicts}
 """
+        return self.complete(prompt, priority=priority)
 
 <<<<<<< HEAD
+    def complete(self, prompt, max_tokens=800, priority=PRIORITY_DEFAULT):
+        prompt = trim_prompt(prompt, self.scheduler.max_prompt_tokens)
+        budget = estimate_tokens(prompt) + max_tokens
+
         payload = {
             "model": self.model,
             "messages": [
@@ -64,7 +82,7 @@ Conflicts:
                 }
             ],
             "temperature": 0.1,
-            "max_tokens": 800
+            "max_tokens": max_tokens
         }
 
         headers = {
@@ -73,6 +91,8 @@ Conflicts:
         }
 
         for attempt in range(1, self.max_retries + 1):
+            # Groq budget + priority order across all worker threads
+            self.scheduler.acquire(budget, priority)
             try:
                 response = requests.post(
                     self.url,
@@ -80,12 +100,15 @@ Conflicts:
                     headers=headers,
                     timeout=self.timeout
                 )
+                self.scheduler.observe(response.headers)
 
-                # Handle rate limit explicitly
+                # Rate limit: pause every caller until the provider's reset
                 if response.status_code == 429:
-                    wait_time = min(2 ** attempt, 30)
-                    print(f"[Groq Rate Limit] Retry {attempt}/{self.max_retries} in {wait_time}s")
-                    time.sleep(wait_time)
+                    wait_time = self.scheduler.backoff(response.headers, attempt)
+                    logger.warning(
+                        "Groq rate limit: retry %d/%d after %.1fs",
+                        attempt, self.max_retries, wait_time,
+                    )
                     continue
 
                 response.raise_for_status()
@@ -101,9 +124,16 @@ Conflicts:
 
         raise RuntimeError("Groq API call failed unexpectedly")
 =======
+    def complete(self, prompt, max_tokens=None, priority=PRIORITY_DEFAULT):
+        prompt = trim_prompt(prompt, self.scheduler.max_prompt_tokens)
+        body = {"model": self.model, "prompt": prompt, "stream": False}
+        if max_tokens:
+            body["options"] = {"num_predict": max_tokens}
+
+        self.scheduler.acquire(estimate_tokens(prompt) + (max_tokens or 0), priority)
         r = requests.post(
             f"{self.url}/api/generate",
-            json={"model": self.model, "prompt": prompt},
+            json=body,
             timeout=self.timeout
         )
         r.raise_for_status()
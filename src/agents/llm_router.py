@@ -0,0 +1,214 @@
+import threading
+import time
+from collections import deque
+
+from src.agents.llm_backends import BACKENDS, LLMBackendError, LLMRateLimited
+from src.agents.llm_scheduler import PRIORITY_DEFAULT, estimate_tokens, trim_prompt
+
+
+def build_explain_prompt(context, conflicts):
+    return f"""
+You are a compliance reasoning assistant.
+
+Instructions:
+- Explain BOTH interpretations neutrally
+- Do NOT decide which is correct
+- Do NOT hallucinate
+- Use only provided data
+
+Context:
+{context}
+
+Conflicts:
+{conflicts}
+"""
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class BackendProfile:
+    """Rolling latency / error window for one backend."""
+
+    def __init__(self, window=50):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)     # True = error
+        self.cooldown_until = 0.0
+        self.probing = False
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, latency=None, error=False):
+        self.calls += 1
+        self.outcomes.append(error)
+        if error:
+            self.errors += 1
+        elif latency is not None:
+            self.latencies.append(latency)
+
+    def recovered(self):
+        """A probe after the cooldown succeeded: old errors no longer count."""
+        self.outcomes.clear()
+
+    def error_rate(self):
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def p50(self):
+        return _percentile(self.latencies, 0.50)
+
+    def snapshot(self):
+        p50, p95 = self.p50(), _percentile(self.latencies, 0.95)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate(), 3),
+            "p50_sec": round(p50, 3) if p50 is not None else None,
+            "p95_sec": round(p95, 3) if p95 is not None else None,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+class LLMRouter:
+    """
+    LLM Router
+    ----------
+    Routes each completion to the fastest healthy backend.
+
+    - rolling p50 latency and error rate per backend
+    - a backend that errors, times out or returns 429 cools down and
+      the request fails over to the next one
+    - once the cooldown is over one request probes the backend; success
+      clears its error window, failure starts another cooldown
+    - tiered: prompts up to `short_prompt_tokens` try local backends first
+    - backends with no samples yet are tried early, so they get a profile
+    """
+
+    def __init__(
+        self,
+        backends,
+        short_prompt_tokens=600,
+        window=50,
+        error_cooldown_sec=30,
+        max_error_rate=0.5,
+        max_prompt_tokens=None,
+    ):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+
+        self.backends = list(backends)
+        self.short_prompt_tokens = short_prompt_tokens
+        self.error_cooldown_sec = error_cooldown_sec
+        self.max_error_rate = max_error_rate
+        self.max_prompt_tokens = max_prompt_tokens
+
+        self.profiles = {b.name: BackendProfile(window) for b in self.backends}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        router_cfg = config.get("llm_router", {})
+
+        backends = []
+        for name in router_cfg.get("backends", list(BACKENDS)):
+            backend = BACKENDS[name].from_config(config)
+            if backend is not None:
+                backends.append(backend)
+
+        return cls(
+            backends,
+            short_prompt_tokens=router_cfg.get("short_prompt_tokens", 600),
+            window=router_cfg.get("latency_window", 50),
+            error_cooldown_sec=router_cfg.get("error_cooldown_sec", 30),
+            max_error_rate=router_cfg.get("max_error_rate", 0.5),
+            max_prompt_tokens=config.get("llm", {}).get("max_prompt_tokens"),
+        )
+
+    # ---------------------------------------------------------
+    # Routing
+    # ---------------------------------------------------------
+
+    def _healthy(self, backend, now):
+        profile = self.profiles[backend.name]
+        if profile.cooldown_until > now:
+            return False
+        # Past the cooldown a failing window only demotes while a probe is out
+        return profile.error_rate() < self.max_error_rate or not profile.probing
+
+    def _begin_call(self, backend):
+        """True when this call is the probe of a backend past its cooldown."""
+        with self._lock:
+            profile = self.profiles[backend.name]
+            probe = (
+                not profile.probing
+                and profile.cooldown_until <= time.monotonic()
+                and profile.error_rate() >= self.max_error_rate
+            )
+            if probe:
+                profile.probing = True
+            return probe
+
+    def candidates(self, prompt):
+        """Backends in the order they will be tried for this prompt."""
+        short = estimate_tokens(prompt) <= self.short_prompt_tokens
+        now = time.monotonic()
+
+        with self._lock:
+            def rank(backend):
+                p50 = self.profiles[backend.name].p50()
+                return (
+                    not self._healthy(backend, now),       # healthy first
+                    short and not backend.local,           # tier: local first
+                    p50 if p50 is not None else 0.0,       # then fastest
+                )
+
+            return sorted(self.backends, key=rank)
+
+    def complete(self, prompt, max_tokens=800, priority=PRIORITY_DEFAULT):
+        prompt = trim_prompt(prompt, self.max_prompt_tokens)
+        errors = []
+
+        for backend in self.candidates(prompt):
+            probe = self._begin_call(backend)
+            start = time.perf_counter()
+            try:
+                text = backend.complete(prompt, max_tokens=max_tokens, priority=priority)
+            except LLMBackendError as e:
+                self._failed(backend, e)
+                errors.append(str(e))
+                continue
+            finally:
+                if probe:
+                    with self._lock:
+                        self.profiles[backend.name].probing = False
+
+            with self._lock:
+                profile = self.profiles[backend.name]
+                if probe:
+                    profile.recovered()
+                profile.record(time.perf_counter() - start)
+            return text
+
+        raise LLMBackendError("All LLM backends failed: " + "; ".join(errors))
+
+    def _failed(self, backend, error):
+        cooldown = self.error_cooldown_sec
+        if isinstance(error, LLMRateLimited) and error.retry_after:
+            cooldown = error.retry_after
+
+        with self._lock:
+            profile = self.profiles[backend.name]
+            profile.record(error=True)
+            profile.cooldown_until = max(
+                profile.cooldown_until, time.monotonic() + cooldown
+            )
+
+    def explain(self, context, conflicts, priority=PRIORITY_DEFAULT):
+        return self.complete(build_explain_prompt(context, conflicts), priority=priority)
+
+    def stats(self):
+        with self._lock:
+            return {name: p.snapshot() for name, p in self.profiles.items()}
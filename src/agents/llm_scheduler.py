@@ -0,0 +1,233 @@
+import heapq
+import itertools
+import re
+import threading
+import time
+
+
+# Lower value is served first
+PRIORITIES = {
+    "ESCALATE": 0,
+    "APPROVE_WITH_REVIEW": 1,
+}
+PRIORITY_DEFAULT = 2
+
+CHARS_PER_TOKEN = 4
+TRIM_MARKER = "\n...[trimmed]...\n"
+
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def priority_for(decision):
+    return PRIORITIES.get(decision, PRIORITY_DEFAULT)
+
+
+def estimate_tokens(text):
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def trim_prompt(prompt, max_tokens):
+    """
+    Cuts the middle of an over-long prompt: instructions (head) and the
+    last conflicts/sections (tail) are kept.
+    """
+    if not max_tokens or estimate_tokens(prompt) <= max_tokens:
+        return prompt
+
+    budget = max_tokens * CHARS_PER_TOKEN - len(TRIM_MARKER)
+    head = int(budget * 0.6)
+    tail = budget - head
+    return prompt[:head] + TRIM_MARKER + prompt[-tail:]
+
+
+def parse_reset(value):
+    """'1m2.5s' / '850ms' / '7' -> seconds (None when unparseable)."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * DURATION_UNITS[unit] for n, unit in parts)
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute` / 60 per second."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount):
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """
+    LLM Request Scheduler (one per provider)
+    ----------------------------------------
+    Every LLM HTTP call passes its provider's acquire() first:
+
+    - requests-per-minute and tokens-per-minute budgets (token buckets)
+    - waiting callers are served by priority, then arrival
+      (ESCALATE before APPROVE_WITH_REVIEW before the rest)
+    - a 429 or exhausted x-ratelimit-remaining-* header blocks all
+      callers until the provider's reset time, instead of each thread
+      sleeping and retrying on its own
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rpm=None, tpm=None, max_prompt_tokens=None):
+        self.max_prompt_tokens = max_prompt_tokens
+        self._requests = _Bucket(rpm) if rpm else None
+        self._tokens = _Bucket(tpm) if tpm else None
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+
+        self.stats = {
+            "granted": 0, "rate_limited": 0, "timed_out": 0, "wait_sec": 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config, provider):
+        llm_cfg = config.get("llm", {})
+        limits = llm_cfg.get("provider_limits", {}).get(provider) or {}
+        return cls(
+            rpm=limits.get("rpm"),
+            tpm=limits.get("tpm"),
+            max_prompt_tokens=llm_cfg.get("max_prompt_tokens"),
+        )
+
+    @classmethod
+    def shared(cls, config, provider):
+        """
+        The process-wide scheduler for `provider` (created from the first
+        config seen). Providers never share budgets or 429 pauses.
+        """
+        with cls._shared_lock:
+            if provider not in cls._shared:
+                cls._shared[provider] = cls.from_config(config, provider)
+            return cls._shared[provider]
+
+    # ---------------------------------------------------------
+    # Admission
+    # ---------------------------------------------------------
+
+    def acquire(self, tokens=1, priority=PRIORITY_DEFAULT, timeout=None):
+        """
+        Blocks until this call may be sent and returns True. With a
+        `timeout` it returns False instead once the call cannot be
+        admitted within that many seconds.
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+
+            while True:
+                now = time.monotonic()
+                delay = self._delay(now, tokens) if self._waiting[0] == ticket else None
+
+                if delay == 0.0:
+                    heapq.heappop(self._waiting)
+                    if self._requests:
+                        self._requests.take(1)
+                    if self._tokens:
+                        self._tokens.take(tokens)
+                    self.stats["granted"] += 1
+                    self.stats["wait_sec"] += now - start
+                    self._cond.notify_all()
+                    return True
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0 or (delay is not None and delay > remaining):
+                        self._waiting.remove(ticket)
+                        heapq.heapify(self._waiting)
+                        self.stats["timed_out"] += 1
+                        self._cond.notify_all()
+                        return False
+                    delay = remaining if delay is None else delay
+
+                self._cond.wait(timeout=delay)
+
+    def wait_estimate(self, tokens=1):
+        """Seconds until the budgets could admit a call of `tokens`."""
+        with self._cond:
+            return self._delay(time.monotonic(), tokens)
+
+    def _delay(self, now, tokens):
+        delay = max(0.0, self._blocked_until - now)
+        if self._requests:
+            self._requests.refill(now)
+            delay = max(delay, self._requests.wait_for(1))
+        if self._tokens:
+            self._tokens.refill(now)
+            delay = max(delay, self._tokens.wait_for(tokens))
+        return delay
+
+    def _block_for(self, seconds):
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    # ---------------------------------------------------------
+    # Provider feedback
+    # ---------------------------------------------------------
+
+    def observe(self, headers):
+        """Pauses admission when the provider reports an exhausted budget."""
+        headers = headers or {}
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is not None and reset and str(remaining).strip() == "0":
+                self._block_for(reset)
+
+    def backoff(self, headers, attempt):
+        """
+        Records a 429: blocks every caller until the reset time from
+        Retry-After / x-ratelimit-reset-* (exponential when absent).
+        Returns the delay in seconds.
+        """
+        headers = headers or {}
+        resets = [
+            parse_reset(headers.get(name))
+            for name in (
+                "retry-after",
+                "x-ratelimit-reset-requests",
+                "x-ratelimit-reset-tokens",
+            )
+        ]
+        resets = [r for r in resets if r]
+        delay = max(resets) if resets else min(2 ** attempt, 30)
+
+        self.stats["rate_limited"] += 1
+        self._block_for(delay)
+        return delay
+
+    def pending(self):
+        with self._cond:
+            return len(self._waiting)
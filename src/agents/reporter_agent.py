@@ -1,5 +1,6 @@
 from typing import List
 from src.models.validation_result import ValidationResult
+from utils.tracing import tracer
 
 
 # =====================================================
@@ -31,6 +32,7 @@ class ReporterAgent:
         """
         self.config = config
 
+    @tracer.traced("report")
     def generate(
         self,
         invoice_ctx: dict,
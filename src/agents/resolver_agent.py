@@ -1,10 +1,27 @@
 import json
+import logging
+import threading
+import time
 from src.mcp.server import MCPServer
 <<<<<<< HEAD
 from src.mcp.tools.groq_api_tool import groq_resolver_tool
+=======
+from src.mcp.tools.ollama_tool import ollama_resolver_tool
+>>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+from src.mcp.tools.llm_router_tool import llm_router_tool
 from src.storage.decision_store import DecisionStore
+from src.storage.explanation_cache import ExplanationCache, explanation_signature
+from src.orchestration.explanation_stage import ExplanationStage
+from src.agents.llm_scheduler import priority_for
+from src.agents.template_explainer import TemplateExplainer
+from utils.tracing import tracer
+from utils.logging_utils import fields
+
+
+logger = logging.getLogger(__name__)
 
 
+<<<<<<< HEAD
 def normalize_llm_explanation(text):
     """
     Normalize LLM free-form explanation into a list of
@@ -33,10 +50,6 @@ def normalize_llm_explanation(text):
 
 
 =======
-from src.mcp.tools.ollama_tool import ollama_resolver_tool
-from src.storage.decision_store import DecisionStore
-
-
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 class ResolverAgent:
     """
@@ -60,7 +73,7 @@ class ResolverAgent:
         self.history = self._load_history()
 
         # ---- SQLite audit store ----
-        self.db = DecisionStore(config["sqlite"]["db_path"])
+        self.db = DecisionStore.from_config(config)
 
 <<<<<<< HEAD
         # ---- MCP + LLM ----
@@ -68,20 +81,45 @@ class ResolverAgent:
         # ---- MCP + LLM Call ----
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         self.mcp = None
+        self.llm_tool = None
+        self.explanation_cache = None
+        self.explanation_stage = None
+
+        self.template_explainer = None
+        if config.get("llm", {}).get("template_explainer", True):
+            self.template_explainer = TemplateExplainer()
+        self.llm_model = (config.get("groq") or config.get("ollama") or {}).get("model")
+        if config.get("llm_router", {}).get("enabled"):
+            # Any backend may answer; cache entries are shared between them
+            self.llm_model = "router"
+
         if (
             config["agentic"]["use_mcp"]
             and config["agentic"]["use_llm_resolver"]
         ):
-            self.mcp = MCPServer()
-            self.mcp.register_tool(
+            if config.get("llm", {}).get("cache_enabled", True):
+                self.explanation_cache = ExplanationCache.from_config(config)
+
+            self.mcp = MCPServer(config)
+            if config.get("llm_router", {}).get("enabled"):
+                # One tool in front of every configured backend
+                self.llm_tool = "llm.reason"
+                self.mcp.register_tool(self.llm_tool, llm_router_tool(config))
+            else:
 <<<<<<< HEAD
-                "groq.reason",
-                groq_resolver_tool(config)
+                self.llm_tool = "groq.reason"
+                self.mcp.register_tool(self.llm_tool, groq_resolver_tool(config))
 =======
-                "ollama.reason",
-                ollama_resolver_tool(config)
+                self.llm_tool = "ollama.reason"
+                self.mcp.register_tool(self.llm_tool, ollama_resolver_tool(config))
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-            )
+
+            # Explanations never change the decision; optionally run
+            # them after the report is returned
+            if config.get("llm", {}).get("deferred", False):
+                self.explanation_stage = ExplanationStage.from_config(
+                    self._llm_explain, config
+                )
 
     def _load_history(self):
         history = []
@@ -134,7 +172,94 @@ class ResolverAgent:
         return conflicts
 
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+    def _cached_explanation(self, invoice_id, conflicts, failed, review_flags):
+        """(cache_key, cached explanation or None) for this conflict signature."""
+        if self.explanation_cache is None:
+            return None, None
+
+        key = explanation_signature(
+            conflicts,
+            [r.check_id for r in failed],
+            [r.check_id for r in review_flags],
+            self.llm_model,
+        )
+        cached = self.explanation_cache.get(key, invoice_id)
+        tracer.hit("llm.explanation_cache", cached is not None)
+        return key, cached
+
+    def _llm_explain(self, invoice_id, payload, cache_key=None):
+        """Calls the LLM tool; returns the explanation or None on failure."""
+        try:
+            with tracer.span("resolve.llm"):
+                explanation = self.mcp.call_tool(self.llm_tool, payload)
+<<<<<<< HEAD
+            explanation = normalize_llm_explanation(explanation)
+=======
+>>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+        except Exception as llm_error:
+            logger.warning(
+                "LLM resolver failed: %s", llm_error, extra=fields(invoice_id=invoice_id)
+            )
+            return None
+
+        if explanation and cache_key:
+            self.explanation_cache.put(cache_key, explanation, invoice_id)
+        return explanation
+
+    def attach_explanation(self, report, resolution, on_explanation=None):
+        """
+        Queues a deferred explanation for a written report; it is passed
+        to on_explanation(invoice_id, explanation) (e.g. the sink's
+        add_explanation) and stored in report_explanations.
+        """
+        request = resolution.get("llm_request")
+        if request and self.explanation_stage is not None:
+            self.explanation_stage.submit(
+                report.get("invoice_id"),
+                request,
+                self.db.run_id,
+                priority=priority_for(resolution.get("decision")),
+                on_done=on_explanation,
+            )
+
+    def pending_explanations(self):
+        if self.explanation_stage is None:
+            return 0
+        return self.explanation_stage.pending()
+
+    def close(self, on_explanations_done=None):
+        """
+        Commits pending decisions and releases the decision store. The
+        explanation stage and the MCP tools it uses are shut down once
+        deferred explanations finish, without blocking the caller;
+        on_explanations_done() is called at that point.
+        """
+        self.db.close()
+
+        if self.explanation_stage is None:
+            if self.mcp is not None:
+                self.mcp.close()
+            if on_explanations_done is not None:
+                on_explanations_done()
+            return
+
+        def _close_llm():
+            self.explanation_stage.close()
+            if self.mcp is not None:
+                self.mcp.close()
+            if on_explanations_done is not None:
+                try:
+                    on_explanations_done()
+                except Exception as e:
+                    logger.error("Writing deferred explanations failed: %s", e)
+
+        threading.Thread(
+            target=_close_llm, name="llm-explain-close", daemon=True
+        ).start()
+
+    @tracer.traced("resolve")
     def resolve(self, invoice_ctx, validation_payload):
+        rules_start = time.perf_counter()
         results = validation_payload["results"]
         confidence = validation_payload["final_confidence"]
 
@@ -194,38 +319,62 @@ class ResolverAgent:
         # LLM RESOLVER (AI SUMMARY)
         # =====================================================
         llm_explanation = None
+        llm_request = None
 
         # ✅ Allow LLM on ESCALATE even if conflicts are minimal
-        if (conflicts or decision == "ESCALATE") and self.mcp:
-            try:
-                raw_llm_output = self.mcp.call_tool(
-                    "groq.reason",
+        wants_explanation = bool(conflicts or decision == "ESCALATE")
 =======
         # ---- LLM resolver 
         llm_explanation = None
-        if conflicts and self.mcp:
-            try:
-                llm_explanation = self.mcp.call_tool(
-                    "ollama.reason",
+        llm_request = None
+        wants_explanation = bool(conflicts)
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-                    {
-                        "invoice_context": {
-                            "invoice_id": invoice_id,
-                            "vendor_gstin": invoice_ctx.get("vendor_gstin"),
-                            "amount": invoice_ctx.get("total_amount"),
-                        },
-                        "conflicts": conflicts,
-                    }
+
+        tracer.record("resolve.rules", time.perf_counter() - rules_start)
+
+        # Known conflict classes are explained locally, without the LLM
+        if wants_explanation and self.template_explainer is not None:
+            with tracer.span("resolve.template"):
+                llm_explanation = self.template_explainer.explain(
+                    conflicts, failed, review_flags
                 )
-<<<<<<< HEAD
+            tracer.hit("llm.template", llm_explanation is not None)
 
-                llm_explanation = normalize_llm_explanation(raw_llm_output)
+        needs_llm = (
+            wants_explanation and llm_explanation is None and self.mcp is not None
+        )
 
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-            except Exception as llm_error:
-                print(f"[WARNING] LLM resolver failed: {llm_error}")
-                llm_explanation = None
+        cache_key = None
+        if needs_llm:
+            cache_key, llm_explanation = self._cached_explanation(
+                invoice_id, conflicts, failed, review_flags
+            )
+
+        if needs_llm and llm_explanation is None:
+            invoice_context = {"invoice_id": invoice_id}
+            # A cached explanation is reused for other invoices (only the
+            # id is swapped), so cacheable prompts carry no other invoice data
+            if cache_key is None:
+                invoice_context.update({
+                    "vendor_gstin": invoice_ctx.get("vendor_gstin"),
+                    "amount": invoice_ctx.get("total_amount"),
+                })
+
+            llm_request = (
+                invoice_id,
+                {
+                    "invoice_context": invoice_context,
+                    "conflicts": conflicts,
+                    # Scheduling priority only; never changes the decision
+                    "decision": decision,
+                },
+                cache_key,
+            )
+
+            # Deferred: attach_explanation() queues it once the report exists
+            if self.explanation_stage is None:
+                llm_explanation = self._llm_explain(*llm_request)
+                llm_request = None
 
 <<<<<<< HEAD
         # =====================================================
@@ -245,24 +394,30 @@ class ResolverAgent:
 =======
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         # ---- Persist decision ----
-        self.db.log_decision(
-            invoice_id=invoice_id,
-            decision=decision,
-            confidence=confidence
-        )
+        with tracer.span("resolve.db_write"):
+            self.db.log_decision(
+                invoice_id=invoice_id,
+                decision=decision,
+                confidence=confidence,
+                vendor=invoice_ctx.get("seller_gstin"),
+                invoice_date=invoice_ctx.get("invoice_date")
+            )
 <<<<<<< HEAD
 
         # ---- DEBUG ----
 =======
         # ---- DEBUG DECISION SUMMARY ----
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-        print(
-            f"[DECISION DEBUG] Invoice={invoice_id} | "
-            f"Decision={decision} | "
-            f"Confidence={confidence} | "
-            f"Failed={len(failed)} | "
-            f"Review={len(review_flags)} | "
-            f"Conflicts={len(conflicts)}"
+        logger.debug(
+            "Decision",
+            extra=fields(
+                invoice_id=invoice_id,
+                decision=decision,
+                confidence=confidence,
+                failed=len(failed),
+                review=len(review_flags),
+                conflicts=len(conflicts),
+            ),
         )
 <<<<<<< HEAD
 
@@ -280,6 +435,7 @@ class ResolverAgent:
 <<<<<<< HEAD
             "conflicts": conflicts,                 # rule-based (table)
             "llm_reasoning": llm_explanation,        # AI summary
+            "llm_request": llm_request,              # deferred explanation
             "deviated_from_history": deviated_from_history,
             "primary_reason": primary_reason,
             "escalation_required": decision == "ESCALATE",
@@ -287,6 +443,7 @@ class ResolverAgent:
 =======
             "conflicts": conflicts,
             "llm_resolver": llm_explanation,
+            "llm_request": llm_request,
             "deviated_from_history": deviated_from_history,
             "primary_reason": primary_reason,
             "escalation_required": decision == "ESCALATE",
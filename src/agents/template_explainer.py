@@ -0,0 +1,132 @@
+import threading
+
+
+# Conflict strings produced by ResolverAgent._detect_conflicts
+MIXED_OUTCOMES = "Mixed FAIL and REVIEW outcomes across compliance categories"
+GST_TDS_JOINT = "GST and TDS rules conflict or jointly violated"
+CRITICAL_GST = "Critical GST compliance failure detected requiring escalation"
+
+MAX_EVIDENCE_ITEMS = 3
+MAX_VALUE_CHARS = 40
+
+
+def _describe(result):
+    """'B3 (GST): GSTIN inactive [status=Cancelled]'"""
+    text = f"{result.check_id} ({result.category})"
+    if result.reason:
+        text += f": {result.reason}"
+
+    evidence = result.evidence
+    if isinstance(evidence, dict) and evidence:
+        pairs = [
+            f"{k}={str(v)[:MAX_VALUE_CHARS]}"
+            for k, v in list(evidence.items())[:MAX_EVIDENCE_ITEMS]
+        ]
+        text += f" [{', '.join(pairs)}]"
+    return text
+
+
+def _join(results):
+    return "; ".join(_describe(r) for r in results)
+
+
+def _mixed_outcomes(failed, review):
+    return [
+        f"Strict reading: {_join(failed)} failed, so the invoice cannot be "
+        "approved as submitted",
+        f"Lenient reading: {_join(review)} only need confirmation and would not "
+        "block approval on their own",
+        "The outcome hinges on whether the failed checks reflect a data issue "
+        "that a corrected invoice resolves or a genuine compliance gap",
+    ]
+
+
+def _gst_tds_joint(failed, review):
+    gst = [r for r in failed if r.category == "GST"]
+    tds = [r for r in failed if r.category == "TDS"]
+    return [
+        f"GST view: {_join(gst)}",
+        f"TDS view: {_join(tds)}",
+        "Both regimes flag the invoice independently, so neither interpretation "
+        "clears it without correction",
+    ]
+
+
+def _critical_gst(failed, review):
+    gst = [r for r in failed if r.category == "GST"] or failed
+    return [
+        f"GST failure: {_join(gst)}",
+        "One interpretation: a data-entry or portal-sync issue that re-verification "
+        "or a corrected invoice would resolve",
+        "Other interpretation: genuine non-compliance, which puts the input tax "
+        "credit on this invoice at risk",
+    ]
+
+
+def _failed_only(failed, review):
+    return [
+        f"Failed checks: {_join(failed)}",
+        "These checks are blocking; the invoice needs correction or a documented "
+        "exception before approval",
+    ]
+
+
+TEMPLATES = {
+    MIXED_OUTCOMES: _mixed_outcomes,
+    GST_TDS_JOINT: _gst_tds_joint,
+    CRITICAL_GST: _critical_gst,
+}
+
+
+class TemplateExplainer:
+    """
+    Template Explainer
+    ------------------
+    Deterministic explanations for the fixed conflict classes of
+    ResolverAgent._detect_conflicts, built from the invoice's own
+    failed / review check ids, reasons and evidence.
+
+    - explain() returns None for conflict combinations it does not
+      cover; those still go to the LLM
+    - coverage() is the share of requests answered locally
+    """
+
+    def __init__(self):
+        self.covered = 0
+        self.uncovered = 0
+        self._lock = threading.Lock()
+
+    def explain(self, conflicts, failed, review_flags):
+        if conflicts:
+            builders = [TEMPLATES.get(c) for c in conflicts]
+        elif failed:
+            # Escalation without a named conflict (fail-fast path)
+            builders = [_failed_only]
+        else:
+            builders = [None]
+
+        if any(b is None for b in builders):
+            with self._lock:
+                self.uncovered += 1
+            return None
+
+        bullets = []
+        for build in builders:
+            for line in build(failed, review_flags):
+                if line not in bullets:
+                    bullets.append(line)
+
+        with self._lock:
+            self.covered += 1
+        return bullets
+
+    def coverage(self):
+        total = self.covered + self.uncovered
+        return round(self.covered / total, 4) if total else 0.0
+
+    def stats(self):
+        return {
+            "covered": self.covered,
+            "uncovered": self.uncovered,
+            "coverage": self.coverage(),
+        }
@@ -1,5 +1,9 @@
 from src.models.validation_result import ValidationResult
 from src.agents.gst_tds_validator_agent import GSTTDSValidatorAgent
+from src.validation_checks.category_a import duplicate_checks
+from src.validation_checks.category_d import aggregate_checks
+from src.validation_checks.batch import run_check
+from utils.tracing import tracer
 
 
 class ValidatorAgent:
@@ -28,9 +32,49 @@ class ValidatorAgent:
         self.validators = config.get("validators", [])
         self.gst_tds_agent = GSTTDSValidatorAgent(config)
 
-    def validate(self, invoice_ctx: dict):
+        # Duplicate checks (A2) keep their index in the state DB
+        self.duplicate_checks = duplicate_checks(config)
+
+        # FY aggregate check (D6) keeps the running totals in the state DB
+        self.aggregate_checks = aggregate_checks(config)
+
+    def close(self):
+        """Releases the agents' threads and connections."""
+        self.gst_tds_agent.close()
+        for check in self.duplicate_checks:
+            check.index.close()
+        for check in self.aggregate_checks:
+            check.store.close()
+
+    def settle_aggregates(self, invoice_ctx, decision):
+        """
+        Keeps an APPROVE invoice in the FY running totals and takes any
+        other back out. Returns (section_total, party_total) or None.
+        """
+        if not self.aggregate_checks:
+            return None
+        return self.aggregate_checks[0].store.settle(invoice_ctx, decision)
+
+    @tracer.traced("validate")
+    def validate(self, invoice_ctx: dict, local_results=None):
         results = []
 
+        # ------------------------------------------------
+        # Duplicate checks (every invoice is recorded)
+        # ------------------------------------------------
+        for check in self.duplicate_checks:
+            result = run_check(check, invoice_ctx)
+            if isinstance(result, ValidationResult):
+                results.append(result)
+
+        # ------------------------------------------------
+        # FY aggregates (every invoice is added until settled)
+        # ------------------------------------------------
+        for check in self.aggregate_checks:
+            result = run_check(check, invoice_ctx)
+            if isinstance(result, ValidationResult):
+                results.append(result)
+
 <<<<<<< HEAD
         # =================================================
         # GST / TDS Agent (FAIL-FAST)
@@ -41,7 +85,10 @@ class ValidatorAgent:
         # ------------------------------------------------
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         try:
-            gst_tds_results = self.gst_tds_agent.validate(invoice_ctx)
+            with tracer.span("validate.gst_tds"):
+                gst_tds_results = self.gst_tds_agent.validate(
+                    invoice_ctx, local_results=local_results
+                )
 
             if gst_tds_results:
                 for item in gst_tds_results:
@@ -104,7 +151,8 @@ class ValidatorAgent:
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         for validator in self.validators:
             try:
-                output = validator.validate(invoice_ctx)
+                with tracer.span(f"validator.{validator.__class__.__name__}"):
+                    output = validator.validate(invoice_ctx)
 
                 if not output:
                     continue
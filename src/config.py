@@ -1,7 +1,11 @@
+import logging
 from pathlib import Path
 import yaml
 
 
+logger = logging.getLogger(__name__)
+
+
 def load_config():
     ROOT_DIR = Path(__file__).resolve().parent.parent
     DATA_DIR = ROOT_DIR / "data"
@@ -32,6 +36,11 @@ def load_config():
         # -------------------------
         "gst_api_base_url": "http://localhost:8080/api/gst",
         "gst_api_key": "test-api-key-12345",
+        "gst_api_max_concurrency": 16,
+        # "http" (default) or "inprocess": calls mock_gst_server's Flask app
+        # directly, without sockets (benchmarks, offline runs)
+        "gst_api_transport": "http",
+        "gst_api_timeout": 5,
 
         # -------------------------
         # Agentic AI feature flags
@@ -39,7 +48,9 @@ def load_config():
         "agentic": {
             "use_llm_resolver": True,   
             "use_mcp": True,             
-            "use_sqlite_state": True     
+            "use_sqlite_state": True,
+            # Run local Category B & D rules as one vectorized batch
+            "batch_local_checks": True
         },
 
         # -------------------------
@@ -60,11 +71,143 @@ def load_config():
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         },
 
+        # -------------------------
+        # LLM request handling (both backends)
+        # -------------------------
+        "llm": {
+            # Explain known conflict classes from templates; only other
+            # combinations reach the LLM
+            "template_explainer": True,
+            # Coalesce concurrent explanation requests into one prompt;
+            # batch_max_size 1 sends one request per invoice
+            "batch_max_size": 8,
+            "batch_window_sec": 0.05,
+            "batch_max_tokens_per_invoice": 400,
+            # Batches in flight at once (one collector, a pool of senders)
+            "batch_dispatch_workers": 4,
+            # Persistent explanation cache keyed by conflict signature
+            "cache_enabled": True,
+            "cache_ttl_sec": 30 * 24 * 3600,
+            "cache_max_entries": 10_000,
+            # Return decisions first; explanations are attached to the
+            # reports (and report_explanations) by a background stage
+            "deferred": True,
+            "deferred_workers": 4,
+            # One scheduler per provider: request/token budgets (None
+            # disables a limit). The local model has no hosted budget.
+            "provider_limits": {
+                "groq": {"rpm": 30, "tpm": 6000},
+                "ollama": {"rpm": None, "tpm": None}
+            },
+            "max_prompt_tokens": 3000
+        },
+
+        # -------------------------
+        # LLM router (Groq + local Ollama behind "llm.reason")
+        # -------------------------
+        "llm_router": {
+            "enabled": True,
+            "backends": ["groq", "ollama"],
+            # Used when the backend's own config block is absent
+            "groq_model": "llama-3.3-70b-versatile",
+            "groq_timeout": 30,
+            # Fail over when the Groq budget cannot admit a call this soon
+            "groq_acquire_timeout_sec": 1.0,
+            "ollama_base_url": "http://localhost:11434",
+            "ollama_model": "llama3",
+            "ollama_timeout": 60,
+            # Prompts up to this size try the local model first
+            "short_prompt_tokens": 600,
+            "latency_window": 50,
+            "error_cooldown_sec": 30,
+            "max_error_rate": 0.5
+        },
+
+        # -------------------------
+        # MCP tool limits (callers wait when a tool is saturated)
+        # -------------------------
+        "mcp": {
+            "max_workers": 32,
+            "tools": {
+                "llm.reason": {"max_concurrency": 8, "timeout_sec": 180},
+                "groq.reason": {"max_concurrency": 8, "timeout_sec": 180},
+                "ollama.reason": {"max_concurrency": 4, "timeout_sec": 180},
+                "gst.validate": {"max_concurrency": 16, "timeout_sec": 30}
+            }
+        },
+
+        # -------------------------
+        # Tracing (per-stage latency profile of each run;
+        # run_<id>.json + run_<id>.prom under profile_dir)
+        # -------------------------
+        "tracing": {
+            "enabled": True,
+            # Also write run_<run_id>.json / .prom per run here (e.g.
+            # DATA_DIR / "profiles"); the profile is always in the summary
+            "profile_dir": None
+        },
+
+        # -------------------------
+        # Logging (JSON lines via a background queue listener)
+        # -------------------------
+        "logging": {
+            "level": "INFO",
+            # Per-module overrides, e.g. {"src.agents.resolver_agent": "DEBUG"}
+            "levels": {},
+            "json": True,
+            # Share of invoices whose per-invoice DEBUG records are kept
+            "debug_sample_rate": 0.05
+        },
+
+        # -------------------------
+        # Report sink: where reports go as each invoice finishes
+        # ("memory", "ndjson" -> dir/reports_<run_id>.ndjson,
+        # "sqlite" -> run_reports table, db_path defaults to the state DB,
+        # "parquet" -> dir/reports_<run_id>.parquet + checks_<run_id>.parquet)
+        # -------------------------
+        "reports": {
+            "sink": "memory",
+            "dir": DATA_DIR / "reports",
+            "db_path": None,
+            "commit_every": 100,
+            # Also write the Parquet files next to any other sink (pyarrow)
+            "export_parquet": False,
+            "parquet_row_group_size": 10_000
+        },
+
         # -------------------------
         # SQLite state store
         # -------------------------
         "sqlite": {
-            "db_path": DATA_DIR / "state.db"
+            "db_path": DATA_DIR / "state.db",
+            # Write-behind decision log: group commit by size or age
+            "write_batch_size": 500,
+            "write_flush_interval_sec": 0.5,
+            # Retries of a failed group commit (failed rows stay queued)
+            "write_retries": 3,
+            # Move decisions of past fiscal years out of the hot table on
+            # start-up; into per-year files under archive_dir when set.
+            # InvoiceStore duplicate lookups also search the archives
+            # (the resolver's history is read from its JSONL file)
+            "archive_closed_years": False,
+            "archive_dir": None
+        },
+
+        # -------------------------
+        # Duplicate detection
+        # (fields / window come from company_policy)
+        # -------------------------
+        "duplicate_detection": {
+            # A2 against the persistent index in the state DB
+            "enabled": True,
+            # A2N: MinHash near-duplicates, also in the state DB
+            # (threshold: company_policy near_duplicate_threshold)
+            "near_duplicates": True,
+            # Per-feature integer weights overriding the defaults in
+            # src/storage/near_duplicate_index.py (None: defaults)
+            "near_duplicate_weights": None,
+            "use_bloom_filter": True,
+            "bloom_capacity": 1_000_000
         }
     }
 
@@ -75,10 +218,12 @@ def load_config():
         with open(config["company_policy_path"], "r", encoding="utf-8") as f:
             config["company_policy"] = yaml.safe_load(f) or {}
     except FileNotFoundError:
-        print(f"Warning: Company policy file not found: {config['company_policy_path']}")
+        logger.warning(
+            "Company policy file not found: %s", config["company_policy_path"]
+        )
         config["company_policy"] = {}
     except yaml.YAMLError as e:
-        print(f"Warning: Could not parse company policy YAML: {e}")
+        logger.warning("Could not parse company policy YAML: %s", e)
         config["company_policy"] = {}
 
     return config
@@ -2,11 +2,33 @@
 from src.mcp.tool_registry import ToolRegistry
 
 class MCPServer:
-    def __init__(self):
-        self.registry = ToolRegistry()
+    def __init__(self, config=None):
+        self.config = (config or {}).get("mcp", {})
+        self.registry = ToolRegistry(
+            max_workers=self.config.get("max_workers", 32)
+        )
 
-    def register_tool(self, name, fn):
-        self.registry.register(name, fn)
+    def register_tool(self, name, fn, max_concurrency=None, timeout=None):
+        # Per-tool limits from config["mcp"]["tools"][name] unless given
+        limits = self.config.get("tools", {}).get(name, {})
+        self.registry.register(
+            name,
+            fn,
+            max_concurrency=max_concurrency or limits.get("max_concurrency"),
+            timeout=timeout or limits.get("timeout_sec"),
+        )
 
     def call_tool(self, name, payload):
         return self.registry.call(name, payload)
+
+    async def acall_tool(self, name, payload):
+        return await self.registry.acall(name, payload)
+
+    def call_many(self, name, payloads, return_exceptions=False):
+        return self.registry.call_many(name, payloads, return_exceptions)
+
+    def stats(self):
+        return self.registry.stats()
+
+    def close(self):
+        self.registry.close()
@@ -1,12 +1,217 @@
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class ToolTimeout(TimeoutError):
+    pass
+
+
+class _EventLoopThread:
+    """One background event loop that runs async tools for sync callers."""
 
-class ToolRegistry:
     def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="mcp-async-tools", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro, timeout=None, on_done=None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if on_done is not None:
+            future.add_done_callback(lambda _: on_done())
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+def _noop():
+    pass
+
+
+class ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_sec = 0.0
+        self.max_sec = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed, error=False, timeout=False):
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.timeouts += int(timeout)
+            self.total_sec += elapsed
+            self.max_sec = max(self.max_sec, elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "avg_sec": round(self.total_sec / self.calls, 4) if self.calls else 0.0,
+                "max_sec": round(self.max_sec, 4),
+            }
+
+
+class Tool:
+    def __init__(self, name, fn, max_concurrency=None, timeout=None):
+        self.name = name
+        self.fn = fn
+        self.timeout = timeout
+        self.is_async = inspect.iscoroutinefunction(fn)
+        self.semaphore = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        )
+        self.stats = ToolStats()
+
+
+class ToolRegistry:
+    """
+    Tool Registry
+    -------------
+    - sync and async (coroutine) tools behind the same call()
+    - optional per-tool concurrency limit (callers wait: backpressure)
+      and per-call timeout
+    - call_many(): a tool's own `call_many` attribute when it has one,
+      otherwise the payloads are fanned out under the tool's limit
+    - per-tool call / error / timeout counters and latency
+    - close() stops the worker threads and closes tools that have a
+      `close` attribute (e.g. LLM batchers)
+    """
+
+    def __init__(self, max_workers=32):
         self.tools = {}
+        # Fan-out (call_many / acall) and timed sync calls use separate
+        # pools: a fanned-out call() waiting on a timed call in the same
+        # pool could deadlock it
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mcp-tool"
+        )
+        self._timed_pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mcp-tool-timed"
+        )
+        self._loop = None
+        self._loop_lock = threading.Lock()
 
-    def register(self, name, fn):
-        self.tools[name] = fn
+    def register(self, name, fn, max_concurrency=None, timeout=None):
+        self.tools[name] = Tool(name, fn, max_concurrency, timeout)
 
-    def call(self, name, payload):
+    def _get(self, name):
         if name not in self.tools:
             raise ValueError(f"Tool {name} not registered")
-        return self.tools[name](payload)
+        return self.tools[name]
+
+    def _event_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = _EventLoopThread()
+            return self._loop
+
+    # ---------------------------------------------------------
+    # Single call
+    # ---------------------------------------------------------
+
+    def _invoke(self, tool, fn, arg, release):
+        """Runs fn(arg); release() is called once fn has really finished."""
+        if inspect.iscoroutinefunction(fn):
+            return self._event_loop().run(fn(arg), tool.timeout, on_done=release)
+        if tool.timeout is None:
+            try:
+                return fn(arg)
+            finally:
+                release()
+        # A sync tool cannot be interrupted; the caller stops waiting, but
+        # the slot stays taken until the call returns
+        try:
+            future = self._timed_pool.submit(fn, arg)
+        except Exception:
+            release()
+            raise
+        future.add_done_callback(lambda _: release())
+        return future.result(tool.timeout)
+
+    def _guarded(self, tool, fn, arg):
+        start = time.perf_counter()
+
+        release = _noop
+        if tool.semaphore is not None:
+            if not tool.semaphore.acquire(timeout=tool.timeout):
+                tool.stats.record(time.perf_counter() - start, error=True, timeout=True)
+                raise ToolTimeout(f"Tool {tool.name} busy for {tool.timeout}s")
+            release = tool.semaphore.release
+
+        try:
+            result = self._invoke(tool, fn, arg, release)
+        except FutureTimeout:
+            tool.stats.record(time.perf_counter() - start, error=True, timeout=True)
+            raise ToolTimeout(f"Tool {tool.name} timed out after {tool.timeout}s")
+        except Exception:
+            tool.stats.record(time.perf_counter() - start, error=True)
+            raise
+
+        tool.stats.record(time.perf_counter() - start)
+        return result
+
+    def call(self, name, payload):
+        tool = self._get(name)
+        return self._guarded(tool, tool.fn, payload)
+
+    async def acall(self, name, payload):
+        """Awaitable call() for async callers."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._pool, self.call, name, payload
+        )
+
+    # ---------------------------------------------------------
+    # Many calls
+    # ---------------------------------------------------------
+
+    def call_many(self, name, payloads, return_exceptions=False):
+        """Results in payload order."""
+        tool = self._get(name)
+        payloads = list(payloads)
+
+        native = getattr(tool.fn, "call_many", None)
+        if native is not None:
+            # Counted as one call; the tool batches internally
+            return self._guarded(tool, native, payloads)
+
+        futures = [self._pool.submit(self.call, name, p) for p in payloads]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def stats(self):
+        return {name: tool.stats.snapshot() for name, tool in self.tools.items()}
+
+    def close(self):
+        for tool in self.tools.values():
+            close = getattr(tool.fn, "close", None)
+            if close is not None:
+                close()
+        self._pool.shutdown(wait=True)
+        self._timed_pool.shutdown(wait=True)
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.close()
+                self._loop = None
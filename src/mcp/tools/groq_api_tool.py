@@ -1,12 +1,7 @@
 
 from src.agents.llm_resolver_agent import LLMResolverAgent
+from src.agents.llm_batcher import LLMBatcher, explain_tool
 
 def groq_resolver_tool(config):
     agent = LLMResolverAgent(config)
-
-    def run(payload):
-        context = payload.get("invoice_context") or payload.get("context", {})
-        conflicts = payload.get("conflicts", [])
-        return agent.explain(context, conflicts)
-
-    return run
+    return explain_tool(agent, LLMBatcher.from_config(agent, config))
@@ -1,6 +1,9 @@
 # src/mcp/tools/gst_api_tool.py
 
-def gst_validate_tool(gst_client):
+from concurrent.futures import ThreadPoolExecutor
+
+
+def gst_validate_tool(gst_client, max_workers=16):
     """
     MCP tool wrapper around GSTPortalClient.validate_gstin
     """
@@ -19,4 +22,17 @@ def gst_validate_tool(gst_client):
             "response": data
         }
 
+    def call_many(payloads):
+        # Each distinct GSTIN is looked up once, concurrently
+        gstins = list(dict.fromkeys(p.get("gstin") for p in payloads if p.get("gstin")))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(gstins)))) as pool:
+            by_gstin = dict(zip(gstins, pool.map(lambda g: run({"gstin": g}), gstins)))
+
+        return [
+            by_gstin[p["gstin"]] if p.get("gstin") else run(p)
+            for p in payloads
+        ]
+
+    run.call_many = call_many
     return run
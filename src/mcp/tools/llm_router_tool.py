@@ -0,0 +1,9 @@
+
+from src.agents.llm_router import LLMRouter
+from src.agents.llm_batcher import LLMBatcher, explain_tool
+
+def llm_router_tool(config):
+    router = LLMRouter.from_config(config)
+    run = explain_tool(router, LLMBatcher.from_config(router, config))
+    run.router = router
+    return run
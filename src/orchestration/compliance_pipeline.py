@@ -1,3 +1,4 @@
+import logging
 import time
 <<<<<<< HEAD
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -8,6 +9,14 @@ from src.agents.extractor_agent import ExtractorAgent
 from src.agents.validator_agent import ValidatorAgent
 from src.agents.resolver_agent import ResolverAgent
 from src.agents.reporter_agent import ReporterAgent
+from src.validation_checks.batch import BatchLocalEvaluator
+from src.storage.aggregate_store import party_key
+from src.storage.report_sink import sink_from_config
+from utils.logging_utils import fields, setup_logging
+from utils.tracing import tracer
+
+
+logger = logging.getLogger(__name__)
 
 
 <<<<<<< HEAD
@@ -36,6 +45,81 @@ def _compute_final_confidence(results):
     return max(0.0, 1.0 - ((fail * 0.3 + review * 0.15) / total))
 
 
+def _start_tracing(config, run_id):
+    """Collector of this run's spans (None when tracing is disabled)."""
+    if not config.get("tracing", {}).get("enabled", True):
+        return None
+    return tracer.start_run(run_id)
+
+
+def _run_profile(config, trace, resolver):
+    """
+    Per-stage latencies, counters and cache hit rates of this run.
+    Written as JSON + Prometheus text under tracing.profile_dir when set.
+    Partial while deferred explanations run; _explanations_done()
+    exports it again once they finish.
+    """
+    if trace is None:
+        return None
+
+    extra = {}
+    if resolver.mcp is not None:
+        extra["mcp_tools"] = resolver.mcp.stats()
+
+    profile_dir = config.get("tracing", {}).get("profile_dir")
+    if profile_dir:
+        try:
+            return trace.export(profile_dir, extra)
+        except OSError as e:
+            logger.warning("Run profile export failed: %s", e)
+
+    return {"run_id": trace.run_id, **trace.snapshot(), **extra}
+
+
+def _explanations_done(config, trace, resolver, sink):
+    """
+    Callback for resolver.close(): writes the deferred explanations to
+    the sink, then ends the run's trace and exports the final profile,
+    so "resolve.llm" spans recorded after the decisions are included.
+    """
+    def done():
+        try:
+            sink.explanations_done()
+        finally:
+            if trace is not None:
+                tracer.end_run(trace)
+                _run_profile(config, trace, resolver)
+
+    return done
+
+
+def _batch_local_results(config, invoices):
+    """
+    Precomputes the local Category B & D rule checks for all invoices
+    in one columnar pass. Returns a list of None (scalar checks) when
+    batching is disabled.
+    """
+    if not config.get("agentic", {}).get("batch_local_checks"):
+        return [None] * len(invoices)
+    return BatchLocalEvaluator().evaluate(invoices)
+
+
+def _settle_aggregates(validator, invoice_ctx, resolution, aggregate_tds=None):
+    """
+    FY running totals keep approved invoices only (D6 added every
+    invoice at validation). aggregate_tds, when given, maps
+    (party, FY, section) -> section total.
+    """
+    totals = validator.settle_aggregates(invoice_ctx, resolution.get("decision"))
+    if totals is not None and aggregate_tds is not None:
+        key = (
+            party_key(invoice_ctx),
+            invoice_ctx.get("fiscal_year"),
+            invoice_ctx.get("tds_section"),
+        )
+        aggregate_tds[key] = totals[0]
+
+
 <<<<<<< HEAD
 def _aggregate_ai_summary(all_llm_reasoning):
     """
@@ -78,10 +162,14 @@ def _aggregate_ai_summary(all_llm_reasoning):
 # PARALLEL WORKER
 # --------------------------------------------------
 
-def _process_single_invoice(invoice_ctx, validator, resolver, reporter):
+def _process_single_invoice(
+    invoice_ctx, validator, resolver, reporter, local_results=None
+):
     start = time.perf_counter()
 
-    validation_results = validator.validate(invoice_ctx)
+    validation_results = validator.validate(
+        invoice_ctx, local_results=local_results
+    )
 
     validation_payload = {
         "results": validation_results,
@@ -100,31 +188,44 @@ def _process_single_invoice(invoice_ctx, validator, resolver, reporter):
         time.perf_counter() - start, 2
     )
 
-    return report, resolution.get("llm_reasoning")
+    return report, resolution, validation_results
 
 
 # --------------------------------------------------
 # PIPELINE (UI ENTRY POINT)
 # --------------------------------------------------
 
-def run_compliance_pipeline(config, force_run: bool = False):
+def run_compliance_pipeline(config, force_run: bool = False, sink=None):
+    """
+    Returns (summary, sink): reports are written to the sink as they
+    finish (see src/storage/report_sink.py).
+    """
 =======
-def run_compliance_pipeline(config, force_run: bool = False):
-    """Function wrapper for UI compatibility - processes all invoice files."""
+def run_compliance_pipeline(config, force_run: bool = False, sink=None):
+    """
+    Function wrapper for UI compatibility - processes all invoice files.
+    Returns (summary, sink): reports are written to the sink as they
+    finish (see src/storage/report_sink.py).
+    """
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
     start_time = time.time()
+    setup_logging(config)
 
     extractor = ExtractorAgent(config)
     validator = ValidatorAgent(config)
     resolver = ResolverAgent(config)
     reporter = ReporterAgent(config)
+    run_id = resolver.db.start_run()
+    trace = _start_tracing(config, run_id)
+
+    if sink is None:
+        sink = sink_from_config(config, run_id)
 
-    reports = []
     approved = 0
     escalated = 0
 
 <<<<<<< HEAD
-    all_llm_reasoning = []
+    ai_bullets = set()
 
     seen_invoice_ids = set()
     invoice_files = extractor.load_invoices()
@@ -140,30 +241,41 @@ def run_compliance_pipeline(config, force_run: bool = False):
                     seen_invoice_ids.add(invoice_id)
                     invoices.append(inv)
         except Exception as file_error:
-            print(f"[ERROR] File extraction failed: {file_path.name} -> {file_error}")
+            logger.error(
+                "File extraction failed: %s",
+                file_error,
+                extra=fields(file=file_path.name),
+            )
+
+    # ---- Local rule checks for the whole batch (vectorized) ----
+    local_results = _batch_local_results(config, invoices)
 
     # ---- PARALLEL INVOICE PROCESSING ----
-    MAX_WORKERS = min(8, len(invoices))  # sweet spot for IO-bound APIs
+    MAX_WORKERS = max(1, min(8, len(invoices)))  # sweet spot for IO-bound APIs
 
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = [
+        futures = {
             executor.submit(
                 _process_single_invoice,
                 invoice_ctx,
                 validator,
                 resolver,
-                reporter
-            )
-            for invoice_ctx in invoices
-        ]
+                reporter,
+                invoice_local_results,
+            ): invoice_ctx
+            for invoice_ctx, invoice_local_results in zip(invoices, local_results)
+        }
 
         for future in as_completed(futures):
             try:
-                report, llm_reasoning = future.result()
-                reports.append(report)
+                report, resolution, validation_results = future.result()
+                sink.write(report, validation_results)
+                resolver.attach_explanation(report, resolution, sink.add_explanation)
+                _settle_aggregates(validator, futures[future], resolution)
 
+                llm_reasoning = resolution.get("llm_reasoning")
                 if llm_reasoning:
-                    all_llm_reasoning.append(llm_reasoning)
+                    ai_bullets.update(_aggregate_ai_summary([llm_reasoning]))
 =======
     # Deduplicate only within current run
     seen_invoice_ids = set()
@@ -174,28 +286,49 @@ def run_compliance_pipeline(config, force_run: bool = False):
         try:
             extracted = extractor.extract(file_path)
         except Exception as file_error:
-            print(f"[ERROR] File extraction failed: {file_path.name} -> {file_error}")
+            logger.error(
+                "File extraction failed: %s",
+                file_error,
+                extra=fields(file=file_path.name),
+            )
             continue
 
-        invoices = _expand_invoices(extracted)
-
-        for invoice_ctx in invoices:
+        invoices = []
+        for invoice_ctx in _expand_invoices(extracted):
             invoice_id = invoice_ctx.get("invoice_id", "MISSING_ID")
 
             # Deduplicate within this run only
             if invoice_id in seen_invoice_ids:
                 continue
             seen_invoice_ids.add(invoice_id)
+            invoices.append(invoice_ctx)
+
+        # Local rule checks for the file's invoices (vectorized)
+        local_results = _batch_local_results(config, invoices)
+
+        for invoice_ctx, invoice_local_results in zip(invoices, local_results):
+            invoice_id = invoice_ctx.get("invoice_id", "MISSING_ID")
 
             try:
-                validation_results = validator.validate(invoice_ctx)
-                print("\n==============================")
-                print(f"[PIPELINE] Processing Invoice: {invoice_id}")
-
-                print("[PIPELINE] Validation Results:")
-                for vr in validation_results:
-                    print(
-                        f"  - check={vr.check_id} | status={vr.status} | reason={vr.reason}"
+                validation_results = validator.validate(
+                    invoice_ctx, local_results=invoice_local_results
+                )
+                debug = logger.isEnabledFor(logging.DEBUG)
+
+                if debug:
+                    logger.debug(
+                        "Validation results",
+                        extra=fields(
+                            invoice_id=invoice_id,
+                            results=[
+                                {
+                                    "check": vr.check_id,
+                                    "status": vr.status,
+                                    "reason": vr.reason,
+                                }
+                                for vr in validation_results
+                            ],
+                        ),
                     )
 
                 validation_payload = {
@@ -204,9 +337,17 @@ def run_compliance_pipeline(config, force_run: bool = False):
                 }
 
                 resolution = resolver.resolve(invoice_ctx, validation_payload)
-                print("[PIPELINE] Resolution:")
-                for k, v in resolution.items():
-                    print(f"  {k}: {v}")
+                if debug:
+                    logger.debug(
+                        "Resolution",
+                        extra=fields(
+                            invoice_id=invoice_id,
+                            resolution={
+                                k: v for k, v in resolution.items()
+                                if k != "llm_request"
+                            },
+                        ),
+                    )
 
                 report = reporter.generate(
                     invoice_ctx,
@@ -214,10 +355,13 @@ def run_compliance_pipeline(config, force_run: bool = False):
                     resolution,
                 )
 
-                print("[PIPELINE] Final Report:")
-                for k, v in report.items():
-                    print(f"  {k}: {v}")
-                reports.append(report)
+                if debug:
+                    logger.debug(
+                        "Final report", extra=fields(invoice_id=invoice_id, report=report)
+                    )
+                sink.write(report, validation_results)
+                resolver.attach_explanation(report, resolution, sink.add_explanation)
+                _settle_aggregates(validator, invoice_ctx, resolution)
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 
                 if report["decision"] == "APPROVE":
@@ -227,33 +371,54 @@ def run_compliance_pipeline(config, force_run: bool = False):
 
 <<<<<<< HEAD
             except Exception as e:
-                print(f"[ERROR] Invoice processing failed: {e}")
+                logger.error("Invoice processing failed: %s", e)
+                _settle_aggregates(validator, futures[future], {})
                 escalated += 1
 
     # ---- GLOBAL AI SUMMARY ----
-    ai_compliance_summary = _aggregate_ai_summary(all_llm_reasoning)
+    # Deferred explanations count once they land; while summary["llm_pending"]
+    # is non-zero the UI re-aggregates from the reports
+    ai_bullets.update(_aggregate_ai_summary(sink.explanations().values()))
+    ai_compliance_summary = sorted(ai_bullets)
 
 =======
             except Exception as invoice_error:
-                print(f"[ERROR] Invoice failed: {invoice_id} -> {invoice_error}")
-                reports.append(
+                logger.error(
+                    "Invoice failed: %s",
+                    invoice_error,
+                    extra=fields(invoice_id=invoice_id),
+                )
+                sink.write(
                     reporter.system_error(invoice_id, str(invoice_error))
                 )
+                _settle_aggregates(validator, invoice_ctx, {})
                 escalated += 1
 
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+    validator.close()
+
+    # Decisions are written behind; closing makes them durable before reporting
+    resolver.close(
+        on_explanations_done=_explanations_done(config, trace, resolver, sink)
+    )
+    sink.close()
+
     summary = {
-        "total_invoices": len(reports),
+        "run_id": run_id,
+        "total_invoices": sink.count,
         "approved": approved,
         "escalated": escalated,
         "processing_time_sec": round(time.time() - start_time, 2),
+        "llm_pending": resolver.pending_explanations(),
+        "profile": _run_profile(config, trace, resolver),
+        "reports": {"sink": sink.name, "location": sink.location()},
 <<<<<<< HEAD
         "ai_compliance_summary": ai_compliance_summary,
 =======
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
     }
 
-    return summary, reports
+    return summary, sink
 
 
 <<<<<<< HEAD
@@ -265,25 +430,32 @@ def run_compliance_pipeline(config, force_run: bool = False):
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 class CompliancePipeline:
     def __init__(self, config):
+        self.config = config
+        setup_logging(config)
         self.extractor = ExtractorAgent(config)
-        self.validator = ValidatorAgent(config)
-        self.resolver = ResolverAgent(config)
 <<<<<<< HEAD
         self.reporter = ReporterAgent(config)
 
-    def process(self, invoice_path):
+    def process(self, invoice_path, sink=None):
         start_time = time.time()
 
-        reports = []
+        # Agents holding threads / connections live for one call
+        self.validator = ValidatorAgent(self.config)
+        self.resolver = ResolverAgent(self.config)
+
         approved = 0
         escalated = 0
-        all_llm_reasoning = []
+        ai_bullets = set()
+        context = {"aggregate_tds": {}}
 =======
         self.reporter = ReporterAgent()
 
-    def process(self, invoice_path):
+    def process(self, invoice_path, sink=None):
         start_time = time.time()
-        reports = []
+
+        # Agents holding threads / connections live for one call
+        self.validator = ValidatorAgent(self.config)
+        self.resolver = ResolverAgent(self.config)
 
         approved = 0
         escalated = 0
@@ -294,47 +466,58 @@ class CompliancePipeline:
             "errors": []
         }
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+        run_id = self.resolver.db.start_run()
+        trace = _start_tracing(self.config, run_id)
+        if sink is None:
+            sink = sink_from_config(self.config, run_id)
 
         try:
             extracted = self.extractor.extract(invoice_path)
             invoices = _expand_invoices(extracted)
         except Exception as e:
-            return {
-                "summary": {
-                    "total_invoices": 0,
-                    "approved": 0,
-                    "escalated": 1,
-                    "processing_time_sec": round(time.time() - start_time, 2),
-                },
-                "reports": [
-                    self.reporter.system_error(
-                        str(invoice_path), str(e)
-                    )
-                ],
-            }
+            # Reported like any failed invoice; the run still closes normally
+            logger.error(
+                "File extraction failed: %s", e, extra=fields(file=str(invoice_path))
+            )
+            sink.write(self.reporter.system_error(str(invoice_path), str(e)))
+            escalated += 1
+            invoices = []
+
+        local_results = _batch_local_results(self.config, invoices)
 
 <<<<<<< HEAD
-        MAX_WORKERS = min(8, len(invoices))
+        MAX_WORKERS = max(1, min(8, len(invoices)))
 
         with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [
+            futures = {
                 executor.submit(
                     _process_single_invoice,
                     invoice,
                     self.validator,
                     self.resolver,
-                    self.reporter
-                )
-                for invoice in invoices
-            ]
+                    self.reporter,
+                    invoice_local_results,
+                ): invoice
+                for invoice, invoice_local_results in zip(invoices, local_results)
+            }
 
             for future in as_completed(futures):
                 try:
-                    report, llm_reasoning = future.result()
-                    reports.append(report)
+                    report, resolution, validation_results = future.result()
+                    sink.write(report, validation_results)
+                    self.resolver.attach_explanation(
+                        report, resolution, sink.add_explanation
+                    )
+                    _settle_aggregates(
+                        self.validator,
+                        futures[future],
+                        resolution,
+                        context["aggregate_tds"],
+                    )
 
+                    llm_reasoning = resolution.get("llm_reasoning")
                     if llm_reasoning:
-                        all_llm_reasoning.append(llm_reasoning)
+                        ai_bullets.update(_aggregate_ai_summary([llm_reasoning]))
 
                     if report["decision"] == "APPROVE":
                         approved += 1
@@ -342,22 +525,28 @@ class CompliancePipeline:
                         escalated += 1
 
                 except Exception as e:
-                    reports.append(
+                    sink.write(
                         self.reporter.system_error(
                             "UNKNOWN", str(e)
                         )
                     )
+                    _settle_aggregates(self.validator, futures[future], {})
                     escalated += 1
 
-        ai_compliance_summary = _aggregate_ai_summary(all_llm_reasoning)
+        ai_bullets.update(_aggregate_ai_summary(sink.explanations().values()))
+        ai_compliance_summary = sorted(ai_bullets)
 =======
-        for invoice in invoices:
+        for invoice, invoice_local_results in zip(invoices, local_results):
             invoice_id = invoice.get("invoice_id", "UNKNOWN")
 
             try:
-                print(f"[PIPELINE] Processing Invoice: {invoice_id}")
+                logger.debug(
+                    "Processing invoice", extra=fields(invoice_id=invoice_id)
+                )
 
-                validation_results = self.validator.validate(invoice)
+                validation_results = self.validator.validate(
+                    invoice, local_results=invoice_local_results
+                )
 
                 # Compute final confidence from validation results
                 from src.orchestration.compliance_pipeline import _compute_final_confidence
@@ -372,7 +561,13 @@ class CompliancePipeline:
                     invoice, validation_results, decision
                 )
 
-                reports.append(report)
+                sink.write(report, validation_results)
+                self.resolver.attach_explanation(
+                    report, decision, sink.add_explanation
+                )
+                _settle_aggregates(
+                    self.validator, invoice, decision, context["aggregate_tds"]
+                )
 
                 if report["decision"] == "APPROVE":
                     approved += 1
@@ -382,26 +577,43 @@ class CompliancePipeline:
                 context["processed_invoices"].append(invoice_id)
 
             except Exception as invoice_error:
-                print(
-                    f"[ERROR] Invoice failed: {invoice_id} -> {invoice_error}"
+                logger.error(
+                    "Invoice failed: %s",
+                    invoice_error,
+                    extra=fields(invoice_id=invoice_id),
                 )
 
                 context["errors"].append(
                     {"invoice_id": invoice_id, "error": str(invoice_error)}
                 )
 
-                reports.append(
+                sink.write(
                     self.reporter.system_error(
                         invoice_id, str(invoice_error)
                     )
                 )
+                _settle_aggregates(self.validator, invoice, {})
                 escalated += 1
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 
+        self.validator.close()
+
+        # Decisions are written behind; closing makes them durable before reporting
+        self.resolver.close(
+            on_explanations_done=_explanations_done(
+                self.config, trace, self.resolver, sink
+            )
+        )
+        sink.close()
+
         summary = {
-            "total_invoices": len(reports),
+            "run_id": run_id,
+            "total_invoices": sink.count,
             "approved": approved,
             "escalated": escalated,
+            "llm_pending": self.resolver.pending_explanations(),
+            "profile": _run_profile(self.config, trace, self.resolver),
+            "reports": {"sink": sink.name, "location": sink.location()},
 <<<<<<< HEAD
             "processing_time_sec": round(time.time() - start_time, 2),
             "ai_compliance_summary": ai_compliance_summary,
@@ -412,4 +624,4 @@ class CompliancePipeline:
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         }
 
-        return summary, reports
+        return summary, sink
@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+
+logger = logging.getLogger(__name__)
+
+
+class ExplanationStage:
+    """
+    Deferred LLM Explanation Stage
+    ------------------------------
+    Runs LLM explanations after decisions and reports are returned.
+
+    - explain_fn(*request) runs on a small background pool, most
+      urgent first (lower priority value; ties in arrival order)
+    - the result is persisted per (run_id, invoice_id) and handed to the
+      job's on_done(invoice_id, explanation), e.g. a report sink's
+      add_explanation(); reports themselves are never touched
+    - pending() / wait() let callers poll or block when they need it
+    """
+
+    TABLE = "report_explanations"
+
+    def __init__(self, explain_fn, db_path=None, max_workers=4):
+        self.explain_fn = explain_fn
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="llm-explain"
+        )
+        self._outstanding = set()
+        self._queue = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        self.conn = None
+        if db_path is not None:
+            self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    run_id TEXT NOT NULL,
+                    invoice_id TEXT NOT NULL,
+                    explanation TEXT,
+                    completed_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, invoice_id)
+                )
+                """
+            )
+            self.conn.commit()
+
+    @classmethod
+    def from_config(cls, explain_fn, config):
+        return cls(
+            explain_fn,
+            db_path=config["sqlite"]["db_path"],
+            max_workers=config.get("llm", {}).get("deferred_workers", 4),
+        )
+
+    # ---------------------------------------------------------
+    # Submission
+    # ---------------------------------------------------------
+
+    def submit(self, invoice_id, request, run_id=None, priority=0, on_done=None):
+        future = Future()
+        with self._lock:
+            heapq.heappush(
+                self._queue,
+                (priority, next(self._seq), invoice_id, request, run_id, on_done, future),
+            )
+            self._outstanding.add(future)
+        future.add_done_callback(self._done)
+
+        # Each pool task takes whichever queued job is most urgent now
+        self._pool.submit(self._run_next)
+        return future
+
+    def _run_next(self):
+        with self._lock:
+            _, _, invoice_id, request, run_id, on_done, future = heapq.heappop(
+                self._queue
+            )
+        try:
+            explanation = self._explain(invoice_id, request, run_id)
+            if on_done is not None:
+                on_done(invoice_id, explanation)
+            future.set_result(explanation)
+        except Exception as e:
+            logger.error("Deferred explanation failed: %s", e)
+            future.set_exception(e)
+
+    def _done(self, future):
+        with self._lock:
+            self._outstanding.discard(future)
+
+    def _explain(self, invoice_id, request, run_id):
+        explanation = self.explain_fn(*request)
+
+        if self.conn is not None and run_id:
+            with self._lock:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO {self.TABLE} "
+                    "(run_id, invoice_id, explanation, completed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (run_id, invoice_id, json.dumps(explanation), time.time()),
+                )
+                self.conn.commit()
+
+        return explanation
+
+    # ---------------------------------------------------------
+    # Status
+    # ---------------------------------------------------------
+
+    def pending(self):
+        with self._lock:
+            return len(self._outstanding)
+
+    def wait(self, timeout=None):
+        """Blocks until submitted explanations finish. True if none remain."""
+        with self._lock:
+            outstanding = list(self._outstanding)
+        _, not_done = wait(outstanding, timeout=timeout)
+        return not not_done
+
+    def load(self, run_id):
+        """{invoice_id: explanation} stored for a run."""
+        if self.conn is None:
+            return {}
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT invoice_id, explanation FROM {self.TABLE} WHERE run_id = ?",
+                (run_id,),
+            ).fetchall()
+        return {invoice_id: json.loads(text) for invoice_id, text in rows}
+
+    def close(self):
+        """Finish pending explanations and close the database connection."""
+        self._pool.shutdown(wait=True)
+        if self.conn:
+            self.conn.close()
+            self.conn = None
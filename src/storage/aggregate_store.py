@@ -0,0 +1,313 @@
+import json
+import sqlite3
+import threading
+
+from utils.line_item_utils import to_paise, PAISE_PER_RUPEE
+
+
+ALL_SECTIONS = "*"
+
+
+def fiscal_year(invoice_date):
+    """'2024-09-15' -> '2024-25' (Indian FY, April to March)."""
+    if not invoice_date or len(str(invoice_date)) < 7:
+        return None
+    try:
+        year, month = int(str(invoice_date)[:4]), int(str(invoice_date)[5:7])
+    except ValueError:
+        return None
+    start = year if month >= 4 else year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def party_key(ctx):
+    """
+    PAN when available (same-PAN branches are one party),
+    otherwise the seller GSTIN.
+    """
+    fields = ctx.get("fields") or {}
+    pan = ctx.get("vendor_pan") or (fields.get("vendor_pan") if isinstance(fields, dict) else None)
+    if pan:
+        return f"PAN:{str(pan).strip().upper()}"
+    if ctx.get("seller_gstin"):
+        return f"GSTIN:{str(ctx['seller_gstin']).strip().upper()}"
+    return None
+
+
+def load_vendor_sections(vendor_registry_path):
+    """Seller GSTIN -> TDS section from the vendor registry."""
+    try:
+        with open(vendor_registry_path, "r", encoding="utf-8") as f:
+            vendors = json.load(f).get("vendors", [])
+    except FileNotFoundError:
+        return {}
+    return {v["gstin"]: v.get("tds_section") for v in vendors if v.get("gstin")}
+
+
+def load_fy_thresholds(tds_sections_path):
+    """section -> aggregate per-FY threshold (only sections that have one)."""
+    try:
+        with open(tds_sections_path, "r", encoding="utf-8") as f:
+            sections = json.load(f).get("tds_sections", [])
+    except FileNotFoundError:
+        return {}
+
+    thresholds = {}
+    for section in sections:
+        if section.get("aggregate_threshold_per_fy") is not None:
+            thresholds[section["section"]] = section["aggregate_threshold_per_fy"]
+        elif section.get("threshold_type") == "annual" and section.get("threshold"):
+            thresholds[section["section"]] = section["threshold"]
+    return thresholds
+
+
+class VendorAggregateStore:
+    """
+    Vendor FY Aggregate Store
+    -------------------------
+    Running totals keyed by (PAN or GSTIN, FY, TDS section), persisted
+    in SQLite; they end up counting approved invoices only.
+
+    - reserve() at validation (D6) adds the invoice and reads the totals
+      in one locked step, so invoices validated later in the same batch
+      count it
+    - settle() after the decision keeps APPROVE invoices and removes the
+      others
+    - O(1) upsert per invoice, atomic across worker threads
+    - Idempotent: re-processing an invoice_id never double-counts
+    - A "*" section row holds the cross-section total per party
+    """
+
+    def __init__(
+        self, db_path, fy_thresholds=None, cumulative_threshold=None,
+        vendor_sections=None,
+    ):
+        self.fy_thresholds = fy_thresholds or {}
+        self.cumulative_threshold = cumulative_threshold
+        self.vendor_sections = vendor_sections or {}
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    @classmethod
+    def from_config(cls, config):
+        overrides = config.get("company_policy", {}).get("_internal_overrides", {})
+        cumulative = overrides.get("cumulative_vendor_threshold", {})
+
+        return cls(
+            db_path=config["sqlite"]["db_path"],
+            fy_thresholds=load_fy_thresholds(config["tds_sections_path"]),
+            cumulative_threshold=cumulative.get("threshold"),
+            vendor_sections=load_vendor_sections(config["vendor_registry_path"]),
+        )
+
+    def _create_tables(self):
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vendor_fy_aggregates (
+                party_key TEXT NOT NULL,
+                fy TEXT NOT NULL,
+                tds_section TEXT NOT NULL,
+                total_paise INTEGER NOT NULL,
+                invoice_count INTEGER NOT NULL,
+                PRIMARY KEY (party_key, fy, tds_section)
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vendor_fy_contributions (
+                invoice_id TEXT PRIMARY KEY,
+                party_key TEXT NOT NULL,
+                fy TEXT NOT NULL,
+                tds_section TEXT NOT NULL,
+                amount_paise INTEGER NOT NULL
+            )
+            """
+        )
+
+    # ---------------------------------------------------------
+    # Increments
+    # ---------------------------------------------------------
+
+    def add(self, invoice_id, party, fy, tds_section, amount):
+        """
+        Adds an invoice to the running totals (once per invoice_id).
+        Returns (section_total, party_total) in rupees.
+        """
+        section = tds_section or "UNKNOWN"
+        paise = to_paise(amount)
+
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self.conn.execute(
+                    """
+                    INSERT OR IGNORE INTO vendor_fy_contributions
+                    (invoice_id, party_key, fy, tds_section, amount_paise)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (invoice_id, party, fy, section, paise),
+                )
+
+                if cur.rowcount == 1:
+                    for key in (section, ALL_SECTIONS):
+                        self.conn.execute(
+                            """
+                            INSERT INTO vendor_fy_aggregates
+                            (party_key, fy, tds_section, total_paise, invoice_count)
+                            VALUES (?, ?, ?, ?, 1)
+                            ON CONFLICT (party_key, fy, tds_section) DO UPDATE SET
+                                total_paise = total_paise + excluded.total_paise,
+                                invoice_count = invoice_count + 1
+                            """,
+                            (party, fy, key, paise),
+                        )
+
+                totals = self._totals(party, fy, section)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        return totals
+
+    def remove(self, invoice_id):
+        """Takes an invoice back out of the running totals, if it was added."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    """
+                    SELECT party_key, fy, tds_section, amount_paise
+                    FROM vendor_fy_contributions WHERE invoice_id = ?
+                    """,
+                    (invoice_id,),
+                ).fetchone()
+
+                if row is not None:
+                    party, fy, section, paise = row
+                    self.conn.execute(
+                        "DELETE FROM vendor_fy_contributions WHERE invoice_id = ?",
+                        (invoice_id,),
+                    )
+                    for key in (section, ALL_SECTIONS):
+                        self.conn.execute(
+                            """
+                            UPDATE vendor_fy_aggregates SET
+                                total_paise = total_paise - ?,
+                                invoice_count = invoice_count - 1
+                            WHERE party_key = ? AND fy = ? AND tds_section = ?
+                            """,
+                            (paise, party, fy, key),
+                        )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        return row is not None
+
+    def get(self, party, fy, tds_section=None):
+        """Running total in rupees (all sections when tds_section is None)."""
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT total_paise FROM vendor_fy_aggregates
+                WHERE party_key = ? AND fy = ? AND tds_section = ?
+                """,
+                (party, fy, tds_section or ALL_SECTIONS),
+            ).fetchone()
+        return (row[0] if row else 0) / PAISE_PER_RUPEE
+
+    def _totals(self, party, fy, section):
+        rows = dict(
+            self.conn.execute(
+                """
+                SELECT tds_section, total_paise FROM vendor_fy_aggregates
+                WHERE party_key = ? AND fy = ? AND tds_section IN (?, ?)
+                """,
+                (party, fy, section, ALL_SECTIONS),
+            ).fetchall()
+        )
+        return (
+            rows.get(section, 0) / PAISE_PER_RUPEE,
+            rows.get(ALL_SECTIONS, 0) / PAISE_PER_RUPEE,
+        )
+
+    # ---------------------------------------------------------
+    # Invoice reservation (D6) and settlement
+    # ---------------------------------------------------------
+
+    @staticmethod
+    def _contribution(ctx):
+        """(invoice_id, party, fy, amount) of an invoice, or None."""
+        invoice_id = ctx.get("invoice_id")
+        party = party_key(ctx)
+        fy = fiscal_year(ctx.get("invoice_date"))
+
+        if not invoice_id or not party or not fy:
+            return None
+
+        fields = ctx.get("fields") or {}
+        amount = fields.get("subtotal") or ctx.get("invoice_value") or 0
+        return invoice_id, party, fy, amount
+
+    def _add_invoice(self, ctx):
+        contribution = self._contribution(ctx)
+        if contribution is None:
+            return None
+
+        invoice_id, party, fy, amount = contribution
+        tds_section = self.vendor_sections.get(ctx.get("seller_gstin"))
+        try:
+            totals = self.add(invoice_id, party, fy, tds_section, amount)
+        except (TypeError, ValueError, ArithmeticError):
+            return None
+        return tds_section, fy, totals
+
+    def reserve(self, ctx):
+        """
+        Adds the invoice to the running totals and exposes the totals
+        (including it) and the thresholds on the invoice context.
+        Returns (section_total, party_total) in rupees, or None when the
+        invoice has no FY aggregate key.
+        """
+        added = self._add_invoice(ctx)
+        if added is None:
+            return None
+
+        tds_section, fy, (section_total, party_total) = added
+        ctx.update({
+            "tds_section": tds_section,
+            "fiscal_year": fy,
+            "fy_aggregate_amount": section_total,
+            "fy_aggregate_threshold": self.fy_thresholds.get(tds_section),
+            "fy_vendor_total": party_total,
+            "fy_vendor_threshold": self.cumulative_threshold,
+        })
+        return section_total, party_total
+
+    def settle(self, ctx, decision):
+        """
+        After the decision: an APPROVE invoice stays in (or is added to)
+        the totals, any other decision takes it back out. Returns
+        (section_total, party_total) for APPROVE, otherwise None.
+        """
+        if decision == "APPROVE":
+            added = self._add_invoice(ctx)
+            return added[2] if added else None
+
+        if ctx.get("invoice_id"):
+            self.remove(ctx["invoice_id"])
+        return None
+
+    def close(self):
+        """Close the database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
@@ -1,41 +1,122 @@
 <<<<<<< HEAD
-from src.storage.db import get_conn
-import threading
+import uuid
+from datetime import datetime, timezone
+
+from src.storage.decision_writer import DecisionWriter
+from src.storage.aggregate_store import fiscal_year
 
 class DecisionStore:
-    _lock = threading.Lock()
+    """
+    Decisions are handed to a write-behind DecisionWriter: the calling
+    worker thread only enqueues, and rows reach SQLite in batched group
+    commits. Call flush() where durability matters (end of a run).
+    """
 
-    def __init__(self, db_path):
+    def __init__(
+        self,
+        db_path,
+        batch_size=500,
+        flush_interval=0.5,
+        archive_closed_years=False,
+        archive_dir=None,
+        retries=3,
+    ):
         self.db_path = db_path
+        self.run_id = None
+        self.writer = DecisionWriter(
+            db_path,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            archive_closed_years=archive_closed_years,
+            archive_dir=archive_dir,
+            retries=retries,
+        )
 
-    def log_decision(self, invoice_id, decision, confidence):
-        # Open-per-write is safer + faster under threads
-        with self._lock:
-            conn = get_conn(self.db_path)
-            conn.execute(
-                """
-                INSERT INTO decisions (invoice_id, decision, confidence)
-                VALUES (?, ?, ?)
-                """,
-                (invoice_id, decision, confidence)
-            )
-            conn.close()
+    @classmethod
+    def from_config(cls, config):
+        sqlite_cfg = config["sqlite"]
+        return cls(
+            sqlite_cfg["db_path"],
+            batch_size=sqlite_cfg.get("write_batch_size", 500),
+            flush_interval=sqlite_cfg.get("write_flush_interval_sec", 0.5),
+            archive_closed_years=sqlite_cfg.get("archive_closed_years", False),
+            archive_dir=sqlite_cfg.get("archive_dir"),
+            retries=sqlite_cfg.get("write_retries", 3),
+        )
+
+    def start_run(self, run_id=None):
+        """Tags subsequent decisions with a run id (generated if omitted)."""
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        return self.run_id
+
+    def log_decision(
+        self, invoice_id, decision, confidence, vendor=None, invoice_date=None
+    ):
+        self.writer.submit((
+            invoice_id,
+            decision,
+            confidence,
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            vendor,
+            fiscal_year(invoice_date),
+            self.run_id,
+        ))
+
+    def flush(self, timeout=None):
+        """Blocks until every logged decision is committed; False if not."""
+        return self.writer.flush(timeout)
+
+    def close(self):
+        """Flush pending decisions and stop the writer thread; False if rows were lost."""
+        return self.writer.close()
 =======
 
+import uuid
+from datetime import datetime, timezone
+
 from src.storage.db import get_conn
+from src.storage.aggregate_store import fiscal_year
 
 class DecisionStore:
     def __init__(self, db_path):
         self.conn = get_conn(db_path)
         self.db_path = db_path
+        self.run_id = None
 
-    def log_decision(self, invoice_id, decision, confidence):
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["sqlite"]["db_path"])
+
+    def start_run(self, run_id=None):
+        """Tags subsequent decisions with a run id (generated if omitted)."""
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        return self.run_id
+
+    def log_decision(
+        self, invoice_id, decision, confidence, vendor=None, invoice_date=None
+    ):
         self.conn.execute(
-            "INSERT INTO decisions VALUES (?, ?, ?)",
-            (invoice_id, decision, confidence)
+            """
+            INSERT INTO decisions
+            (invoice_id, decision, confidence, decided_at, vendor, fy, run_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                invoice_id,
+                decision,
+                confidence,
+                datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                vendor,
+                fiscal_year(invoice_date),
+                self.run_id,
+            )
         )
         self.conn.commit()
 
+    def flush(self, timeout=None):
+        """Writes are committed immediately; nothing is pending."""
+        return True
+
     def close(self):
         """Close the database connection."""
         if self.conn:
@@ -0,0 +1,198 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import date
+
+from src.storage.aggregate_store import fiscal_year
+from src.storage.db import get_conn
+from src.storage.schema import DECISION_COLUMNS, archive_closed_years
+from utils.tracing import tracer
+from utils.logging_utils import fields
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """A flush() waiter; ok is False when its rows could not be committed."""
+
+    __slots__ = ("done", "ok")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = True
+
+
+class DecisionWriter:
+    """
+    Write-behind decision writer
+    ----------------------------
+    A single background thread owns one SQLite connection (WAL mode)
+    and drains a queue of decision rows in group commits:
+
+    - commit when `batch_size` rows are pending, or
+    - when `flush_interval` seconds passed since the first pending row
+
+    Callers never block on SQLite; flush() waits until everything
+    queued so far is committed. A failed commit is retried `retries`
+    times; rows that still fail stay queued for the next commit, and
+    flush() / close() return False meanwhile. With archive_closed_years
+    set, decisions of past fiscal years are moved out of the hot table
+    on start-up.
+    """
+
+    INSERT_SQL = (
+        f"INSERT INTO decisions ({', '.join(DECISION_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in DECISION_COLUMNS)})"
+    )
+
+    def __init__(
+        self,
+        db_path,
+        batch_size=500,
+        flush_interval=0.5,
+        archive_closed_years=False,
+        archive_dir=None,
+        retries=3,
+        retry_delay=0.1,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.archive_closed_years = archive_closed_years
+        self.archive_dir = archive_dir
+        self.last_error = None
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_ok = True
+        self._thread = threading.Thread(
+            target=self._run, name="decision-writer", daemon=True
+        )
+        self._thread.start()
+
+        atexit.register(self.close)
+
+    # ---------------------------------------------------------
+    # Producer API
+    # ---------------------------------------------------------
+
+    def submit(self, row):
+        if self._closed:
+            raise RuntimeError("DecisionWriter is closed")
+        self._queue.put(row)
+
+    def flush(self, timeout=None):
+        """
+        Blocks until all rows submitted before this call are committed.
+        False on timeout or when the commit failed (rows stay queued).
+        """
+        if self._closed:
+            return self._close_ok
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout) and request.ok
+
+    def close(self):
+        """Commits what is queued and stops; False if rows were lost."""
+        if self._closed:
+            return self._close_ok
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+        return self._close_ok
+
+    # ---------------------------------------------------------
+    # Writer thread
+    # ---------------------------------------------------------
+
+    def _run(self):
+        conn = get_conn(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        if self.archive_closed_years:
+            try:
+                archive_closed_years(
+                    conn, fiscal_year(date.today().isoformat()), self.archive_dir
+                )
+            except Exception as e:
+                self.last_error = e
+                logger.error("Decision archive failed: %s", e)
+
+        pending, waiters = [], []
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, _FlushRequest):
+                waiters.append(item)
+            elif item is not None:
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = (
+                stopping
+                or waiters
+                or len(pending) >= self.batch_size
+                or (deadline is not None and time.monotonic() >= deadline)
+            )
+            if not due:
+                continue
+
+            ok = not pending or self._commit(conn, pending)
+
+            for request in waiters:
+                request.ok = ok
+                request.done.set()
+            waiters = []
+
+            if ok:
+                pending, deadline = [], None
+            elif stopping:
+                self._close_ok = False
+                logger.error(
+                    "Decisions lost on close", extra=fields(rows=len(pending))
+                )
+            else:
+                # Kept for the next commit
+                deadline = time.monotonic() + self.flush_interval
+
+        conn.close()
+
+    def _commit(self, conn, rows):
+        """Writes rows in one transaction, retrying; True once committed."""
+        for attempt in range(self.retries + 1):
+            try:
+                with tracer.span("db.commit"):
+                    conn.executemany(self.INSERT_SQL, rows)
+                    conn.commit()
+                tracer.count("db.rows_written", len(rows))
+                return True
+            except Exception as e:
+                conn.rollback()
+                self.last_error = e
+                logger.error(
+                    "Decision write failed: %s", e,
+                    extra=fields(rows=len(rows), attempt=attempt + 1),
+                )
+                if attempt < self.retries:
+                    time.sleep(self.retry_delay * (attempt + 1))
+        return False
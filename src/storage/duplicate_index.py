@@ -0,0 +1,245 @@
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from utils.bloom_filter import BloomFilter
+from utils.line_item_utils import to_paise
+
+
+DEFAULT_FIELDS = ["vendor_gstin", "invoice_number", "invoice_amount"]
+DEFAULT_WINDOW_DAYS = 365
+
+# Policy field name -> where the value may live in an invoice context.
+# invoice_number never falls back to invoice_id: a resubmission gets a
+# new id, so keying on it would never match.
+FIELD_SOURCES = {
+    "vendor_gstin": ("vendor_gstin", "seller_gstin"),
+    "invoice_number": ("invoice_number",),
+    "invoice_amount": ("invoice_amount", "total_amount", "invoice_value"),
+}
+
+
+def _lookup(ctx, name):
+    fields = ctx.get("fields") or {}
+    if not isinstance(fields, dict):
+        fields = {}
+
+    for key in FIELD_SOURCES.get(name, (name,)):
+        for source in (fields, ctx):
+            value = source.get(key)
+            if value not in (None, ""):
+                return value
+
+    if name == "vendor_gstin":
+        vendor = fields.get("vendor")
+        if isinstance(vendor, dict):
+            return vendor.get("gstin")
+
+    return None
+
+
+def _normalize(name, value):
+    if name.endswith("_amount"):
+        try:
+            return str(to_paise(value))
+        except (TypeError, ValueError):
+            return None
+    return str(value).strip().upper()
+
+
+def _invoice_day(ctx):
+    """Invoice date as a day ordinal (today when unknown)."""
+    value = ctx.get("invoice_date") or (ctx.get("fields") or {}).get("invoice_date")
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value[:10], "%Y-%m-%d").toordinal()
+        except ValueError:
+            pass
+    return date.today().toordinal()
+
+
+class DuplicateIndex:
+    """
+    Duplicate Invoice Index
+    -----------------------
+    SQLite table keyed on the policy's duplicate_fields (composite
+    primary key), matched within duplicate_window_days.
+
+    - O(1) lookup per invoice (primary-key probe, never a scan)
+    - Optional in-memory Bloom filter in front: keys never seen
+      before are inserted without a read
+    - The recorded invoice_id is kept, so re-validating the same
+      invoice (a re-run) is not reported as its own duplicate
+    - Safe to share across the pipeline's worker threads
+    """
+
+    TABLE = "duplicate_index"
+
+    def __init__(
+        self,
+        db_path,
+        fields=None,
+        window_days=DEFAULT_WINDOW_DAYS,
+        use_bloom=True,
+        bloom_capacity=1_000_000,
+        bloom_error_rate=0.001,
+    ):
+        self.fields = list(fields or DEFAULT_FIELDS)
+        for name in self.fields:
+            if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", name):
+                raise ValueError(f"Invalid duplicate field name: {name}")
+
+        self.window_days = int(window_days)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_table()
+
+        self.bloom = None
+        if use_bloom:
+            self.bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+            self._warm_bloom()
+
+    @classmethod
+    def from_config(cls, config):
+        policy = config.get("company_policy", {}).get(
+            "invoice_acceptance_rules", {}
+        )
+        options = config.get("duplicate_detection", {})
+
+        return cls(
+            db_path=config["sqlite"]["db_path"],
+            fields=policy.get("duplicate_fields", DEFAULT_FIELDS),
+            window_days=policy.get("duplicate_window_days", DEFAULT_WINDOW_DAYS),
+            use_bloom=options.get("use_bloom_filter", True),
+            bloom_capacity=options.get("bloom_capacity", 1_000_000),
+        )
+
+    # ---------------------------------------------------------
+    # Schema
+    # ---------------------------------------------------------
+
+    def _create_table(self):
+        columns = ", ".join(f"{name} TEXT NOT NULL" for name in self.fields)
+        key = ", ".join(self.fields)
+
+        self.conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                {columns},
+                invoice_day INTEGER NOT NULL,
+                invoice_id TEXT,
+                PRIMARY KEY ({key})
+            ) WITHOUT ROWID
+            """
+        )
+        existing = {
+            row[1] for row in self.conn.execute(f"PRAGMA table_info({self.TABLE})")
+        }
+        if "invoice_id" not in existing:
+            # Tables created before invoice ids were recorded
+            self.conn.execute(f"ALTER TABLE {self.TABLE} ADD COLUMN invoice_id TEXT")
+        self.conn.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_day
+            ON {self.TABLE} (invoice_day)
+            """
+        )
+        self.conn.commit()
+
+    def _warm_bloom(self):
+        # Expired rows are removed by purge_expired(), so load everything
+        rows = self.conn.execute(
+            f"SELECT {', '.join(self.fields)} FROM {self.TABLE}"
+        )
+        for row in rows:
+            self.bloom.add(self._bloom_key(row))
+
+    # ---------------------------------------------------------
+    # Lookup
+    # ---------------------------------------------------------
+
+    def make_key(self, ctx):
+        """
+        Normalized composite key, or None when a key field is missing
+        (such invoices cannot be matched reliably).
+        """
+        key = []
+        for name in self.fields:
+            value = _lookup(ctx, name)
+            value = None if value is None else _normalize(name, value)
+            if not value:
+                return None
+            key.append(value)
+        return tuple(key)
+
+    @staticmethod
+    def _bloom_key(key):
+        return "\x1f".join(key)
+
+    def check_and_add(self, ctx):
+        """
+        Returns True if another invoice with the same key was recorded
+        within the window; otherwise records this one and returns False.
+        Returns None (nothing recorded) when a key field is missing.
+        """
+        key = self.make_key(ctx)
+        if key is None:
+            return None
+
+        invoice_id = ctx.get("invoice_id")
+        day = _invoice_day(ctx)
+        bloom_key = self._bloom_key(key)
+        where = " AND ".join(f"{name} = ?" for name in self.fields)
+
+        with self._lock:
+            if self.bloom is None or bloom_key in self.bloom:
+                row = self.conn.execute(
+                    f"SELECT invoice_day, invoice_id FROM {self.TABLE} WHERE {where}",
+                    key,
+                ).fetchone()
+
+                if (
+                    row
+                    and abs(day - row[0]) <= self.window_days
+                    and (invoice_id is None or row[1] != invoice_id)
+                ):
+                    return True
+
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} "
+                f"({', '.join(self.fields)}, invoice_day, invoice_id) "
+                f"VALUES ({', '.join('?' for _ in self.fields)}, ?, ?)",
+                (*key, day, invoice_id),
+            )
+            self.conn.commit()
+
+            if self.bloom is not None:
+                self.bloom.add(bloom_key)
+
+        return False
+
+    # ---------------------------------------------------------
+    # Maintenance
+    # ---------------------------------------------------------
+
+    def purge_expired(self, today=None):
+        """Drops entries older than the window. Returns rows removed."""
+        today = today or date.today()
+        cutoff = today.toordinal() - self.window_days
+
+        with self._lock:
+            cur = self.conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE invoice_day < ?", (cutoff,)
+            )
+            self.conn.commit()
+            return cur.rowcount
+
+    def close(self):
+        """Close the database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_TTL_SEC = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Stored explanations are invoice-agnostic; the id is put back on a hit
+INVOICE_PLACEHOLDER = "{{invoice_id}}"
+
+
+def explanation_signature(conflicts, failed_ids, review_ids, model):
+    """
+    Normalized cache key: the same conflict set on the same checks
+    produces the same key regardless of ordering or whitespace.
+    """
+    normalized = {
+        "conflicts": sorted({" ".join(str(c).split()).lower() for c in conflicts or []}),
+        "failed": sorted({str(c) for c in failed_ids or []}),
+        "review": sorted({str(c) for c in review_ids or []}),
+        "model": model or "",
+    }
+    return hashlib.sha256(
+        json.dumps(normalized, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def _swap(value, old, new):
+    if not old:
+        return value
+    if isinstance(value, str):
+        return value.replace(old, new)
+    if isinstance(value, list):
+        return [_swap(v, old, new) for v in value]
+    return value
+
+
+class ExplanationCache:
+    """
+    LLM Explanation Cache
+    ---------------------
+    Persistent (SQLite) map from explanation signature to the
+    normalized explanation.
+
+    - Entries expire after `ttl_sec`
+    - At most `max_entries` are kept; least recently used go first
+    - hits / misses are counted for the hit-rate metric
+    - the invoice id is stored as a placeholder, so a hit reads
+      naturally for the invoice asking; the resolver sends no other
+      invoice data in prompts whose answer is cached
+    """
+
+    TABLE = "llm_explanation_cache"
+
+    def __init__(self, db_path, ttl_sec=DEFAULT_TTL_SEC, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                key TEXT PRIMARY KEY,
+                explanation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_last_used "
+            f"ON {self.TABLE} (last_used)"
+        )
+        self.conn.commit()
+
+    @classmethod
+    def from_config(cls, config):
+        llm_cfg = config.get("llm", {})
+        return cls(
+            db_path=config["sqlite"]["db_path"],
+            ttl_sec=llm_cfg.get("cache_ttl_sec", DEFAULT_TTL_SEC),
+            max_entries=llm_cfg.get("cache_max_entries", DEFAULT_MAX_ENTRIES),
+        )
+
+    # ---------------------------------------------------------
+    # Lookup / store
+    # ---------------------------------------------------------
+
+    def get(self, key, invoice_id=None):
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT explanation, created_at FROM {self.TABLE} WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_sec:
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                f"UPDATE {self.TABLE} SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self.conn.commit()
+            self.hits += 1
+
+        return _swap(json.loads(row[0]), INVOICE_PLACEHOLDER, invoice_id)
+
+    def put(self, key, explanation, invoice_id=None):
+        explanation = _swap(explanation, invoice_id, INVOICE_PLACEHOLDER)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} "
+                "(key, explanation, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(explanation), now, now),
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        self.conn.execute(
+            f"DELETE FROM {self.TABLE} WHERE created_at < ?", (now - self.ttl_sec,)
+        )
+        self.conn.execute(
+            f"""
+            DELETE FROM {self.TABLE} WHERE key IN (
+                SELECT key FROM {self.TABLE}
+                ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate()}
+
+    def close(self):
+        """Close the database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
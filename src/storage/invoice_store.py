@@ -1,27 +1,72 @@
 
+import sqlite3
+
 from src.storage.db import get_conn
+from src.storage.schema import SEEN, archive_sources
 
 class InvoiceStore:
-    def __init__(self, db_path):
+    def __init__(self, db_path, archive_dir=None):
         self.conn = get_conn(db_path)
         self.db_path = db_path
+        self.archive_dir = archive_dir
+        # [(connection, table)] of archived fiscal years, opened once
+        self._archives = []
+        self.refresh_archives()
+
+    @classmethod
+    def from_config(cls, config):
+        sqlite_cfg = config["sqlite"]
+        return cls(sqlite_cfg["db_path"], archive_dir=sqlite_cfg.get("archive_dir"))
+
+    def refresh_archives(self):
+        """Re-lists the archives (call after archive_closed_years ran)."""
+        self._close_archives()
+        for table, path in archive_sources(self.conn, self.archive_dir):
+            if path is None:
+                self._archives.append((self.conn, table))
+            else:
+                # Read-only: archive files are never migrated or written here
+                archive = sqlite3.connect(
+                    f"{path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+                )
+                self._archives.append((archive, table))
 
     def is_duplicate(self, invoice_id):
+        # Index probe that stops at the first hit (no COUNT over the log)
         cur = self.conn.execute(
-            "SELECT COUNT(*) FROM decisions WHERE invoice_id=?",
+            "SELECT 1 FROM decisions WHERE invoice_id=? LIMIT 1",
             (invoice_id,)
         )
-        return cur.fetchone()[0] > 0
+        if cur.fetchone() is not None:
+            return True
+
+        # Closed fiscal years moved out by archive_closed_years
+        for conn, table in self._archives:
+            found = conn.execute(
+                f"SELECT 1 FROM {table} WHERE invoice_id=? LIMIT 1",
+                (invoice_id,)
+            ).fetchone()
+            if found is not None:
+                return True
+        return False
 
     def record(self, invoice_id):
         self.conn.execute(
-            "INSERT INTO decisions VALUES (?, ?, ?)",
-            (invoice_id, "SEEN", 0.0)
+            "INSERT INTO decisions (invoice_id, decision, confidence) "
+            "VALUES (?, ?, ?)",
+            (invoice_id, SEEN, 0.0)
         )
         self.conn.commit()
 
+    def _close_archives(self):
+        for conn, _ in self._archives:
+            if conn is not self.conn:
+                conn.close()
+        self._archives = []
+
     def close(self):
-        """Close the database connection."""
+        """Close the database connections."""
+        self._close_archives()
         if self.conn:
             self.conn.close()
             self.conn = None
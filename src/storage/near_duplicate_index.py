@@ -0,0 +1,305 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from array import array
+from collections import defaultdict
+
+from utils.minhash import MinHasher, optimal_bands
+from utils.line_item_utils import to_paise
+
+
+DEFAULT_THRESHOLD = 0.95
+
+# LSH is banded for this much lower similarity, so true matches become
+# candidates with near certainty; each candidate is then confirmed on
+# the exact weighted features
+CANDIDATE_MARGIN = 0.25
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+NUMBER_RE = re.compile(r"^(.*?)(\d+)$")
+
+# Integer feature weights (duplicate_detection.near_duplicate_weights
+# overrides them per key). A resubmission keeps vendor, date and items
+# and changes the volatile fields (invoice number, a small amount edit),
+# so the stable fields carry almost all of the weight. On a typical
+# invoice (3-6 item words, total weight ~65-75) each volatile token is
+# ~1.5%, and a new number plus an amount change still scores >= 0.95;
+# invoices without line items (total ~35) need the same number block.
+# The date (12 + 4) is ~25%, so the same bill on another date (recurring
+# billing) scores <= 0.7, and the same bill from another vendor < 0.5.
+WEIGHTS = {
+    "vendor": 32,
+    "date": 12,
+    "month": 4,
+    "item_word": 3,
+    "amount": 1,
+    "amount_band": 1,
+    "number_series": 1,
+    "number_block": 1,
+}
+
+# Token prefix -> WEIGHTS key (stored features are re-weighted on load)
+TOKEN_KINDS = {
+    "v": "vendor",
+    "d": "date",
+    "m": "month",
+    "li": "item_word",
+    "a": "amount",
+    "a~": "amount_band",
+    "n": "number_series",
+    "n#": "number_block",
+}
+
+
+def invoice_features(ctx, weights=WEIGHTS):
+    """
+    Weighted feature set {token: weight} of a normalized invoice
+    (extractor output): seller GSTIN, invoice date, invoice value,
+    line-item description words and invoice number.
+    """
+    features = {}
+
+    gstin = ctx.get("seller_gstin")
+    if gstin:
+        features[f"v:{str(gstin).strip().upper()}"] = weights["vendor"]
+
+    invoice_date = ctx.get("invoice_date")
+    if invoice_date:
+        features[f"d:{invoice_date}"] = weights["date"]
+        features[f"m:{str(invoice_date)[:7]}"] = weights["month"]
+
+    try:
+        paise = to_paise(ctx.get("invoice_value"))
+        features[f"a:{paise}"] = weights["amount"]
+        features[f"a~:{round(paise / 100_000)}"] = weights["amount_band"]  # ₹1000
+    except (TypeError, ValueError):
+        pass
+
+    for item in ctx.get("line_items") or []:
+        if isinstance(item, dict) and item.get("description"):
+            for word in TOKEN_RE.findall(str(item["description"]).lower()):
+                features[f"li:{word}"] = weights["item_word"]
+
+    # Series prefix + block of 10 sequence numbers: the next number of
+    # the same series (a typical resubmission) keeps both tokens
+    number = re.sub(r"[^A-Z0-9]", "", str(ctx.get("invoice_number") or "").upper())
+    if number:
+        match = NUMBER_RE.match(number)
+        series, sequence = (match.group(1), int(match.group(2))) if match else (number, 0)
+        features[f"n:{series}"] = weights["number_series"]
+        features[f"n#:{series}:{sequence // 10}"] = weights["number_block"]
+
+    return {token: weight for token, weight in features.items() if weight}
+
+
+def reweighted(features, weights):
+    """Stored features with the current weights (unknown kinds dropped)."""
+    result = {}
+    for token in features:
+        kind = TOKEN_KINDS.get(token.split(":", 1)[0])
+        if kind and weights[kind]:
+            result[token] = weights[kind]
+    return result
+
+
+def weighted_jaccard(a, b):
+    """sum(min) / sum(max) over the union of two weighted feature sets."""
+    union = a.keys() | b.keys()
+    if not union:
+        return 0.0
+    top = sum(min(a.get(t, 0), b.get(t, 0)) for t in union)
+    return top / sum(max(a.get(t, 0), b.get(t, 0)) for t in union)
+
+
+class NearDuplicateIndex:
+    """
+    Near-Duplicate Invoice Index (MinHash + LSH)
+    --------------------------------------------
+    - Each invoice becomes a weighted MinHash signature of its feature
+      tokens (estimates the same weighted Jaccard the matches are
+      confirmed with)
+    - Signatures are banded into LSH buckets (tuned for threshold minus
+      CANDIDATE_MARGIN), so a lookup only compares against invoices
+      sharing a bucket (sublinear in history size)
+    - Candidates are confirmed by exact weighted Jaccard >= threshold
+    - An indexed invoice only matches invoices indexed before it, so
+      re-running a batch does not flag the originals
+    - Updated incrementally; optionally persisted to SQLite
+    """
+
+    TABLE = "near_duplicate_signatures"
+
+    def __init__(
+        self, db_path=None, threshold=DEFAULT_THRESHOLD, num_perm=128, weights=None
+    ):
+        self.threshold = threshold
+        self.weights = {**WEIGHTS, **(weights or {})}
+        if any(
+            not isinstance(w, int) or w < 0 for w in self.weights.values()
+        ) or set(self.weights) != set(WEIGHTS):
+            raise ValueError(f"Invalid near-duplicate weights: {weights!r}")
+        # Signatures are only comparable under the same weights
+        self.scheme = json.dumps(self.weights, sort_keys=True)
+
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands, self.rows = optimal_bands(
+            max(threshold - CANDIDATE_MARGIN, 0.1), num_perm
+        )
+
+        self._lock = threading.Lock()
+        self._features = {}
+        self._order = {}
+        self._buckets = [defaultdict(set) for _ in range(self.bands)]
+
+        self.conn = None
+        if db_path is not None:
+            self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self.conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    invoice_id TEXT PRIMARY KEY,
+                    num_perm INTEGER NOT NULL,
+                    signature BLOB NOT NULL,
+                    features TEXT,
+                    scheme TEXT
+                )
+                """
+            )
+            columns = {
+                row[1]
+                for row in self.conn.execute(f"PRAGMA table_info({self.TABLE})")
+            }
+            for column in ("features", "scheme"):
+                if column not in columns:
+                    self.conn.execute(
+                        f"ALTER TABLE {self.TABLE} ADD COLUMN {column} TEXT"
+                    )
+            self.conn.commit()
+            self._load()
+
+    @classmethod
+    def from_config(cls, config):
+        policy = config.get("company_policy", {}).get(
+            "invoice_acceptance_rules", {}
+        )
+        settings = config.get("duplicate_detection", {})
+        return cls(
+            db_path=config["sqlite"]["db_path"],
+            threshold=policy.get("near_duplicate_threshold", DEFAULT_THRESHOLD),
+            weights=settings.get("near_duplicate_weights"),
+        )
+
+    def _load(self):
+        # Rows written before features were stored cannot be verified
+        rows = self.conn.execute(
+            f"SELECT invoice_id, num_perm, signature, features, scheme "
+            f"FROM {self.TABLE} WHERE features IS NOT NULL ORDER BY rowid"
+        ).fetchall()
+
+        stale = []
+        for invoice_id, num_perm, blob, features, scheme in rows:
+            features = json.loads(features)
+            if num_perm == self.hasher.num_perm and scheme == self.scheme:
+                signature = array("Q")
+                signature.frombytes(blob)
+            else:
+                # Other weights / signature scheme: re-signed once, here
+                features = reweighted(features, self.weights)
+                signature = self.hasher.weighted_signature(features)
+                stale.append((invoice_id, signature, features))
+            self._insert(invoice_id, signature, features)
+
+        for invoice_id, signature, features in stale:
+            self._store(invoice_id, signature, features)
+        if stale:
+            self.conn.commit()
+
+    def _store(self, invoice_id, signature, features):
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {self.TABLE} "
+            "(invoice_id, num_perm, signature, features, scheme) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                invoice_id,
+                self.hasher.num_perm,
+                signature.tobytes(),
+                json.dumps(features),
+                self.scheme,
+            ),
+        )
+
+    # ---------------------------------------------------------
+    # LSH
+    # ---------------------------------------------------------
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, hashlib.blake2b(
+                signature[start:start + self.rows].tobytes(), digest_size=8
+            ).digest()
+
+    def _insert(self, invoice_id, signature, features):
+        self._features[invoice_id] = features
+        self._order[invoice_id] = len(self._order)
+        for band, key in self._band_keys(signature):
+            self._buckets[band][key].add(invoice_id)
+
+    def _matches(self, invoice_id, signature, features):
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(invoice_id)
+
+        position = self._order.get(invoice_id)
+        matches = []
+        for candidate in candidates:
+            if position is not None and self._order[candidate] > position:
+                continue
+            similarity = weighted_jaccard(features, self._features[candidate])
+            if similarity >= self.threshold:
+                matches.append((candidate, round(similarity, 3)))
+
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+    def _prepare(self, ctx):
+        features = invoice_features(ctx, self.weights)
+        return features, self.hasher.weighted_signature(features)
+
+    # ---------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------
+
+    def query(self, ctx):
+        """[(invoice_id, similarity)] of indexed near-duplicates."""
+        features, signature = self._prepare(ctx)
+        with self._lock:
+            return self._matches(ctx.get("invoice_id"), signature, features)
+
+    def check_and_add(self, ctx):
+        """Looks up near-duplicates, then indexes this invoice."""
+        invoice_id = ctx.get("invoice_id")
+        features, signature = self._prepare(ctx)
+
+        with self._lock:
+            matches = self._matches(invoice_id, signature, features)
+
+            if invoice_id and invoice_id not in self._features:
+                self._insert(invoice_id, signature, features)
+
+                if self.conn is not None:
+                    self._store(invoice_id, signature, features)
+                    self.conn.commit()
+
+        return matches
+
+    def __len__(self):
+        return len(self._features)
+
+    def close(self):
+        """Close the database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,218 @@
+import json
+from pathlib import Path
+
+from src.storage.report_sink import ReportSink
+
+
+DEFAULT_ROW_GROUP_SIZE = 10_000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export needs pyarrow: pip install pyarrow"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def _as_list(value):
+    """Report list fields may be None, a string or a list."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+def _as_json(value):
+    if value is None or value == {}:
+        return None
+    return json.dumps(value, default=str)
+
+
+def report_schema(pa):
+    labels = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("run_id", labels),
+        ("invoice_id", pa.string()),
+        ("decision", labels),
+        ("final_confidence", pa.float64()),
+        ("primary_reason", pa.string()),
+        ("failed_checks", pa.list_(pa.string())),
+        ("review_flags", pa.list_(pa.string())),
+        ("conflicts", pa.list_(pa.string())),
+        ("escalation_required", pa.bool_()),
+        ("llm_reasoning", pa.list_(pa.string())),
+        ("processing_time_sec", pa.float64()),
+    ])
+
+
+def explanation_schema(pa):
+    return pa.schema([
+        ("run_id", pa.dictionary(pa.int32(), pa.string())),
+        ("invoice_id", pa.string()),
+        ("llm_reasoning", pa.list_(pa.string())),
+    ])
+
+
+def check_schema(pa):
+    labels = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("run_id", labels),
+        ("invoice_id", pa.string()),
+        ("check_id", labels),
+        ("category", labels),
+        ("status", labels),
+        ("reason", pa.string()),
+        ("confidence_impact", pa.float64()),
+        # Free-form; JSON text
+        ("evidence", pa.string()),
+        ("metadata", pa.string()),
+    ])
+
+
+class _RowGroupWriter:
+    """Buffers rows column-wise; every `row_group_size` rows -> one row group."""
+
+    def __init__(self, pa, pq, path, schema, row_group_size):
+        self.pa = pa
+        self.path = Path(path)
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._columns = {name: [] for name in schema.names}
+        self._writer = pq.ParquetWriter(
+            str(self.path), schema, compression="zstd", use_dictionary=True
+        )
+
+    def append(self, row):
+        for name, values in self._columns.items():
+            values.append(row.get(name))
+        self.rows += 1
+        if len(self._columns[self.schema.names[0]]) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._columns[self.schema.names[0]]:
+            return
+        table = self.pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._columns = {name: [] for name in self.schema.names}
+
+    def close(self):
+        if self._writer is not None:
+            self.flush()
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetReportSink(ReportSink):
+    """
+    Parquet Report Sink
+    -------------------
+    Raw reports and their per-check ValidationResults as two Parquet
+    files (reports_<run_id>.parquet, checks_<run_id>.parquet).
+
+    - decision / status / check_id / category are dictionary-encoded
+    - list fields (failed_checks, review_flags, conflicts,
+      llm_reasoning) stay list<string>
+    - a row group is written every `row_group_size` rows as results
+      come in; the files are complete once the sink is closed
+    - reports.llm_reasoning only holds explanations made inline; deferred
+      ones go to explanations_<run_id>.parquet (run_id, invoice_id,
+      llm_reasoning), written once the explanation stage has finished
+
+        pd.read_parquet("data/reports/checks_<run_id>.parquet")
+    """
+
+    name = "parquet"
+
+    def __init__(self, out_dir, run_id, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        super().__init__()
+        pa, pq = _require_pyarrow()
+        self.run_id = run_id
+
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.reports_path = out_dir / f"reports_{run_id}.parquet"
+        self.checks_path = out_dir / f"checks_{run_id}.parquet"
+        self.explanations_path = out_dir / f"explanations_{run_id}.parquet"
+
+        self._reports = _RowGroupWriter(
+            pa, pq, self.reports_path, report_schema(pa), row_group_size
+        )
+        self._checks = _RowGroupWriter(
+            pa, pq, self.checks_path, check_schema(pa), row_group_size
+        )
+
+    def _write(self, report, results=None):
+        invoice_id = report.get("invoice_id")
+        confidence = report.get("final_confidence")
+        elapsed = report.get("processing_time_sec")
+
+        self._reports.append({
+            "run_id": self.run_id,
+            "invoice_id": None if invoice_id is None else str(invoice_id),
+            "decision": report.get("decision"),
+            "final_confidence": None if confidence is None else float(confidence),
+            "primary_reason": report.get("primary_reason"),
+            "failed_checks": _as_list(report.get("failed_checks")),
+            "review_flags": _as_list(report.get("review_flags")),
+            "conflicts": _as_list(report.get("conflicts")),
+            "escalation_required": bool(report.get("escalation_required")),
+            "llm_reasoning": _as_list(report.get("llm_reasoning")),
+            "processing_time_sec": None if elapsed is None else float(elapsed),
+        })
+
+        for result in results or []:
+            self._checks.append({
+                "run_id": self.run_id,
+                "invoice_id": None if invoice_id is None else str(invoice_id),
+                "check_id": result.check_id,
+                "category": result.category,
+                "status": result.status,
+                "reason": result.reason,
+                "confidence_impact": float(result.confidence_impact or 0.0),
+                "evidence": _as_json(result.evidence),
+                "metadata": _as_json(result.metadata),
+            })
+
+    def close(self):
+        with self._lock:
+            self._reports.close()
+            self._checks.close()
+
+    def _explanations_done(self):
+        """Writes the deferred explanations received for this run."""
+        explanations = self.explanations()
+        if not explanations:
+            return
+
+        pa, pq = _require_pyarrow()
+        table = pa.Table.from_pydict(
+            {
+                "run_id": [self.run_id] * len(explanations),
+                "invoice_id": [str(invoice_id) for invoice_id in explanations],
+                "llm_reasoning": [_as_list(e) for e in explanations.values()],
+            },
+            schema=explanation_schema(pa),
+        )
+        pq.write_table(table, str(self.explanations_path), compression="zstd")
+
+    def location(self):
+        return str(self.reports_path)
+
+    def __iter__(self):
+        """Reports as written plus deferred explanations (close the sink first)."""
+        _, pq = _require_pyarrow()
+        for batch in pq.ParquetFile(str(self.reports_path)).iter_batches():
+            for report in batch.to_pylist():
+                yield self._joined(report)
+
+    def read_checks(self):
+        """Per-check results as a pandas DataFrame (close the sink first)."""
+        _, pq = _require_pyarrow()
+        return pq.read_table(str(self.checks_path)).to_pandas()
@@ -0,0 +1,332 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class ReportSink:
+    """
+    Report Sink
+    -----------
+    Where the pipeline puts each report as soon as its invoice finishes
+    (completion order), instead of collecting one big list.
+
+    - write(report, results): one call per report; `results` are the
+      invoice's ValidationResults (sinks that keep per-check rows use them)
+    - close(): flushes; the sink stays readable afterwards
+    - iteration / len(): reads the reports back; the sink is the handle
+      run_compliance_pipeline returns
+
+    Deferred LLM explanations land after the report is written, through
+    add_explanation(invoice_id, explanation) (also after close()). Written
+    reports are never modified: reads join the explanations in, and file
+    sinks persist them next to the reports. explanations_done() marks the
+    end (explanations_final).
+    """
+
+    name = None
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._explanations = {}
+        # Set once explanations_done() ran; reads are final from then on
+        self.explanations_final = False
+
+    def write(self, report, results=None):
+        with self._lock:
+            self._write(report, results)
+            self.count += 1
+
+    def _write(self, report, results=None):
+        raise NotImplementedError
+
+    def add_explanation(self, invoice_id, explanation):
+        with self._lock:
+            self._explanations[invoice_id] = explanation
+            self._add_explanation(invoice_id, explanation)
+
+    def _add_explanation(self, invoice_id, explanation):
+        pass
+
+    def explanations(self):
+        """{invoice_id: explanation} received so far."""
+        with self._lock:
+            return dict(self._explanations)
+
+    def explanations_done(self):
+        """Called once no more explanations will arrive for this run."""
+        self._explanations_done()
+        self.explanations_final = True
+
+    def _explanations_done(self):
+        pass
+
+    def _joined(self, report):
+        """The report with its deferred explanation, if one arrived."""
+        explanation = self._explanations.get(report.get("invoice_id"))
+        if explanation is None:
+            return report
+        return {**report, "llm_reasoning": explanation}
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def location(self):
+        return None
+
+    def __iter__(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def to_list(self):
+        return list(self)
+
+
+class MemoryReportSink(ReportSink):
+    """The previous behavior: reports kept in a list (the default)."""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+
+    def _write(self, report, results=None):
+        self.reports.append(report)
+
+    def __iter__(self):
+        return iter([self._joined(report) for report in self.reports])
+
+    def __getitem__(self, index):
+        return self._joined(self.reports[index])
+
+
+class NDJSONReportSink(ReportSink):
+    """
+    One JSON object per line. Each line is flushed when written, so a
+    crash keeps every finished report. Deferred explanations are appended
+    to <name>.explanations.ndjson ({"invoice_id", "llm_reasoning"} lines).
+    """
+
+    name = "ndjson"
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.explanations_path = self.path.with_suffix(".explanations.ndjson")
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.explanations_path.unlink(missing_ok=True)
+
+    def _write(self, report, results=None):
+        self._file.write(json.dumps(report, default=str) + "\n")
+        self._file.flush()
+
+    def _add_explanation(self, invoice_id, explanation):
+        with open(self.explanations_path, "a", encoding="utf-8") as f:
+            f.write(
+                json.dumps(
+                    {"invoice_id": invoice_id, "llm_reasoning": explanation},
+                    default=str,
+                )
+                + "\n"
+            )
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def location(self):
+        return str(self.path)
+
+    def __iter__(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield self._joined(json.loads(line))
+
+
+class SQLiteReportSink(ReportSink):
+    """
+    Reports as JSON rows of run_reports, keyed by (run_id, seq).
+    Rows are buffered and inserted in one short transaction every
+    `commit_every` reports and on close, so the sink never holds a write
+    lock on the (shared) state DB between invoices.
+    """
+
+    TABLE = "run_reports"
+
+    name = "sqlite"
+
+    def __init__(self, db_path, run_id, commit_every=100):
+        super().__init__()
+        self.db_path = str(db_path)
+        self.run_id = run_id
+        self.commit_every = max(1, commit_every)
+        self._pending = []
+
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                run_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                invoice_id TEXT,
+                decision TEXT,
+                escalation_required INTEGER,
+                report TEXT NOT NULL,
+                PRIMARY KEY (run_id, seq)
+            )
+            """
+        )
+        self.conn.execute(f"DELETE FROM {self.TABLE} WHERE run_id = ?", (run_id,))
+        self.conn.commit()
+
+    def _write(self, report, results=None):
+        self._pending.append((
+            self.run_id,
+            self.count,
+            report.get("invoice_id"),
+            report.get("decision"),
+            int(bool(report.get("escalation_required"))),
+            json.dumps(report, default=str),
+        ))
+        if len(self._pending) >= self.commit_every:
+            self._insert_pending()
+
+    def _insert_pending(self):
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {self.TABLE} "
+                "(run_id, seq, invoice_id, decision, escalation_required, report) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending = []
+
+    def flush(self):
+        with self._lock:
+            self._insert_pending()
+
+    def location(self):
+        return f"{self.db_path}#{self.TABLE}?run_id={self.run_id}"
+
+    def __iter__(self):
+        self.flush()
+        with self._lock:
+            has_explanations = self.conn.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'report_explanations'"
+            ).fetchone()
+            if has_explanations:
+                rows = self.conn.execute(
+                    f"SELECT r.report, e.explanation FROM {self.TABLE} r "
+                    "LEFT JOIN report_explanations e "
+                    "ON e.run_id = r.run_id AND e.invoice_id = r.invoice_id "
+                    "WHERE r.run_id = ? ORDER BY r.seq",
+                    (self.run_id,),
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    f"SELECT report, NULL FROM {self.TABLE} "
+                    "WHERE run_id = ? ORDER BY seq",
+                    (self.run_id,),
+                ).fetchall()
+
+        for text, explanation in rows:
+            report = self._joined(json.loads(text))
+            if explanation is not None:
+                report["llm_reasoning"] = json.loads(explanation)
+            yield report
+
+
+class TeeReportSink(ReportSink):
+    """Writes to several sinks; reads back from the first one."""
+
+    def __init__(self, sinks):
+        super().__init__()
+        self.sinks = list(sinks)
+        self.name = "+".join(sink.name for sink in self.sinks)
+
+    def _write(self, report, results=None):
+        for sink in self.sinks:
+            sink.write(report, results)
+
+    def _add_explanation(self, invoice_id, explanation):
+        for sink in self.sinks:
+            sink.add_explanation(invoice_id, explanation)
+
+    def _explanations_done(self):
+        for sink in self.sinks:
+            sink.explanations_done()
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def location(self):
+        return [sink.location() for sink in self.sinks]
+
+    def __iter__(self):
+        return iter(self.sinks[0])
+
+
+def sink_from_config(config, run_id):
+    """
+    config["reports"]["sink"]: "memory" (default), "ndjson" (one file per
+    run under reports.dir), "sqlite" (run_reports in the state DB) or
+    "parquet" (reports + per-check results under reports.dir).
+    With reports.export_parquet, Parquet files are written alongside.
+    """
+    reports_cfg = config.get("reports", {})
+    sink = _make_sink(config, reports_cfg.get("sink", "memory"), run_id)
+
+    if reports_cfg.get("export_parquet") and sink.name != "parquet":
+        sink = TeeReportSink([sink, _make_sink(config, "parquet", run_id)])
+    return sink
+
+
+def _make_sink(config, kind, run_id):
+    reports_cfg = config.get("reports", {})
+    reports_dir = reports_cfg.get("dir") or Path(config["data_dir"]) / "reports"
+
+    if kind == "memory":
+        return MemoryReportSink()
+    if kind == "ndjson":
+        return NDJSONReportSink(Path(reports_dir) / f"reports_{run_id}.ndjson")
+    if kind == "parquet":
+        from src.storage.parquet_export import ParquetReportSink
+
+        return ParquetReportSink(
+            reports_dir,
+            run_id,
+            row_group_size=reports_cfg.get("parquet_row_group_size", 10_000),
+        )
+    if kind == "sqlite":
+        return SQLiteReportSink(
+            reports_cfg.get("db_path") or config["sqlite"]["db_path"],
+            run_id,
+            commit_every=reports_cfg.get("commit_every", 100),
+        )
+    raise ValueError(f"Unknown report sink: {kind}")
@@ -0,0 +1,242 @@
+import re
+from pathlib import Path
+
+
+# Column name -> type. Older databases only have the first three;
+# missing columns are added in place by ensure_schema().
+DECISION_COLUMNS = {
+    "invoice_id": "TEXT",
+    "decision": "TEXT",
+    "confidence": "REAL",
+    "decided_at": "TEXT",
+    "vendor": "TEXT",
+    "fy": "TEXT",
+    "run_id": "TEXT",
+}
+
+# Marker rows written by InvoiceStore; not decisions, so not rolled up
+SEEN = "SEEN"
+
+FY_RE = re.compile(r"^\d{4}-\d{2}$")
+ARCHIVE_PREFIX = "decisions_fy"
+
+
+def _create_decisions(conn, table="decisions"):
+    columns = ", ".join(f"{name} {kind}" for name, kind in DECISION_COLUMNS.items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+
+
+# Bumped whenever ensure_schema() gains a migration step
+SCHEMA_VERSION = 2
+
+
+def ensure_schema(conn):
+    """
+    Creates (or migrates) the decision log and its rollup tables.
+
+    - decisions: hot table, current and not-yet-archived fiscal years
+    - decision_counts_daily: (day, decision) -> count
+    - decision_counts_vendor: (vendor, fy, decision) -> count
+
+    The rollups are kept current by an AFTER INSERT trigger, so dashboards
+    read a handful of rows instead of scanning the log. They are not
+    touched when rows are archived.
+
+    Runs once per database: PRAGMA user_version records the schema
+    version, so later connections only read it.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another connection may have migrated while this one waited
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            _migrate(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _migrate(conn):
+    _create_decisions(conn)
+
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(decisions)")}
+    for name, kind in DECISION_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE decisions ADD COLUMN {name} {kind}")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_decisions_invoice_id ON decisions (invoice_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_decisions_fy ON decisions (fy)"
+    )
+
+    tables = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+
+    if "decision_counts_daily" not in tables:
+        conn.execute(
+            """
+            CREATE TABLE decision_counts_daily (
+                day TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, decision)
+            ) WITHOUT ROWID
+            """
+        )
+        # Decisions logged before the rollup existed
+        conn.execute(
+            f"""
+            INSERT INTO decision_counts_daily (day, decision, count)
+            SELECT COALESCE(substr(decided_at, 1, 10), 'unknown'), decision, COUNT(*)
+            FROM decisions
+            WHERE decision IS NOT NULL AND decision != '{SEEN}'
+            GROUP BY 1, 2
+            """
+        )
+
+    if "decision_counts_vendor" not in tables:
+        conn.execute(
+            """
+            CREATE TABLE decision_counts_vendor (
+                vendor TEXT NOT NULL,
+                fy TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (vendor, fy, decision)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            f"""
+            INSERT INTO decision_counts_vendor (vendor, fy, decision, count)
+            SELECT COALESCE(vendor, 'unknown'), COALESCE(fy, 'unknown'), decision, COUNT(*)
+            FROM decisions
+            WHERE decision IS NOT NULL AND decision != '{SEEN}'
+            GROUP BY 1, 2, 3
+            """
+        )
+
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_decisions_rollup
+        AFTER INSERT ON decisions
+        WHEN NEW.decision IS NOT NULL AND NEW.decision != '{SEEN}'
+        BEGIN
+            INSERT INTO decision_counts_daily (day, decision, count)
+            VALUES (
+                COALESCE(substr(NEW.decided_at, 1, 10), 'unknown'),
+                NEW.decision,
+                1
+            )
+            ON CONFLICT (day, decision) DO UPDATE SET count = count + 1;
+
+            INSERT INTO decision_counts_vendor (vendor, fy, decision, count)
+            VALUES (
+                COALESCE(NEW.vendor, 'unknown'),
+                COALESCE(NEW.fy, 'unknown'),
+                NEW.decision,
+                1
+            )
+            ON CONFLICT (vendor, fy, decision) DO UPDATE SET count = count + 1;
+        END
+        """
+    )
+
+
+# ---------------------------------------------------------
+# Fiscal-year archive
+# ---------------------------------------------------------
+
+def archive_table_name(fy):
+    """'2023-24' -> 'decisions_fy2023_24'."""
+    if not FY_RE.match(str(fy)):
+        raise ValueError(f"Invalid fiscal year: {fy}")
+    return ARCHIVE_PREFIX + str(fy).replace("-", "_")
+
+
+def archive_fiscal_year(conn, fy, archive_dir=None):
+    """
+    Moves one fiscal year out of the hot decisions table.
+
+    Rows go to a decisions_fyYYYY_YY table in the same database, or, when
+    archive_dir is given, to the decisions table of an attached per-year file
+    (archive_dir/decisions_fyYYYY_YY.db). Returns the number of rows moved.
+    """
+    table = archive_table_name(fy)
+    columns = ", ".join(DECISION_COLUMNS)
+
+    attached = archive_dir is not None
+    if attached:
+        path = Path(archive_dir) / f"{table}.db"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS archive", (str(path),))
+        target = "archive.decisions"
+    else:
+        target = table
+
+    try:
+        _create_decisions(conn, target)
+        # Duplicate lookups (InvoiceStore) probe archives by invoice_id
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {'archive.' if attached else ''}"
+            f"idx_{table}_invoice_id ON {'decisions' if attached else table} (invoice_id)"
+        )
+        conn.execute(
+            f"INSERT INTO {target} ({columns}) "
+            f"SELECT {columns} FROM decisions WHERE fy = ?",
+            (fy,),
+        )
+        moved = conn.execute("DELETE FROM decisions WHERE fy = ?", (fy,)).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if attached:
+            conn.execute("DETACH DATABASE archive")
+
+    return moved
+
+
+def archive_closed_years(conn, current_fy, archive_dir=None):
+    """Archives every fiscal year before current_fy. Returns {fy: rows}."""
+    years = [
+        row[0]
+        for row in conn.execute(
+            "SELECT DISTINCT fy FROM decisions WHERE fy IS NOT NULL AND fy < ?",
+            (current_fy,),
+        )
+        if FY_RE.match(str(row[0]))
+    ]
+    return {fy: archive_fiscal_year(conn, fy, archive_dir) for fy in years}
+
+
+def archive_sources(conn, archive_dir=None):
+    """
+    Archived decision tables readable through conn: decisions_fy* tables
+    in the same database, plus per-year files under archive_dir.
+    Returns [(table, path or None)].
+    """
+    sources = [
+        (row[0], None)
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+            (ARCHIVE_PREFIX + "%",),
+        )
+    ]
+    if archive_dir is not None and Path(archive_dir).is_dir():
+        sources.extend(
+            ("decisions", path)
+            for path in sorted(Path(archive_dir).glob(f"{ARCHIVE_PREFIX}*.db"))
+        )
+    return sources
@@ -1,6 +1,8 @@
 # src/tools/gst_portal_client.py
 import time
 import requests
+from src.tools.portal_transport import HTTPTransport
+from utils.tracing import tracer
 <<<<<<< HEAD
 from utils.simple_cache import SimpleTTLCache
 =======
@@ -15,19 +17,25 @@ class GSTPortalClient:
     and SAFE caching (no behavior change).
     """
 
-    def __init__(self, base_url, api_key, max_retries=3, cache_ttl=3600):
+    def __init__(
+        self, base_url, api_key, max_retries=3, cache_ttl=3600, transport=None
+    ):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.max_retries = max_retries
         self.cache = SimpleTTLCache(ttl_seconds=cache_ttl)
+        # HTTP by default; see src/tools/portal_transport.py
+        self.transport = transport or HTTPTransport()
 =======
     Handles retries, rate limiting, and error normalization.
     """
 
-    def __init__(self, base_url, api_key, max_retries=3):
+    def __init__(self, base_url, api_key, max_retries=3, transport=None):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.max_retries = max_retries
+        # HTTP by default; see src/tools/portal_transport.py
+        self.transport = transport or HTTPTransport()
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 
     def _headers(self):
@@ -44,17 +52,20 @@ class GSTPortalClient:
     def _post(self, endpoint, payload, cache_key=None):
         if cache_key:
             cached = self.cache.get(cache_key)
+            tracer.hit("gst_portal", cached is not None)
             if cached is not None:
                 return cached
 
         url = f"{self.base_url}/{endpoint}"
 
         for _ in range(self.max_retries):
-            resp = requests.post(
-                url, json=payload, headers=self._headers(), timeout=5
-            )
+            with tracer.span(f"portal.{endpoint}"):
+                resp = self.transport.post(
+                    url, json=payload, headers=self._headers()
+                )
 
             if resp.status_code == 429:
+                tracer.count("portal.rate_limited")
                 time.sleep(int(resp.headers.get("Retry-After", 1)))
                 continue
 
@@ -70,17 +81,20 @@ class GSTPortalClient:
     def _get(self, endpoint, params, cache_key=None):
         if cache_key:
             cached = self.cache.get(cache_key)
+            tracer.hit("gst_portal", cached is not None)
             if cached is not None:
                 return cached
 
         url = f"{self.base_url}/{endpoint}"
 
         for _ in range(self.max_retries):
-            resp = requests.get(
-                url, params=params, headers=self._headers(), timeout=5
-            )
+            with tracer.span(f"portal.{endpoint}"):
+                resp = self.transport.get(
+                    url, params=params, headers=self._headers()
+                )
 
             if resp.status_code == 429:
+                tracer.count("portal.rate_limited")
                 time.sleep(int(resp.headers.get("Retry-After", 1)))
                 continue
 
@@ -146,11 +160,13 @@ class GSTPortalClient:
     def _post(self, endpoint, payload):
         url = f"{self.base_url}/{endpoint}"
         for attempt in range(self.max_retries):
-            response = requests.post(
-                url, json=payload, headers=self._headers(), timeout=5
-            )
+            with tracer.span(f"portal.{endpoint}"):
+                response = self.transport.post(
+                    url, json=payload, headers=self._headers()
+                )
 
             if response.status_code == 429:
+                tracer.count("portal.rate_limited")
                 retry_after = int(response.headers.get("Retry-After", 1))
                 time.sleep(retry_after)
                 continue
@@ -162,11 +178,13 @@ class GSTPortalClient:
     def _get(self, endpoint, params):
         url = f"{self.base_url}/{endpoint}"
         for attempt in range(self.max_retries):
-            response = requests.get(
-                url, params=params, headers=self._headers(), timeout=5
-            )
+            with tracer.span(f"portal.{endpoint}"):
+                response = self.transport.get(
+                    url, params=params, headers=self._headers()
+                )
 
             if response.status_code == 429:
+                tracer.count("portal.rate_limited")
                 retry_after = int(response.headers.get("Retry-After", 1))
                 time.sleep(retry_after)
                 continue
@@ -0,0 +1,133 @@
+import json
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class TransportResponse:
+    """
+    The part of requests.Response that GSTPortalClient reads:
+    status_code, headers.get() and json().
+    """
+
+    def __init__(self, status_code, body=None, headers=None, content=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self._body = body
+        self._content = content
+
+    def json(self):
+        if self._content is not None:
+            # Same failure mode as requests: ValueError on a non-JSON body
+            return json.loads(self._content)
+        if self._body is None:
+            raise ValueError("Empty response body")
+        return self._body
+
+
+# ---------------------------------------------------------
+# HTTP (default)
+# ---------------------------------------------------------
+
+class HTTPTransport:
+    name = "http"
+
+    def __init__(self, timeout=5):
+        self.timeout = timeout
+
+    def post(self, url, json=None, headers=None):
+        return requests.post(url, json=json, headers=headers, timeout=self.timeout)
+
+    def get(self, url, params=None, headers=None):
+        return requests.get(url, params=params, headers=headers, timeout=self.timeout)
+
+
+# ---------------------------------------------------------
+# In-process
+# ---------------------------------------------------------
+
+class WSGITransport:
+    """
+    Dispatches straight into a WSGI app (e.g. mock_gst_server.app)
+    through werkzeug's test client: no sockets, same status codes,
+    headers (Retry-After) and JSON bodies as over HTTP.
+    """
+
+    name = "wsgi"
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            from werkzeug.test import Client
+
+            client = self._local.client = Client(self.app)
+        return client
+
+    def _dispatch(self, method, url, **kwargs):
+        response = self._client().open(urlsplit(url).path, method=method, **kwargs)
+        return TransportResponse(
+            response.status_code,
+            headers=dict(response.headers),
+            content=response.get_data(),
+        )
+
+    def post(self, url, json=None, headers=None):
+        return self._dispatch("POST", url, json=json, headers=headers)
+
+    def get(self, url, params=None, headers=None):
+        return self._dispatch("GET", url, query_string=params, headers=headers)
+
+
+class CallableTransport:
+    """
+    Dispatches to handler(method, path, payload, headers), which returns
+    (status, body) or (status, body, headers). The body is handed to the
+    client as-is (no JSON round trip).
+    """
+
+    name = "callable"
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def _dispatch(self, method, url, payload, headers):
+        result = self.handler(method, urlsplit(url).path, payload, headers or {})
+        status, body = result[0], result[1]
+        response_headers = result[2] if len(result) > 2 else None
+        return TransportResponse(status, body=body, headers=response_headers)
+
+    def post(self, url, json=None, headers=None):
+        return self._dispatch("POST", url, json, headers)
+
+    def get(self, url, params=None, headers=None):
+        return self._dispatch("GET", url, params, headers)
+
+
+def in_process_transport(target=None):
+    """
+    Flask app -> WSGITransport, any other callable -> CallableTransport
+    (wrap a bare WSGI callable in WSGITransport yourself).
+    Without a target, the mock_gst_server Flask app is used.
+    """
+    if target is None:
+        from mock_gst_server import app as target
+
+    if hasattr(target, "wsgi_app"):
+        return WSGITransport(target)
+    return CallableTransport(target)
+
+
+def transport_from_config(config):
+    """gst_api_transport: "http" (default) or "inprocess" (mock_gst_server)."""
+    kind = config.get("gst_api_transport", "http")
+    if kind == "http":
+        return HTTPTransport(timeout=config.get("gst_api_timeout", 5))
+    if kind == "inprocess":
+        return in_process_transport()
+    raise ValueError(f"Unknown gst_api_transport: {kind}")
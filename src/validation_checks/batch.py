@@ -0,0 +1,305 @@
+import pandas as pd
+
+from src.models.validation_result import ValidationResult
+from src.validation_checks.category_b import GSTIN_REGEX, CATEGORY_B_CHECKS
+from src.validation_checks.category_d import CATEGORY_D_CHECKS
+from utils.tracing import tracer
+
+
+# Every kernel maps a row to an index into its OUTCOMES tuple.
+# Index -1 means "not vectorizable for this row" -> run the scalar check.
+SCALAR = -1
+
+OUTCOMES = {
+    "B1": (
+        ("PASS", None, 0.0),
+        ("FAIL", "Invalid GSTIN format", 0.10),
+    ),
+    "B3": (
+        ("PASS", None, 0.0),
+        ("REVIEW", "Missing seller state data", 0.05),
+        ("FAIL", "GSTIN state code mismatch with address", 0.15),
+    ),
+    "B8": (
+        ("PASS", None, 0.0),
+        ("REVIEW", "Insufficient data", 0.05),
+        ("FAIL", "Inter-state supply without IGST", 0.10),
+        ("FAIL", "Intra-state supply with IGST", 0.10),
+    ),
+    "B15": (
+        ("PASS", None, 0.0),
+        ("REVIEW", "Invoice value above threshold but IRN missing", 0.10),
+    ),
+    "D1": (
+        ("PASS", None, 0.0),
+        ("REVIEW", "TDS applicability needs confirmation", 0.05),
+    ),
+    "D3": (
+        ("PASS", None, 0.0),
+        ("FAIL", "PAN not available – higher TDS applicable", 0.15),
+    ),
+    "D5": (
+        ("PASS", None, 0.0),
+        ("SKIP", None, 0.0),
+    ),
+    "D7": (
+        ("PASS", None, 0.0),
+        ("FAIL", "TDS deducted on GST component", 0.10),
+    ),
+    "D9": (
+        ("PASS", None, 0.0),
+        ("REVIEW", "TAN not configured", 0.05),
+    ),
+}
+
+
+# ---------------------------------------------------------
+# Column gathering
+# ---------------------------------------------------------
+
+def _vendor_pan(ctx):
+    pan = ctx.get("vendor_pan")
+    if not pan:
+        fields = ctx.get("fields", {})
+        if isinstance(fields, dict):
+            pan = fields.get("vendor_pan")
+    return pan
+
+
+# column name -> getter, using the same defaults as the scalar checks
+COLUMN_GETTERS = {
+    "seller_gstin": lambda ctx: ctx.get("seller_gstin"),
+    "seller_state_code": lambda ctx: ctx.get("seller_state_code"),
+    "buyer_state_code": lambda ctx: ctx.get("buyer_state_code"),
+    "tax_type": lambda ctx: ctx.get("tax_type"),
+    "invoice_value": lambda ctx: ctx.get("invoice_value", 0),
+    "irn": lambda ctx: ctx.get("irn"),
+    "vendor_type": lambda ctx: ctx.get("vendor_type"),
+    "vendor_pan": _vendor_pan,
+    "tds_threshold": lambda ctx: ctx.get("tds_threshold", 30000),
+    "tds_on_gst_component": lambda ctx: ctx.get("tds_on_gst_component", False),
+    "company_tan": lambda ctx: ctx.get("company_tan"),
+}
+
+
+def invoices_to_frame(invoices, columns=None):
+    """
+    Builds a columnar chunk (one object column per field) from
+    invoice contexts. Column values keep their original Python types.
+    """
+    columns = columns or list(COLUMN_GETTERS)
+    return pd.DataFrame(
+        {
+            col: [COLUMN_GETTERS[col](ctx) for ctx in invoices]
+            for col in columns
+        },
+        dtype=object,
+    )
+
+
+# ---------------------------------------------------------
+# Vectorized helpers
+# ---------------------------------------------------------
+
+def _truthy(s):
+    return s.map(bool).astype(bool)
+
+
+def _str_or_falsy(s):
+    # Strings and falsy values are safe; anything else goes scalar
+    return s.map(lambda v: isinstance(v, str) or not v).astype(bool)
+
+
+def _clean_str(s, keep):
+    return s.where(keep, "").astype(str)
+
+
+def _numbers(s):
+    is_number = s.map(
+        lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    ).astype(bool)
+    return pd.to_numeric(s.where(is_number), errors="coerce"), is_number
+
+
+def _always(df):
+    return pd.Series(True, index=df.index)
+
+
+def _codes(index, default, choices, scalar_mask):
+    codes = pd.Series(default, index=index, dtype="int8")
+    # Later choices never override earlier ones (mirrors if/elif order)
+    for mask, code in reversed(choices):
+        codes = codes.mask(mask, code)
+    return codes.mask(~scalar_mask, SCALAR)
+
+
+# ---------------------------------------------------------
+# Kernels (one per check, same branch order as the scalar check)
+# ---------------------------------------------------------
+
+def _b1(df):
+    gstin = df["seller_gstin"]
+    ok = _str_or_falsy(gstin)
+    present = _truthy(gstin)
+    match = _clean_str(gstin, ok & present).str.match(GSTIN_REGEX.pattern)
+    return _codes(df.index, 0, [(~present | ~match.astype(bool), 1)], ok)
+
+
+def _b3(df):
+    gstin, state = df["seller_gstin"], df["seller_state_code"]
+    ok = _str_or_falsy(gstin) & _str_or_falsy(state)
+    missing = ~_truthy(gstin) | ~_truthy(state)
+    prefix = _clean_str(gstin, ok & ~missing).str[:2]
+    mismatch = prefix != _clean_str(state, ok & ~missing)
+    return _codes(df.index, 0, [(missing, 1), (mismatch, 2)], ok)
+
+
+def _b8(df):
+    seller, buyer, tax = df["seller_state_code"], df["buyer_state_code"], df["tax_type"]
+    ok = _str_or_falsy(seller) & _str_or_falsy(buyer) & _str_or_falsy(tax)
+    missing = ~_truthy(seller) | ~_truthy(buyer) | ~_truthy(tax)
+    same_state = seller == buyer
+    igst = tax == "IGST"
+    return _codes(
+        df.index,
+        0,
+        [(missing, 1), (~same_state & ~igst, 2), (same_state & igst, 3)],
+        ok,
+    )
+
+
+def _b15(df):
+    value, ok = _numbers(df["invoice_value"])
+    return _codes(
+        df.index, 0, [((value >= 500000) & ~_truthy(df["irn"]), 1)], ok
+    )
+
+
+def _d1(df):
+    vendor_type = df["vendor_type"]
+    ok = _str_or_falsy(vendor_type)
+    eligible = vendor_type.where(ok, None).isin(["Individual", "Proprietor"])
+    return _codes(df.index, 0, [(~eligible, 1)], ok)
+
+
+def _d3(df):
+    return _codes(df.index, 0, [(~_truthy(df["vendor_pan"]), 1)], _always(df))
+
+
+def _d5(df):
+    amount, ok_amount = _numbers(df["invoice_value"])
+    threshold, ok_threshold = _numbers(df["tds_threshold"])
+    return _codes(
+        df.index, 0, [(~(amount > threshold), 1)], ok_amount & ok_threshold
+    )
+
+
+def _d7(df):
+    return _codes(df.index, 0, [(_truthy(df["tds_on_gst_component"]), 1)], _always(df))
+
+
+def _d9(df):
+    return _codes(df.index, 0, [(~_truthy(df["company_tan"]), 1)], _always(df))
+
+
+KERNELS = {
+    "B1": _b1,
+    "B3": _b3,
+    "B8": _b8,
+    "B15": _b15,
+    "D1": _d1,
+    "D3": _d3,
+    "D5": _d5,
+    "D7": _d7,
+    "D9": _d9,
+}
+
+
+def run_check(check, ctx):
+    """
+    Scalar execution of a single rule check, with the same error
+    handling the validator agents apply.
+    """
+    try:
+        with tracer.span(f"check.{check.check_id}"):
+            return check.validate(ctx)
+    except Exception as e:
+        return ValidationResult(
+            check_id=check.check_id,
+            category=check.category,
+            status="REVIEW",
+            reason=f"Rule execution error: {str(e)}",
+            confidence_impact=0.10,
+        )
+
+
+class BatchLocalEvaluator:
+    """
+    Batch Local Evaluator
+    ---------------------
+    Runs local (portal-free) rule checks over a columnar chunk of
+    invoices at once instead of once per invoice per check.
+
+    - Checks with a vectorized kernel are evaluated column-wise
+    - Rows with unexpected value types, and checks without a kernel,
+      fall back to the scalar check so outcomes stay identical
+    """
+
+    def __init__(self, checks=None, chunk_size=10_000):
+        self.checks = list(checks or CATEGORY_B_CHECKS + CATEGORY_D_CHECKS)
+        self.chunk_size = chunk_size
+
+    def evaluate_frame(self, df):
+        """
+        Compact form: DataFrame of int8 outcome codes, one column per
+        vectorized check id (see OUTCOMES, SCALAR = needs scalar run).
+        """
+        columns = {}
+        for check in self.checks:
+            if check.check_id in KERNELS:
+                # One sample per chunk, not per invoice
+                with tracer.span(f"check_batch.{check.check_id}"):
+                    columns[check.check_id] = KERNELS[check.check_id](df)
+
+        return pd.DataFrame(columns, index=df.index)
+
+    def evaluate(self, invoices):
+        """
+        Returns one list of ValidationResult per invoice, in input order
+        and in the same check order as the scalar rule loop.
+        """
+        invoices = list(invoices)
+        results = []
+
+        for start in range(0, len(invoices), self.chunk_size):
+            chunk = invoices[start:start + self.chunk_size]
+            codes = self.evaluate_frame(invoices_to_frame(chunk))
+            columns = {
+                check_id: codes[check_id].tolist() for check_id in codes.columns
+            }
+
+            for row, ctx in enumerate(chunk):
+                results.append(self._materialize(ctx, row, columns))
+
+        return results
+
+    def _materialize(self, ctx, row, columns):
+        invoice_results = []
+
+        for check in self.checks:
+            code = columns[check.check_id][row] if check.check_id in columns else SCALAR
+
+            if code == SCALAR:
+                result = run_check(check, ctx)
+                if isinstance(result, ValidationResult):
+                    invoice_results.append(result)
+                continue
+
+            status, reason, impact = OUTCOMES[check.check_id][code]
+            invoice_results.append(
+                ValidationResult(
+                    check.check_id, check.category, status, reason, impact
+                )
+            )
+
+        return invoice_results
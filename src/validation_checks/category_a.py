@@ -2,6 +2,8 @@
 import re
 from src.models.validation_result import ValidationResult
 from src.models.base_validation import BaseValidationCheck
+from src.storage.duplicate_index import DuplicateIndex
+from src.storage.near_duplicate_index import NearDuplicateIndex
 
 class A1_InvoiceNumberFormat(BaseValidationCheck):
     check_id="A1"; category="Document"
@@ -13,14 +15,29 @@ class A1_InvoiceNumberFormat(BaseValidationCheck):
 
 class A2_DuplicateInvoice(BaseValidationCheck):
     check_id="A2"; category="Document"
-    def __init__(self):
-        self.seen = set()
+    def __init__(self, index):
+        # DuplicateIndex; see duplicate_checks(config)
+        self.index = index
     
     def validate(self, ctx):
-        key=(ctx["fields"].get("vendor_gstin"),ctx["fields"].get("invoice_number"))
-        if key in self.seen:
+        duplicate=self.index.check_and_add(ctx)
+        if duplicate is None:
+            return ValidationResult(self.check_id,self.category,"REVIEW","Duplicate check skipped: a duplicate key field is missing",0.05)
+        if duplicate:
             return ValidationResult(self.check_id,self.category,"FAIL","Duplicate invoice detected",0.3)
-        self.seen.add(key)
+        return ValidationResult(self.check_id,self.category,"PASS")
+
+class A2N_NearDuplicateInvoice(BaseValidationCheck):
+    check_id="A2N"; category="Document"
+    def __init__(self, index):
+        # NearDuplicateIndex; see duplicate_checks(config)
+        self.index = index
+
+    def validate(self, ctx):
+        matches=self.index.check_and_add(ctx)
+        if matches:
+            match_id,similarity=matches[0]
+            return ValidationResult(self.check_id,self.category,"REVIEW",f"Near-duplicate of {match_id} ({similarity:.0%} similar)",0.2,evidence={"matches":matches})
         return ValidationResult(self.check_id,self.category,"PASS")
 
 class A3_SequentialInvoice(BaseValidationCheck):
@@ -44,4 +61,15 @@ class A5_DateVsMetadata(BaseValidationCheck):
             return ValidationResult(self.check_id,self.category,"FAIL","Invoice date later than file creation",0.1)
         return ValidationResult(self.check_id,self.category,"PASS")
 
-CATEGORY_A_CHECKS=[A1_InvoiceNumberFormat(),A2_DuplicateInvoice(),A3_SequentialInvoice(),A5_DateVsMetadata()]
+# Duplicate checks own persistent indexes; build them with duplicate_checks()
+CATEGORY_A_CHECKS=[A1_InvoiceNumberFormat(),A3_SequentialInvoice(),A5_DateVsMetadata()]
+
+def duplicate_checks(config):
+    """A2 (+ A2N) backed by the state DB (persists across runs); [] when disabled."""
+    settings = config.get("duplicate_detection", {})
+    if not settings.get("enabled", True):
+        return []
+    checks = [A2_DuplicateInvoice(DuplicateIndex.from_config(config))]
+    if settings.get("near_duplicates", True):
+        checks.append(A2N_NearDuplicateInvoice(NearDuplicateIndex.from_config(config)))
+    return checks
@@ -1,31 +1,54 @@
-
-from decimal import Decimal
 from src.models.validation_result import ValidationResult
 from src.models.base_validation import BaseValidationCheck
+from utils.line_item_utils import (
+    get_line_item_arrays, decimal_math_mismatch, to_decimal, to_paise,
+    InexactValue, BASIS_POINTS, PAISE_PER_RUPEE
+)
+
+# Rates in basis points
+GST_RATE_BP = 18 * BASIS_POINTS
+FULL_RATE_BP = 100 * BASIS_POINTS
 
 class C1_LineItemMath(BaseValidationCheck):
     check_id="C1"; category="Arithmetic"
     def validate(self, ctx):
-        for item in ctx["fields"].get("line_items",[]):
-            if Decimal(item["qty"])*Decimal(item["rate"])!=Decimal(item["amount"]):
-                return ValidationResult(self.check_id,self.category,"FAIL","Line item math mismatch",0.1)
+        try:
+            mismatch=get_line_item_arrays(ctx).first_math_mismatch()
+        except InexactValue:
+            mismatch=decimal_math_mismatch(ctx["fields"].get("line_items",[]))
+        if mismatch is not None:
+            return ValidationResult(self.check_id,self.category,"FAIL","Line item math mismatch",0.1)
         return ValidationResult(self.check_id,self.category,"PASS")
 
 class C2_Subtotal(BaseValidationCheck):
     check_id="C2"; category="Arithmetic"
     def validate(self, ctx):
-        items=ctx["fields"].get("line_items",[])
-        subtotal=sum(Decimal(i["amount"]) for i in items)
-        if subtotal!=Decimal(ctx["fields"].get("subtotal",subtotal)):
+        fields=ctx["fields"]
+        try:
+            subtotal=get_line_item_arrays(ctx).total_amount()
+            declared=to_paise(fields["subtotal"],exact=True) if "subtotal" in fields else subtotal
+        except InexactValue:
+            subtotal=sum(to_decimal(i["amount"]) for i in fields.get("line_items",[]))
+            declared=to_decimal(fields["subtotal"]) if "subtotal" in fields else subtotal
+        if subtotal!=declared:
             return ValidationResult(self.check_id,self.category,"FAIL","Subtotal mismatch",0.1)
         return ValidationResult(self.check_id,self.category,"PASS")
 
 class C3_TaxAccuracy(BaseValidationCheck):
     check_id="C3"; category="Arithmetic"
     def validate(self, ctx):
-        expected=Decimal(ctx["fields"].get("taxable_amount","0"))*Decimal("0.18")
-        actual=Decimal(ctx["fields"].get("tax_amount","0"))
-        if abs(expected-actual)>1:
+        taxable=ctx["fields"].get("taxable_amount","0")
+        tax=ctx["fields"].get("tax_amount","0")
+        try:
+            # Integer paise scaled by FULL_RATE_BP; tolerance is ₹1
+            expected=to_paise(taxable,exact=True)*GST_RATE_BP
+            actual=to_paise(tax,exact=True)*FULL_RATE_BP
+            tolerance=PAISE_PER_RUPEE*FULL_RATE_BP
+        except InexactValue:
+            expected=to_decimal(taxable)*to_decimal("0.18")
+            actual=to_decimal(tax)
+            tolerance=1
+        if abs(expected-actual)>tolerance:
             return ValidationResult(self.check_id,self.category,"FAIL","Tax calculation error",0.15)
         return ValidationResult(self.check_id,self.category,"PASS")
 
@@ -1,4 +1,5 @@
 from src.models.validation_result import ValidationResult
+from src.storage.aggregate_store import VendorAggregateStore
 
 
 class D1_TDSApplicability:
@@ -55,6 +56,55 @@ class D5_TDSThreshold:
         return ValidationResult(self.check_id, self.category, "SKIP")
 
 
+class D6_AggregateThreshold:
+    check_id = "D6"
+    category = "TDS"
+    description = "FY aggregate thresholds (per section and per vendor PAN)"
+    complexity = "High"
+
+    def __init__(self, store):
+        # VendorAggregateStore; see aggregate_checks(config)
+        self.store = store
+
+    def validate(self, ctx):
+        # Adds this invoice and reads the running totals in one step
+        if self.store.reserve(ctx) is None:
+            return ValidationResult(self.check_id, self.category, "SKIP")
+
+        section_total = ctx["fy_aggregate_amount"]
+
+        section_threshold = ctx.get("fy_aggregate_threshold")
+        vendor_total = ctx.get("fy_vendor_total") or 0
+        vendor_threshold = ctx.get("fy_vendor_threshold")
+        single_threshold = ctx.get("tds_threshold", 30000)
+
+        if vendor_threshold and vendor_total > vendor_threshold:
+            return ValidationResult(
+                self.check_id,
+                self.category,
+                "REVIEW",
+                "Cumulative FY payments to vendor exceed policy threshold",
+                0.05,
+                evidence={"fy_vendor_total": vendor_total, "threshold": vendor_threshold},
+            )
+
+        if (
+            section_threshold
+            and section_total > section_threshold
+            and ctx.get("invoice_value", 0) <= single_threshold
+        ):
+            return ValidationResult(
+                self.check_id,
+                self.category,
+                "REVIEW",
+                "FY aggregate exceeds TDS threshold – TDS applicable",
+                0.05,
+                evidence={"fy_aggregate_amount": section_total, "threshold": section_threshold},
+            )
+
+        return ValidationResult(self.check_id, self.category, "PASS")
+
+
 class D7_TDSOnGST:
     check_id = "D7"
     category = "TDS"
@@ -85,6 +135,7 @@ class D9_TANFormat:
         return ValidationResult(self.check_id, self.category, "PASS")
 
 
+# D6 owns the persistent FY totals; build it with aggregate_checks()
 CATEGORY_D_CHECKS = [
     D1_TDSApplicability(),
     D3_PANAvailability(),
@@ -92,3 +143,10 @@ CATEGORY_D_CHECKS = [
     D7_TDSOnGST(),
     D9_TANFormat(),
 ]
+
+
+def aggregate_checks(config):
+    """D6 backed by the FY running totals in the state DB; [] without SQLite state."""
+    if not config.get("agentic", {}).get("use_sqlite_state"):
+        return []
+    return [D6_AggregateThreshold(VendorAggregateStore.from_config(config))]
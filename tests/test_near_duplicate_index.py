@@ -0,0 +1,133 @@
+import copy
+import json
+import random
+import re
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.storage.near_duplicate_index import (
+    NearDuplicateIndex, invoice_features, weighted_jaccard
+)
+from utils.normalization_utils import normalize_invoice
+
+CORPUS = Path(__file__).resolve().parent.parent / "data" / "invoices" / "test_invoices.json"
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return {raw["invoice_id"]: normalize_invoice(raw) for raw in json.load(f)}
+
+
+def next_number(invoice_number):
+    match = re.match(r"^(.*?)(\d+)$", invoice_number)
+    return f"{match.group(1)}{int(match.group(2)) + 1:0{len(match.group(2))}d}"
+
+
+def variant(ctx, invoice_id, **changes):
+    other = copy.deepcopy(ctx)
+    other.update(invoice_id=invoice_id, **changes)
+    return other
+
+
+def test_detects_resubmitted_corpus_invoice(corpus):
+    index = NearDuplicateIndex()
+    assert index.check_and_add(corpus["INV-2024-0001"]) == []
+
+    matches = index.check_and_add(corpus["INV-2024-0010"])
+    assert [match_id for match_id, _ in matches] == ["INV-2024-0001"]
+
+
+def test_detects_small_amount_change(corpus):
+    original = corpus["INV-2024-0001"]
+    index = NearDuplicateIndex()
+    index.check_and_add(original)
+
+    tweaked = variant(original, "X-1", invoice_value=original["invoice_value"] + 500)
+    assert index.query(tweaked)
+
+
+def test_every_resubmission_above_threshold_is_a_candidate(corpus):
+    rng = random.Random(7)
+    originals = [ctx for ctx in corpus.values() if ctx.get("line_items")]
+    checked = 0
+
+    for n in range(300):
+        original = rng.choice(originals)
+        resubmitted = variant(
+            original,
+            f"R-{n}",
+            invoice_number=next_number(original["invoice_number"]),
+            invoice_value=original["invoice_value"] + rng.randint(1, 400),
+        )
+        if weighted_jaccard(
+            invoice_features(original), invoice_features(resubmitted)
+        ) < 0.95:
+            continue
+
+        index = NearDuplicateIndex()
+        index.check_and_add(original)
+        assert index.query(resubmitted), resubmitted["invoice_id"]
+        checked += 1
+
+    assert checked > 200
+
+
+@pytest.mark.parametrize("invoice_date", ["2024-09-16", "2024-10-15"])
+def test_recurring_invoice_on_another_date_is_not_flagged(corpus, invoice_date):
+    original = corpus["INV-2024-0001"]
+    index = NearDuplicateIndex()
+    index.check_and_add(original)
+
+    assert index.query(variant(original, "X-2", invoice_date=invoice_date)) == []
+
+
+def test_only_the_known_pair_is_flagged_in_corpus(corpus):
+    index = NearDuplicateIndex()
+    flagged = {
+        (invoice_id, match_id)
+        for invoice_id, ctx in corpus.items()
+        for match_id, _ in index.check_and_add(ctx)
+    }
+    assert flagged == {("INV-2024-0010", "INV-2024-0001")}
+
+    # Re-running the batch flags the resubmission again, not the original
+    rerun = {
+        (invoice_id, match_id)
+        for invoice_id, ctx in corpus.items()
+        for match_id, _ in index.check_and_add(ctx)
+    }
+    assert rerun == flagged
+
+
+def test_persists_across_instances(corpus, tmp_path):
+    db_path = tmp_path / "state.db"
+    index = NearDuplicateIndex(db_path=db_path)
+    index.check_and_add(corpus["INV-2024-0001"])
+    index.close()
+
+    reopened = NearDuplicateIndex(db_path=db_path)
+    assert len(reopened) == 1
+    assert reopened.check_and_add(corpus["INV-2024-0010"])
+    reopened.close()
+
+
+def test_reweights_stored_rows_when_weights_change(corpus, tmp_path):
+    db_path = tmp_path / "state.db"
+    index = NearDuplicateIndex(db_path=db_path)
+    index.check_and_add(corpus["INV-2024-0001"])
+    index.close()
+
+    # Item words no longer count: the stored row is re-signed on load
+    reopened = NearDuplicateIndex(db_path=db_path, weights={"item_word": 0})
+    assert not any(t.startswith("li:") for t in reopened._features["INV-2024-0001"])
+    assert reopened.check_and_add(corpus["INV-2024-0010"])
+    reopened.close()
+
+    with sqlite3.connect(db_path) as conn:
+        schemes = {row[0] for row in conn.execute(
+            f"SELECT scheme FROM {NearDuplicateIndex.TABLE}"
+        )}
+    assert schemes == {reopened.scheme}
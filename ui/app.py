@@ -6,6 +6,7 @@ from src.config import load_config
 
 from utils.download_csv import generate_csv
 from utils.download_pdf import generate_pdf
+from ui.result_cache import RunResultCache
 
 
 # =========================================================
@@ -25,6 +26,26 @@ TABLE_COLUMN_LABELS = [
 ]
 
 
+# Sort choices: label -> (table column, sort key)
+SORT_OPTIONS = {
+    "Invoice ID": ("Invoice ID", None),
+    "Decision": ("Compliance\nDecision", None),
+    "Confidence": (
+        "Confidence\nScore",
+        lambda s: pd.to_numeric(s.str.rstrip("%"), errors="coerce"),
+    ),
+}
+
+# Latest runs per server; filters / sorting / exports read from here
+RESULT_CACHE = RunResultCache(max_runs=4)
+
+# Shown when filtering / sorting a run that is no longer cached
+RUN_EVICTED_MSG = (
+    "⚠️ The results of this run are no longer available. "
+    "Re-run needed: click **Run Compliance Validation**."
+)
+
+
 TABLE_COLUMNS = [
     "invoice_id",
     "decision",
@@ -115,10 +136,10 @@ def aggregate_ai_summary(llm_reasoning_list):
 # =========================================================
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 
-def run_pipeline(show_only_escalated: bool):
+def execute_run():
     """
-    Executes the compliance pipeline and prepares
-    data for UI consumption.
+    Executes the compliance pipeline (explicit runs only) and caches
+    the result under its run id.
     """
 
     # -----------------------------------------------------
@@ -137,6 +158,15 @@ def run_pipeline(show_only_escalated: bool):
         config,
         force_run=True
     )
+    RESULT_CACHE.put(summary["run_id"], summary, reports)
+    return summary["run_id"]
+
+
+def build_view(summary, reports):
+    """
+    Prepares one run's data for UI consumption (unfiltered table).
+    Built once per run; see present_run.
+    """
 
     # -----------------------------------------------------
     # Initialize aggregation
@@ -269,12 +299,6 @@ def run_pipeline(show_only_escalated: bool):
     df = pd.DataFrame(rows, columns=TABLE_COLUMNS)
     df.columns = TABLE_COLUMN_LABELS
 
-    # -----------------------------------------------------
-    # Filtering
-    # -----------------------------------------------------
-    if show_only_escalated:
-        df = df[df["Escalation\nRequired"] == "Yes"]
-
     # -----------------------------------------------------
 <<<<<<< HEAD
     # Summary text
@@ -347,6 +371,58 @@ def run_pipeline(show_only_escalated: bool):
     )
 
 
+def present_run(run_id, show_only_escalated: bool, sort_by=None):
+    """
+    Cached run -> UI data, filtered and sorted. Never runs the
+    pipeline; returns None when the run is not cached.
+    """
+    run = RESULT_CACHE.get(run_id)
+    if run is None:
+        return None
+
+    view = run.view(build_view)
+    df = view[1]
+
+    # -----------------------------------------------------
+    # Filtering / sorting
+    # -----------------------------------------------------
+    if show_only_escalated:
+        df = df[df["Escalation\nRequired"] == "Yes"]
+
+    if sort_by in SORT_OPTIONS:
+        column, key = SORT_OPTIONS[sort_by]
+        df = df.sort_values(column, key=key, kind="stable")
+
+    return (view[0], df) + tuple(view[2:])
+
+
+def run_pipeline(show_only_escalated: bool):
+    """
+    Executes the compliance pipeline and prepares
+    data for UI consumption.
+    """
+    return present_run(execute_run(), show_only_escalated)
+
+
+# =========================================================
+# EXPORTS
+# =========================================================
+
+def _pdf_progress(progress):
+    return lambda done, total: progress(
+        done / total if total else 1.0, desc="Rendering PDF"
+    )
+
+
+def export_pdf(df, progress=gr.Progress()):
+    return generate_pdf(df, progress=_pdf_progress(progress))
+
+
+def export_pdf_summary(df, progress=gr.Progress()):
+    """Decision counts and escalated invoices only."""
+    return generate_pdf(df, summary_only=True, progress=_pdf_progress(progress))
+
+
 # =========================================================
 # UI DEFINITION
 # =========================================================
@@ -462,6 +538,14 @@ def launch_ui():
                 label="Show only escalated invoices",
                 value=False
             )
+            sort_by = gr.Dropdown(
+                choices=list(SORT_OPTIONS),
+                value=None,
+                label="Sort by"
+            )
+
+        # Run id of this session's latest run (results live in RESULT_CACHE)
+        run_state = gr.State(None)
 
         # -------------------------------------------------
         # OUTPUTS
@@ -494,25 +578,17 @@ def launch_ui():
         with gr.Row(visible=False) as export_row:
             csv_btn = gr.Button("Download CSV")
             pdf_btn = gr.Button("Download PDF")
+            pdf_summary_btn = gr.Button("Download PDF (summary)")
             file_out = gr.File()
 
         # -------------------------------------------------
         # BUTTON HANDLER
         # -------------------------------------------------
-        def handle_run(show_only_escalated):
-
-            yield (
-                gr.update(value="⏳ Processing invoices...", visible=True),
-                gr.update(value="", visible=False),
-                gr.update(visible=False),
-                gr.update(visible=False),
-                gr.update(visible=False),
-                gr.update(visible=False),
-            )
-
+        def render(run_id, show_only_escalated, sort_by):
+            """Output updates for a cached run (no pipeline call)."""
 <<<<<<< HEAD
             summary_text, df, esc_count, esc_msg, conflicts, ai_compliance_summary = (
-                run_pipeline(show_only_escalated)
+                present_run(run_id, show_only_escalated, sort_by)
             )
 
             has_rows = len(df) > 0
@@ -521,7 +597,9 @@ def launch_ui():
             conflicts_md = (
                 "### Conflicts Identified\n\n"
 =======
-            summary_text, df, esc_count, esc_msg, conflicts = run_pipeline(show_only_escalated)
+            summary_text, df, esc_count, esc_msg, conflicts = present_run(
+                run_id, show_only_escalated, sort_by
+            )
 
             has_rows = len(df) > 0
 
@@ -543,7 +621,7 @@ def launch_ui():
 
 =======
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-            yield (
+            return (
                 gr.update(value=summary_text, visible=True),
                 gr.update(value=esc_msg, visible=esc_count == 0),
                 gr.update(value=df, visible=has_rows),
@@ -552,32 +630,79 @@ def launch_ui():
                 gr.update(value=ai_md, visible=bool(ai_md)),
                 gr.update(visible=has_rows),
             )
-
-
 =======
                 gr.update(visible=has_rows),
                 gr.update(visible=has_rows),
             )
-
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+
+        def handle_run(show_only_escalated, sort_by):
+            """Explicit (re-)run: the only path that runs the pipeline."""
+            yield (
+                gr.update(value="⏳ Processing invoices...", visible=True),
+                gr.update(value="", visible=False),
+                gr.update(visible=False),
+                gr.update(visible=False),
+                gr.update(visible=False),
+                gr.update(visible=False),
+                gr.update(),
+            )
+
+            run_id = execute_run()
+            yield render(run_id, show_only_escalated, sort_by) + (run_id,)
+
+        def handle_view(run_id, show_only_escalated, sort_by):
+            """Filter / sort changes: served from the cached run."""
+            if run_id is None:
+                # Nothing run yet; wait for an explicit run
+                return tuple(gr.update() for _ in range(6)) + (run_id,)
+            if RESULT_CACHE.get(run_id) is None:
+                # Evicted (newer runs) or server restarted
+                return (
+                    gr.update(value=RUN_EVICTED_MSG, visible=True),
+                    gr.update(value="", visible=False),
+                    gr.update(visible=False),
+                    gr.update(visible=False),
+                    gr.update(visible=False),
+                    gr.update(visible=False),
+                    run_id,
+                )
+            return render(run_id, show_only_escalated, sort_by) + (run_id,)
+
         # -------------------------------------------------
         # WIRING
         # -------------------------------------------------
+        view_outputs = [
+            summary_md,
+            escalation_note,
+            table_out,
+            llm_reasoning_out,
+            export_section,
+            export_row,
+            run_state,
+        ]
+
         run_btn.click(
             fn=handle_run,
-            inputs=[show_escalated],
-            outputs=[
-                summary_md,
-                escalation_note,
-                table_out,
-                llm_reasoning_out,
-                export_section,
-                export_row
-            ]
+            inputs=[show_escalated, sort_by],
+            outputs=view_outputs
+        )
+        show_escalated.change(
+            fn=handle_view,
+            inputs=[run_state, show_escalated, sort_by],
+            outputs=view_outputs
+        )
+        sort_by.change(
+            fn=handle_view,
+            inputs=[run_state, show_escalated, sort_by],
+            outputs=view_outputs
         )
 
         csv_btn.click(fn=generate_csv, inputs=table_out, outputs=file_out)
-        pdf_btn.click(fn=generate_pdf, inputs=table_out, outputs=file_out)
+        pdf_btn.click(fn=export_pdf, inputs=table_out, outputs=file_out)
+        pdf_summary_btn.click(
+            fn=export_pdf_summary, inputs=table_out, outputs=file_out
+        )
 
         # -------------------------------------------------
         # FOOTER
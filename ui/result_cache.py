@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CachedRun:
+    """One pipeline run: summary, report sink and the memoized table view."""
+
+    def __init__(self, run_id, summary, reports):
+        self.run_id = run_id
+        self.summary = summary
+        self.reports = reports
+        self.created_at = time.time()
+        self._view = None
+        self._lock = threading.Lock()
+
+    def explanations_pending(self):
+        """True while deferred LLM explanations may still land in reports."""
+        if not self.summary.get("llm_pending"):
+            return False
+        return not getattr(self.reports, "explanations_final", False)
+
+    def view(self, build):
+        """
+        build(summary, reports) runs once per run and later calls reuse
+        it; while explanations are pending it is rebuilt on every call,
+        so arriving explanations show up.
+        """
+        with self._lock:
+            if self._view is not None:
+                return self._view
+            pending = self.explanations_pending()
+            view = build(self.summary, self.reports)
+            if not pending:
+                self._view = view
+            return view
+
+
+class RunResultCache:
+    """
+    Run Result Cache
+    ----------------
+    Latest pipeline runs kept in server memory, keyed by run id, so
+    filtering, sorting and exports never re-run the pipeline.
+
+    - put() after an explicit run; the oldest run is dropped beyond
+      `max_runs`
+    - get(run_id) -> CachedRun or None (evicted / server restarted)
+    """
+
+    def __init__(self, max_runs=4):
+        self.max_runs = max_runs
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, run_id, summary, reports):
+        run = CachedRun(run_id, summary, reports)
+        with self._lock:
+            self._runs[run_id] = run
+            self._runs.move_to_end(run_id)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        return run
+
+    def get(self, run_id):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                self._runs.move_to_end(run_id)
+            return run
+
+    def latest(self):
+        with self._lock:
+            if not self._runs:
+                return None
+            return next(reversed(self._runs.values()))
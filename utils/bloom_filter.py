@@ -0,0 +1,43 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys.
+
+    - No false negatives: "key not in bf" means the key was never added
+    - False-positive rate stays near error_rate up to `capacity` keys
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        capacity = max(1, int(capacity))
+
+        self.num_bits = max(
+            8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(
+            1, round(self.num_bits / capacity * math.log(2))
+        )
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        # Kirsch–Mitzenmacher double hashing
+        return (
+            (h1 + i * h2) % self.num_bits
+            for i in range(self.num_hashes)
+        )
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(key)
+        )
@@ -1,13 +1,57 @@
 import pandas as pd
 import tempfile
 import os
+import csv
+import gzip
+import hashlib
+import time
+from pathlib import Path
 <<<<<<< HEAD
 from datetime import datetime
 =======
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 
 
-def generate_csv(df: pd.DataFrame):
+# One shared directory instead of a new mkdtemp() per click
+EXPORT_DIR = Path(tempfile.gettempdir()) / "compliance_exports"
+
+# Exports not requested again within this age are deleted
+MAX_EXPORT_AGE_SEC = 24 * 3600
+
+# Rows formatted and written per to_csv call
+CHUNK_ROWS = 5_000
+
+
+def report_digest(df: pd.DataFrame):
+    """Content hash of the table (values and column names)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def cleanup_exports(max_age_sec=MAX_EXPORT_AGE_SEC, export_dir=EXPORT_DIR):
+    """Deletes export files older than max_age_sec; returns how many."""
+    cutoff = time.time() - max_age_sec
+    removed = 0
+    for path in Path(export_dir).glob("compliance_report_*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            # Removed by a concurrent cleanup
+            continue
+    return removed
+
+
+def _open(path, compress, encoding):
+    if compress:
+        return gzip.open(path, "wt", encoding=encoding, newline="")
+    return open(path, "w", encoding=encoding, newline="")
+
+
+def generate_csv(df: pd.DataFrame, compress: bool = False):
     """
 <<<<<<< HEAD
     Generates a clean, Excel-friendly CSV
@@ -16,51 +60,74 @@ def generate_csv(df: pd.DataFrame):
     Generates CSV directly from the UI DataFrame.
     Guarantees exported CSV == UI table.
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+
+    Rows are written in chunks of CHUNK_ROWS; compress=True writes
+    .csv.gz. The file is keyed by a hash of the table, so exporting the
+    same report set again returns the existing file.
     """
 
     if df is None or df.empty:
         return None
 
-    temp_dir = tempfile.mkdtemp()
-<<<<<<< HEAD
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_path = os.path.join(
-        temp_dir, f"compliance_report_{timestamp}.csv"
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    cleanup_exports()
+
+    suffix = ".csv.gz" if compress else ".csv"
+    file_path = EXPORT_DIR / f"compliance_report_{report_digest(df)}{suffix}"
+
+    try:
+        # Keep a repeatedly downloaded export from aging out
+        os.utime(file_path)
+        return str(file_path)
+    except FileNotFoundError:
+        # Not exported yet, or just removed by a concurrent cleanup
+        pass
+
+    # Written under a unique temporary name (per process and thread);
+    # concurrent exports of the same table never see a partial file
+    fd, partial_path = tempfile.mkstemp(
+        prefix=f"{file_path.name}.", suffix=".partial", dir=EXPORT_DIR
     )
+    os.close(fd)
 
-    # -------------------------------------------------
-    # Metadata header (human-friendly)
-    # -------------------------------------------------
-    meta_rows = [
-        ["Report Name", "Agentic AI Compliance Validation Report"],
-        ["Generated On", datetime.now().strftime("%d %b %Y, %H:%M:%S")],
-        ["Total Records", len(df)],
-        [],
-    ]
-
-    df_meta = pd.DataFrame(meta_rows)
-
-    # Combine metadata + data
-    final_df = pd.concat([df_meta, df], ignore_index=True)
-
-    # -------------------------------------------------
-    # Write CSV (Excel safe)
-    # -------------------------------------------------
-    final_df.to_csv(
-        file_path,
-        index=False,
-        encoding="utf-8-sig",   # Excel UTF-8
-        lineterminator="\n"
+<<<<<<< HEAD
+    encoding = "utf-8-sig"   # Excel UTF-8
+
+    with _open(partial_path, compress, encoding) as f:
+        # -------------------------------------------------
+        # Metadata header (human-friendly)
+        # -------------------------------------------------
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerows([
+            ["Report Name", "Agentic AI Compliance Validation Report"],
+            ["Generated On", datetime.now().strftime("%d %b %Y, %H:%M:%S")],
+            ["Total Records", len(df)],
+            [],
+        ])
+
+        # -------------------------------------------------
+        # Data rows, streamed in chunks (Excel safe)
+        # -------------------------------------------------
+        for start in range(0, len(df), CHUNK_ROWS):
+            df.iloc[start:start + CHUNK_ROWS].to_csv(
+                f,
+                index=False,
+                header=start == 0,
+                lineterminator="\n"
+            )
 =======
-    file_path = os.path.join(temp_dir, "compliance_report.csv")
-
-    # ✅ Preserve UI formatting exactly
-    df.to_csv(
-        file_path,
-        index=False,
-        encoding="utf-8",
-        line_terminator="\n"
+    encoding = "utf-8"
+
+    with _open(partial_path, compress, encoding) as f:
+        # ✅ Preserve UI formatting exactly
+        for start in range(0, len(df), CHUNK_ROWS):
+            df.iloc[start:start + CHUNK_ROWS].to_csv(
+                f,
+                index=False,
+                header=start == 0,
+                lineterminator="\n"
+            )
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-    )
 
-    return file_path
+    os.replace(partial_path, file_path)
+    return str(file_path)
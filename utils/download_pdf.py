@@ -1,22 +1,272 @@
 import tempfile
 import os
+import functools
+import math
 <<<<<<< HEAD
 from datetime import datetime
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.platypus import (
     SimpleDocTemplate, Table, TableStyle,
-    Paragraph, Spacer
+    Paragraph, Spacer, PageBreak
 )
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 =======
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.platypus import (
+    SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak
+)
 from reportlab.lib.styles import getSampleStyleSheet
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
 from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from utils.download_csv import EXPORT_DIR, cleanup_exports
+
+
+# Tables are cut to (estimated) page height, one per page, so reportlab
+# lays out one page-sized table at a time and never has to split one
+MAX_ROWS_PER_TABLE = 200
+PAGE_FILL = 0.9
+# Word wrapping needs a few more lines than width / column width
+WRAP_SLACK = 1.15
+
+# Space taken by the title / metadata block on the first page
+TITLE_BLOCK_HEIGHT = 90
+
+# UI table columns used by the summary-only mode
+DECISION_COLUMN = "Compliance\nDecision"
+ESCALATION_COLUMN = "Escalation\nRequired"
+SUMMARY_COLUMNS = (
+    "Invoice ID", "Primary Reason", "Failed Checks", "Conflicts Identified",
+)
+
+
+# -------------------------------------------------
+# Styles (built once per process)
+# -------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def _styles():
+    styles = getSampleStyleSheet()
+<<<<<<< HEAD
+
+    cell_style = ParagraphStyle(
+        "CellStyle",
+        parent=styles["Normal"],
+        fontSize=8,
+        leading=10,
+        leftIndent=0,
+        rightIndent=0,
+        spaceBefore=0,
+        spaceAfter=0,
+    )
+
+    header_style = ParagraphStyle(
+        "HeaderStyle",
+        parent=styles["Normal"],
+        fontSize=8,
+        leading=10,
+        textColor=colors.black,
+        alignment=1,  # center
+        spaceBefore=4,
+        spaceAfter=4,
+    )
+
+=======
+    cell_style = styles["Normal"]
+    header_style = None
+>>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+    return styles, cell_style, header_style
+
+
+# -------------------------------------------------
+# Table chunks
+# -------------------------------------------------
+
+def _cell(value, style, max_width):
+    """
+    (cell, estimated line count). Text whose lines all fit the column is
+    passed as a plain string (drawn directly, no paragraph layout);
+    anything else becomes a wrapping Paragraph.
+    """
+    text = "" if value is None else str(value)
+    widths = [
+        stringWidth(line, style.fontName, style.fontSize)
+        for line in text.split("\n")
+    ]
+    if "<" not in text and "&" not in text and max(widths) <= max_width:
+        return text, len(widths)
+
+    lines = sum(max(1, math.ceil(width * WRAP_SLACK / max_width)) for width in widths)
+    return Paragraph(text.replace("\n", "<br/>"), style), lines
+
+
+def _padding(style_commands, name, default=6):
+    for command in style_commands:
+        if command[0] == name:
+            return command[3]
+    return default
+
+
+def _chunk_tables(
+    columns, rows, col_widths, style_commands, page_height, first_height=None
+):
+    """
+    Tables of at most one page each (by estimated row height), each with
+    its own header row and separated by page breaks. `rows` is an
+    iterable of row tuples (built from column arrays).
+    """
+    _, cell_style, header_style = _styles()
+    h_padding = (
+        _padding(style_commands, "LEFTPADDING")
+        + _padding(style_commands, "RIGHTPADDING")
+    )
+    v_padding = (
+        _padding(style_commands, "TOPPADDING")
+        + _padding(style_commands, "BOTTOMPADDING")
+    )
+    max_widths = [width - h_padding for width in col_widths]
+
+    header_lines = max(
+        _cell(col, header_style or cell_style, max_width)[1]
+        for col, max_width in zip(columns, max_widths)
+    )
+    header_height = header_lines * cell_style.leading + v_padding + 8
+    header = [
+        Paragraph(str(col), header_style) if header_style else str(col)
+        for col in columns
+    ]
+    style = TableStyle(
+        style_commands + [
+            # Plain-string cells use the paragraph font
+            ("FONTNAME", (0, 1), (-1, -1), cell_style.fontName),
+            ("FONTSIZE", (0, 1), (-1, -1), cell_style.fontSize),
+            ("LEADING", (0, 1), (-1, -1), cell_style.leading),
+        ]
+    )
+
+    tables = []
+    chunk = []
+    available = (first_height or page_height) * PAGE_FILL - header_height
+    used = 0.0
+
+    for row in rows:
+        cells = [
+            _cell(value, cell_style, max_width)
+            for value, max_width in zip(row, max_widths)
+        ]
+        height = max(lines for _, lines in cells) * cell_style.leading + v_padding
+
+        if chunk and (used + height > available or len(chunk) == MAX_ROWS_PER_TABLE):
+            tables.append(_table(header, chunk, col_widths, style))
+            tables.append(PageBreak())
+            chunk = []
+            used = 0.0
+            available = page_height * PAGE_FILL - header_height
+
+        chunk.append([cell for cell, _ in cells])
+        used += height
+
+    if chunk:
+        tables.append(_table(header, chunk, col_widths, style))
+    return tables
+
+
+class _ExportTable(Table):
+    """
+    Table that keeps its data row count (export_rows) when reportlab
+    splits it across pages, so progress still adds up to the total.
+    """
+
+    export_rows = 0
+
+    def split(self, availWidth, availHeight):
+        parts = super().split(availWidth, availHeight)
+        remaining = self.export_rows
+        for part in parts:
+            # Every part starts with the repeated header row
+            part.export_rows = min(remaining, max(0, part._nrows - 1))
+            remaining -= part.export_rows
+        if parts:
+            parts[-1].export_rows += remaining
+        return parts
+
+
+def _table(header, chunk, col_widths, style):
+    table = _ExportTable(
+        [list(header)] + chunk,
+        colWidths=col_widths,
+        repeatRows=1,
+        hAlign="LEFT",
+    )
+    table.setStyle(style)
+    table.export_rows = len(chunk)
+    return table
+
+
+def _row_arrays(df):
+    """Rows as tuples over the raw column arrays (no iterrows)."""
+    return zip(*(df[col].tolist() for col in df.columns))
+
 
+def _summary_tables(df, col_widths_for, style_commands, page_height):
+    """Decision counts plus the escalated invoices."""
+    _, cell_style, _ = _styles()
+    elements = []
+
+    if DECISION_COLUMN in df.columns:
+        counts = df[DECISION_COLUMN].value_counts()
+        rows = [(decision, int(n)) for decision, n in counts.items()]
+        columns = ("Decision", "Invoices")
+        elements += _chunk_tables(
+            columns, rows, col_widths_for(columns), style_commands,
+            page_height, page_height - TITLE_BLOCK_HEIGHT,
+        )
+
+    if ESCALATION_COLUMN in df.columns:
+        escalated = df[df[ESCALATION_COLUMN] == "Yes"]
+        columns = [c for c in SUMMARY_COLUMNS if c in escalated.columns]
+        if len(escalated) and columns:
+            elements.append(
+                Paragraph(f"<b>Escalated invoices:</b> {len(escalated)}", cell_style)
+            )
+            elements += _chunk_tables(
+                columns,
+                _row_arrays(escalated[columns]),
+                col_widths_for(columns),
+                style_commands,
+                page_height,
+            )
+    return elements
+
+
+class _ProgressDocTemplate(SimpleDocTemplate):
+    """Reports rendered data rows as each chunk table is laid out."""
+
+    def __init__(self, *args, progress=None, total_rows=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.progress = progress
+        self.total_rows = total_rows
+        self.done_rows = 0
+
+    def afterFlowable(self, flowable):
+        rows = getattr(flowable, "export_rows", 0)
+        if rows and self.progress:
+            self.done_rows = min(self.total_rows, self.done_rows + rows)
+            self.progress(self.done_rows, self.total_rows)
 
-def generate_pdf(df):
+
+def _export_path(prefix):
+    """
+    New file in the shared export directory (aged out by cleanup_exports);
+    unique per call, so concurrent exports never share a file.
+    """
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=".pdf", dir=EXPORT_DIR)
+    os.close(fd)
+    return path
+
+
+def generate_pdf(df, summary_only=False, progress=None):
     """
 <<<<<<< HEAD
     Generates a clean, readable PDF report
@@ -25,32 +275,35 @@ def generate_pdf(df):
     Generates a professional PDF report directly
     from the UI DataFrame.
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+
+    summary_only: decision counts and escalated invoices only.
+    progress(done_rows, total_rows) is called as tables are rendered.
     """
 
     if df is None or df.empty:
         return None
 
-    temp_dir = tempfile.mkdtemp()
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    cleanup_exports()
+
 <<<<<<< HEAD
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_path = os.path.join(
-        temp_dir, f"compliance_report_{timestamp}.pdf"
-    )
+    file_path = _export_path(f"compliance_report_{timestamp}_")
 
     # -------------------------------------------------
     # Layout: Landscape for wide tables
     # -------------------------------------------------
     pagesize = landscape(A4)
 
-    doc = SimpleDocTemplate(
+    doc = _ProgressDocTemplate(
         file_path,
         pagesize=pagesize,
         rightMargin=20,
         leftMargin=20,
 =======
-    file_path = os.path.join(temp_dir, "compliance_report.pdf")
+    file_path = _export_path("compliance_report_")
 
-    doc = SimpleDocTemplate(
+    doc = _ProgressDocTemplate(
         file_path,
         pagesize=A4,
         rightMargin=24,
@@ -58,35 +311,10 @@ def generate_pdf(df):
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
         topMargin=24,
         bottomMargin=24,
+        progress=progress,
     )
 
-    styles = getSampleStyleSheet()
-<<<<<<< HEAD
-
-    cell_style = ParagraphStyle(
-        "CellStyle",
-        parent=styles["Normal"],
-        fontSize=8,
-        leading=10,
-        leftIndent=0,
-        rightIndent=0,
-        spaceBefore=0,
-        spaceAfter=0,
-    )
-
-    header_style = ParagraphStyle(
-        "HeaderStyle",
-        parent=styles["Normal"],
-        fontSize=8,
-        leading=10,
-        textColor=colors.black,
-        alignment=1,  # center
-        spaceBefore=4,
-        spaceAfter=4,
-    )
-
-=======
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
+    styles, cell_style, header_style = _styles()
     elements = []
 
     # -------------------------------------------------
@@ -114,101 +342,77 @@ def generate_pdf(df):
         )
     )
     elements.append(Spacer(1, 12))
-=======
-
-    elements.append(Paragraph("<br/>", styles["Normal"]))
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-
-    # -------------------------------------------------
-    # Prepare table data
-    # -------------------------------------------------
-    table_data = []
-
-    # Header row
-<<<<<<< HEAD
-    table_data.append([
-        Paragraph(str(col), header_style) for col in df.columns
-    ])
-
-    # Data rows
-    for _, row in df.iterrows():
-        table_data.append([
-            Paragraph(
-                "" if cell is None else str(cell).replace("\n", "<br/>"),
-                cell_style
-            )
-            for cell in row
-        ])
 
     # -------------------------------------------------
     # Dynamic column widths (NO TRUNCATION)
     # -------------------------------------------------
     usable_width = pagesize[0] - doc.leftMargin - doc.rightMargin
-    col_count = len(df.columns)
-
-    # Weight columns slightly based on text-heavy fields
-    weights = []
-    for col in df.columns:
-        if "Reason" in col or "Checks" in col or "Conflicts" in col:
-            weights.append(2)
-        else:
-            weights.append(1)
-
-    total_weight = sum(weights)
-    col_widths = [
-        (usable_width * w) / total_weight
-        for w in weights
-    ]
 
-    table = Table(
-        table_data,
-        colWidths=col_widths,
-        repeatRows=1,
-        hAlign="LEFT",
+    def col_widths_for(columns):
+        # Weight columns slightly based on text-heavy fields
+        weights = []
+        for col in columns:
+            if "Reason" in col or "Checks" in col or "Conflicts" in col:
+                weights.append(2)
+            else:
+                weights.append(1)
+
+        total_weight = sum(weights)
+        return [
+            (usable_width * w) / total_weight
+            for w in weights
+        ]
+
+    style_commands = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 4),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+        ("TOPPADDING", (0, 0), (-1, -1), 4),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ]
 =======
-    table_data.append(list(df.columns))
 
-    # Data rows (wrap text)
-    for _, row in df.iterrows():
-        wrapped_row = []
-        for cell in row:
-            text = "" if cell is None else str(cell).replace("\n", "<br/>")
-            wrapped_row.append(Paragraph(text, styles["Normal"]))
-        table_data.append(wrapped_row)
+    elements.append(Paragraph("<br/>", styles["Normal"]))
 
-    # -------------------------------------------------
-    # Build table
-    # -------------------------------------------------
-    table = Table(
-        table_data,
-        repeatRows=1,
-        colWidths=[70] * len(df.columns)
->>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-    )
+    def col_widths_for(columns):
+        return [70] * len(columns)
 
-    table.setStyle(
-        TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-<<<<<<< HEAD
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-            ("TOPPADDING", (0, 0), (-1, -1), 4),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-=======
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("LEFTPADDING", (0, 0), (-1, -1), 6),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-            ("TOPPADDING", (0, 0), (-1, -1), 6),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    style_commands = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("LEFTPADDING", (0, 0), (-1, -1), 6),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+        ("TOPPADDING", (0, 0), (-1, -1), 6),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ]
 >>>>>>> 507c4561faf35b246d6d8207ac15a538e2aa91a6
-        ])
-    )
 
-    elements.append(table)
+    # -------------------------------------------------
+    # Tables (one per page-sized block of rows)
+    # -------------------------------------------------
+    # Frame height (frames have 6pt padding on each side)
+    page_height = doc.height - 12
+
+    if summary_only:
+        summary = _summary_tables(df, col_widths_for, style_commands, page_height)
+        doc.total_rows = sum(getattr(t, "export_rows", 0) for t in summary)
+        elements += summary
+    else:
+        doc.total_rows = len(df)
+        elements += _chunk_tables(
+            list(df.columns),
+            _row_arrays(df),
+            col_widths_for(list(df.columns)),
+            style_commands,
+            page_height,
+            page_height - TITLE_BLOCK_HEIGHT,
+        )
 
     # -------------------------------------------------
     # Build PDF
@@ -216,3 +420,4 @@ def generate_pdf(df):
     doc.build(elements)
 
     return file_path
+
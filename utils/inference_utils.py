@@ -1,3 +1,6 @@
+from utils.line_item_utils import LineItemArrays, PAISE_PER_RUPEE
+
+
 def infer_missing_fields(invoice, vendor_registry):
     """
     Safely infer missing invoice attributes using vendor registry.
@@ -122,14 +125,11 @@ def infer_missing_fields(invoice, vendor_registry):
     # Infer invoice value from line items
     # ---------------------------------------------------------
     if not invoice.get("invoice_value"):
-        total = 0.0
-        for item in invoice.get("line_items", []):
-            amount = item.get("amount")
-            try:
-                total += float(amount)
-            except (TypeError, ValueError):
-                pass
-
-        invoice["invoice_value"] = round(total, 2)
+        arrays = LineItemArrays.from_items(
+            invoice.get("line_items", []), strict=False
+        )
+        invoice["invoice_value"] = round(
+            arrays.total_amount() / PAISE_PER_RUPEE, 2
+        )
     
     return invoice
@@ -0,0 +1,195 @@
+import threading
+from array import array
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+# Fixed-point scales used for all line-item arithmetic
+PAISE_PER_RUPEE = 100          # amounts and rates in integer paise
+QTY_SCALE = 1000               # quantities in thousandths of a unit
+BASIS_POINTS = 100             # tax rates: 18% -> 1800 bps
+
+
+class InexactValue(ValueError):
+    """A value has more decimals than its fixed-point scale holds."""
+
+
+# Lenient from_items(): bad or out-of-range values count as 0
+LENIENT_ERRORS = (KeyError, TypeError, ValueError, ArithmeticError)
+
+
+def to_decimal(value):
+    """Decimal of the value as written ("1.005" stays 1.005, not a float)."""
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Not a number: {value!r}") from None
+    if not number.is_finite():
+        raise ValueError(f"Not a finite number: {value!r}")
+    return number
+
+
+def _scaled(value, scale, exact):
+    number = to_decimal(value) * scale
+    units = number.quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    if exact and units != number:
+        raise InexactValue(value)
+    return int(units)
+
+
+def to_paise(value, exact=False):
+    """Integer paise, rounded half-up; exact=True raises InexactValue instead."""
+    return _scaled(value, PAISE_PER_RUPEE, exact)
+
+
+def to_basis_points(value, exact=False):
+    return _scaled(value, BASIS_POINTS, exact)
+
+
+def to_qty_units(value, exact=False):
+    return _scaled(value, QTY_SCALE, exact)
+
+
+# Range of one array("q") slot
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def _slot(convert, value, strict):
+    """
+    convert(value, exact=strict) as an array("q") slot. A value that does
+    not fit (beyond the decimal context or int64) raises InexactValue in
+    strict mode, so checks fall back to exact Decimal arithmetic.
+    """
+    try:
+        units = convert(value, exact=strict)
+    except ArithmeticError:
+        if strict:
+            raise InexactValue(value) from None
+        raise
+    if not INT64_MIN <= units <= INT64_MAX:
+        if strict:
+            raise InexactValue(value)
+        raise OverflowError(f"Out of range: {value!r}")
+    return units
+
+
+class LineItemArrays:
+    """
+    Compact line-item representation
+    --------------------------------
+    Parallel integer arrays (one slot per line item):
+    - quantity   : thousandths of a unit
+    - rate       : paise
+    - amount     : paise
+    - igst/cgst/sgst : basis points
+
+    Built in a single pass over the items; every arithmetic check
+    then runs on plain integers instead of per-field Decimals.
+    In strict mode a value finer than its scale raises InexactValue,
+    so checks can fall back to exact Decimal arithmetic.
+    """
+
+    __slots__ = ("quantity", "rate", "amount", "igst", "cgst", "sgst")
+
+    def __init__(self):
+        self.quantity = array("q")
+        self.rate = array("q")
+        self.amount = array("q")
+        self.igst = array("q")
+        self.cgst = array("q")
+        self.sgst = array("q")
+
+    @classmethod
+    def from_items(cls, items, strict=True):
+        """
+        strict=True : missing / non-numeric fields raise (like Decimal),
+                      values finer than the scale or too large for a
+                      slot raise InexactValue
+        strict=False: they count as 0, amounts are rounded (inference-safe)
+        """
+        arrays = cls()
+
+        for item in items:
+            try:
+                qty = _slot(to_qty_units, item["qty"], strict)
+                rate = _slot(to_paise, item["rate"], strict)
+            except LENIENT_ERRORS:
+                if strict:
+                    raise
+                qty = rate = 0
+
+            try:
+                amount = _slot(to_paise, item["amount"], strict)
+            except LENIENT_ERRORS:
+                if strict:
+                    raise
+                amount = 0
+
+            arrays.quantity.append(qty)
+            arrays.rate.append(rate)
+            arrays.amount.append(amount)
+            arrays.igst.append(_rate_bp(item, "igst_rate"))
+            arrays.cgst.append(_rate_bp(item, "cgst_rate"))
+            arrays.sgst.append(_rate_bp(item, "sgst_rate"))
+
+        return arrays
+
+    def __len__(self):
+        return len(self.amount)
+
+    # ---------------------------------------------------------
+    # Arithmetic
+    # ---------------------------------------------------------
+
+    def total_amount(self):
+        """Sum of line amounts, in paise."""
+        return sum(self.amount)
+
+    def first_math_mismatch(self):
+        """
+        Index of the first line where quantity x rate != amount,
+        or None. Compared exactly in integer units.
+        """
+        for idx, (qty, rate, amount) in enumerate(
+            zip(self.quantity, self.rate, self.amount)
+        ):
+            if qty * rate != amount * QTY_SCALE:
+                return idx
+        return None
+
+
+def _rate_bp(item, key):
+    try:
+        return _slot(to_basis_points, item.get(key) or 0, False)
+    except LENIENT_ERRORS:
+        return 0
+
+
+# Last (items, arrays) built on this thread; C1 and C2 of one invoice
+# run back to back, so this shares the arrays without touching the ctx
+_last_built = threading.local()
+
+
+def get_line_item_arrays(ctx):
+    """
+    Returns the strict LineItemArrays for ctx["fields"]["line_items"],
+    building them once per invoice and reusing them across checks.
+    Raises like LineItemArrays.from_items(strict=True).
+    """
+    items = ctx["fields"].get("line_items", [])
+    cached = getattr(_last_built, "entry", None)
+
+    if cached is not None and cached[0] is items and cached[1] == len(items):
+        return cached[2]
+
+    arrays = LineItemArrays.from_items(items)
+    _last_built.entry = (items, len(items), arrays)
+    return arrays
+
+
+def decimal_math_mismatch(items):
+    """first_math_mismatch() in exact Decimal arithmetic (any precision)."""
+    for idx, item in enumerate(items):
+        if to_decimal(item["qty"]) * to_decimal(item["rate"]) != to_decimal(item["amount"]):
+            return idx
+    return None
@@ -0,0 +1,154 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import zlib
+from datetime import datetime, timezone
+
+
+# Loggers configured by setup_logging (module loggers are children)
+ROOT_LOGGERS = ("src", "utils")
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime",
+}
+
+_lock = threading.Lock()
+_listener = None
+
+
+def fields(**values):
+    """
+    Structured fields for one record:
+        logger.debug("Decision", extra=fields(invoice_id=..., decision=...))
+    """
+    return {"fields": values}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, then the fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and key != "fields":
+                entry.setdefault(key, value)
+
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable fallback: '... [LEVEL] logger: msg | k=v k=v'."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    def format(self, record):
+        text = super().format(record)
+        extra = getattr(record, "fields", None)
+        if extra:
+            text += " | " + " ".join(f"{k}={v}" for k, v in extra.items())
+        return text
+
+
+class InvoiceSampler(logging.Filter):
+    """
+    Keeps `rate` of the DEBUG records that carry an invoice_id.
+    The choice is a hash of the invoice id, so a sampled invoice keeps
+    all of its debug records. Other records always pass.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.threshold = int(max(0.0, min(1.0, rate)) * 10_000)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.threshold >= 10_000:
+            return True
+
+        invoice_id = (getattr(record, "fields", None) or {}).get("invoice_id")
+        if invoice_id is None:
+            return True
+        return zlib.crc32(str(invoice_id).encode()) % 10_000 < self.threshold
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Marks the handler installed by setup_logging."""
+
+
+def setup_logging(config=None):
+    """
+    Routes the "src" / "utils" loggers through a queue: callers only
+    enqueue, a listener thread formats and writes. Idempotent; later
+    calls only re-apply levels and sampling.
+
+    config["logging"]:
+        level              default level
+        levels             {logger name: level} per-module overrides
+        json               JSON lines (True) or text
+        debug_sample_rate  share of invoices whose DEBUG records are kept
+    """
+    global _listener
+
+    log_cfg = (config or {}).get("logging", {})
+
+    with _lock:
+        if _listener is None:
+            stream = sys.stdout if log_cfg.get("stream") == "stdout" else sys.stderr
+            output = logging.StreamHandler(stream)
+            output.setFormatter(
+                JsonFormatter() if log_cfg.get("json", True) else TextFormatter()
+            )
+
+            records = queue.SimpleQueue()
+            _listener = logging.handlers.QueueListener(
+                records, output, respect_handler_level=True
+            )
+            _listener.start()
+
+            handler = _QueueHandler(records)
+            for name in ROOT_LOGGERS:
+                logger = logging.getLogger(name)
+                for old in [h for h in logger.handlers if isinstance(h, _QueueHandler)]:
+                    logger.removeHandler(old)
+                logger.addHandler(handler)
+                logger.propagate = False
+
+        for name in ROOT_LOGGERS:
+            logger = logging.getLogger(name)
+            logger.setLevel(log_cfg.get("level", "INFO"))
+            for handler in logger.handlers:
+                if isinstance(handler, _QueueHandler):
+                    handler.filters = [
+                        InvoiceSampler(log_cfg.get("debug_sample_rate", 1.0))
+                    ]
+
+        for name, level in log_cfg.get("levels", {}).items():
+            logging.getLogger(name).setLevel(level)
+
+
+def shutdown_logging():
+    """Drains the queue; records logged afterwards are dropped."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,90 @@
+import hashlib
+import random
+from functools import lru_cache
+from array import array
+
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def _hash64(token):
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+class MinHasher:
+    """
+    MinHash signature builder.
+
+    Uses num_perm universal hash functions (a*x + b mod p); the fraction of
+    equal slots between two signatures estimates their Jaccard similarity.
+    A fixed seed keeps signatures comparable across processes.
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens):
+        hashes = [_hash64(t) for t in set(tokens)]
+        if not hashes:
+            return array("Q", [MAX_HASH] * self.num_perm)
+
+        return array(
+            "Q",
+            (
+                min(((a * x + b) % MERSENNE_PRIME) & MAX_HASH for x in hashes)
+                for a, b in self.permutations
+            ),
+        )
+
+    def weighted_signature(self, weights):
+        """
+        Signature of a {token: integer weight} set. Each token enters
+        `weight` times, so equal slots estimate the weighted Jaccard
+        similarity (sum of min / sum of max weights).
+        """
+        return self.signature(
+            f"{token}\x1f{copy}"
+            for token, weight in weights.items()
+            for copy in range(int(weight))
+        )
+
+
+def jaccard(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def _integrate(f, lo, hi, steps=200):
+    width = (hi - lo) / steps
+    return sum(f(lo + (i + 0.5) * width) for i in range(steps)) * width
+
+
+@lru_cache(maxsize=None)
+def optimal_bands(threshold, num_perm):
+    """
+    (bands, rows) for an LSH index that minimizes the combined
+    false-positive and false-negative probability around `threshold`.
+    """
+    best, best_error = (1, num_perm), float("inf")
+
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            def hit(s):
+                return 1 - (1 - s ** rows) ** bands
+
+            error = (
+                _integrate(hit, 0.0, threshold)
+                + _integrate(lambda s: 1 - hit(s), threshold, 1.0)
+            )
+            if error < best_error:
+                best, best_error = (bands, rows), error
+
+    return best
@@ -48,6 +48,12 @@ def normalize_invoice(raw):
         or raw.get("id")
     )
 
+    # The document's own number (invoice_id may be a system id)
+    invoice_number = (
+        fields.get("invoice_number")
+        or raw.get("invoice_number")
+    )
+
     invoice_date = (
         fields.get("invoice_date")
         or raw.get("invoice_date")
@@ -112,6 +118,7 @@ def normalize_invoice(raw):
 
     normalized = {
         "invoice_id": str(invoice_id) if invoice_id else None,
+        "invoice_number": str(invoice_number) if invoice_number else None,
         "invoice_date": _normalize_date(invoice_date),
         "seller_gstin": seller_gstin,
         "buyer_gstin": buyer_gstin,
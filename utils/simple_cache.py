@@ -13,7 +13,7 @@ class SimpleTTLCache:
 
         value, ts = entry
         if time.time() - ts > self.ttl:
-            del self._store[key]
+            self._store.pop(key, None)
             return None
 
         return value
@@ -0,0 +1,303 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Histogram bucket upper bounds in seconds (roughly x2 per step)
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+METRIC_PREFIX = "invoice_compliance"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are interpolated."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)     # last bucket = +Inf
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, value, error=False):
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+
+        self.counts[index] += 1
+        self.count += 1
+        self.errors += int(error)
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if not n or seen + n < rank:
+                seen += n
+                continue
+
+            # Narrow the bucket to the observed range
+            lower = max(self.bounds[i - 1] if i > 0 else 0.0, self.min)
+            upper = min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+            return lower + (upper - lower) * (rank - seen) / n
+
+        return self.max
+
+    def snapshot(self):
+        def seconds(value):
+            return round(value, 6) if value is not None else None
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_sec": seconds(self.sum),
+            "avg_sec": seconds(self.sum / self.count) if self.count else None,
+            "p50_sec": seconds(self.quantile(0.50)),
+            "p95_sec": seconds(self.quantile(0.95)),
+            "p99_sec": seconds(self.quantile(0.99)),
+            "max_sec": seconds(self.max),
+        }
+
+
+class RunTrace:
+    """
+    Stage histograms, counters and cache lookups of one run, recorded
+    between tracer.start_run() and tracer.end_run(). Exports before the
+    end are partial ("complete": False).
+    """
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.stages = {}
+        self.counters = {}
+        self.caches = {}
+        self.started_at = time.time()
+        self.ended_at = None
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def record(self, name, elapsed, error=False):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram()
+            histogram.observe(elapsed, error)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def hit(self, cache, hit):
+        with self._lock:
+            entry = self.caches.setdefault(cache, [0, 0])
+            entry[0 if hit else 1] += 1
+
+    # ---------------------------------------------------------
+    # Export
+    # ---------------------------------------------------------
+
+    def snapshot(self):
+        with self._lock:
+            caches = {}
+            for name, (hits, misses) in self.caches.items():
+                lookups = hits + misses
+                caches[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                }
+
+            ended_at = self.ended_at
+            return {
+                "complete": ended_at is not None,
+                "wall_sec": round((ended_at or time.time()) - self.started_at, 3),
+                "stages": {
+                    name: h.snapshot() for name, h in sorted(self.stages.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "caches": dict(sorted(caches.items())),
+            }
+
+    def to_prometheus(self, labels=None):
+        """Prometheus text exposition format (node_exporter textfile style)."""
+        base = dict(labels or {})
+
+        def fmt(extra=None):
+            pairs = {**base, **(extra or {})}
+            if not pairs:
+                return ""
+            body = ",".join(f'{k}="{v}"' for k, v in pairs.items())
+            return "{" + body + "}"
+
+        seconds = f"{METRIC_PREFIX}_stage_seconds"
+        lines = [
+            f"# HELP {seconds} Latency of pipeline stages.",
+            f"# TYPE {seconds} histogram",
+        ]
+
+        with self._lock:
+            for name, h in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, n in zip(h.bounds + ("+Inf",), h.counts):
+                    cumulative += n
+                    lines.append(
+                        f"{seconds}_bucket{fmt({'stage': name, 'le': bound})} {cumulative}"
+                    )
+                lines.append(f"{seconds}_sum{fmt({'stage': name})} {h.sum:.6f}")
+                lines.append(f"{seconds}_count{fmt({'stage': name})} {h.count}")
+
+            errors = f"{METRIC_PREFIX}_stage_errors_total"
+            lines += [f"# TYPE {errors} counter"]
+            lines += [
+                f"{errors}{fmt({'stage': name})} {h.errors}"
+                for name, h in sorted(self.stages.items())
+            ]
+
+            events = f"{METRIC_PREFIX}_events_total"
+            lines += [f"# TYPE {events} counter"]
+            lines += [
+                f"{events}{fmt({'event': name})} {n}"
+                for name, n in sorted(self.counters.items())
+            ]
+
+            lookups = f"{METRIC_PREFIX}_cache_lookups_total"
+            lines += [f"# TYPE {lookups} counter"]
+            for name, (hits, misses) in sorted(self.caches.items()):
+                lines.append(f"{lookups}{fmt({'cache': name, 'result': 'hit'})} {hits}")
+                lines.append(f"{lookups}{fmt({'cache': name, 'result': 'miss'})} {misses}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, profile_dir, extra=None):
+        """
+        Writes run_<run_id>.json and run_<run_id>.prom under profile_dir.
+        Returns the profile dict (with the written paths).
+        """
+        run_id = self.run_id
+        profile_dir = Path(profile_dir)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        json_path = profile_dir / f"run_{run_id}.json"
+        prom_path = profile_dir / f"run_{run_id}.prom"
+
+        # Snapshot and write together: a later export never loses to an
+        # earlier, partial one
+        with self._export_lock:
+            profile = {"run_id": run_id, **self.snapshot(), **(extra or {})}
+            profile["files"] = {"json": str(json_path), "prometheus": str(prom_path)}
+            json_path.write_text(
+                json.dumps(profile, indent=2, default=str), encoding="utf-8"
+            )
+            prom_path.write_text(self.to_prometheus({"run_id": run_id}), encoding="utf-8")
+
+        return profile
+
+
+class Tracer:
+    """
+    Tracer
+    ------
+    Process-wide, thread-safe entry point for spans and counters; what
+    is recorded goes to every run currently traced (start_run/end_run),
+    and nowhere when no run is.
+
+    - span(name) / @traced(name): times a block into the histogram of
+      that stage (an exception counts as an error and is re-raised)
+    - count(name): plain counters (retries, rate limits, ...)
+    - hit(cache, hit): cache lookups, reported as hit rates
+    - RunTrace.snapshot() / to_prometheus() / export(): the run profile
+
+    Runs that overlap in one process (e.g. two UI sessions) each see the
+    other's spans for the overlap; a run never clears another's data.
+
+    Stage names are dotted: "extract.parse", "check.B3",
+    "portal.validate-gstin", "resolve.llm", "db.commit", ...
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Replaced, never mutated: recording reads it without the lock
+        self._runs = ()
+
+    def start_run(self, run_id):
+        trace = RunTrace(run_id)
+        with self._lock:
+            self._runs = self._runs + (trace,)
+        return trace
+
+    def end_run(self, trace):
+        with self._lock:
+            self._runs = tuple(run for run in self._runs if run is not trace)
+        trace.ended_at = time.time()
+
+    @property
+    def active(self):
+        return self.enabled and bool(self._runs)
+
+    # ---------------------------------------------------------
+    # Recording
+    # ---------------------------------------------------------
+
+    def record(self, name, elapsed, error=False):
+        if not self.enabled:
+            return
+        for run in self._runs:
+            run.record(name, elapsed, error)
+
+    @contextmanager
+    def span(self, name):
+        if not self.active:
+            yield
+            return
+
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, error)
+
+    def traced(self, name):
+        """Decorator form of span()."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        for run in self._runs:
+            run.count(name, n)
+
+    def hit(self, cache, hit):
+        if not self.enabled:
+            return
+        for run in self._runs:
+            run.hit(cache, hit)
+
+
+# Shared by every agent of the process
+tracer = Tracer()